@@ -130,6 +130,131 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Acoustic model. BACKEND is 'demo' (canned responses), 'torch' (PyTorch
+# eager) or 'onnx' (ONNX Runtime; exported to ONNX_PATH on first start).
+# QUANTIZE='int8' enables dynamic INT8 quantization, cached in CACHE_DIR.
+# SHARED_WEIGHTS maps fp32 torch weights from a safetensors file in CACHE_DIR,
+# so every worker process shares one physical copy of them.
+TRANSCRIPTION_MODEL = {
+    'BACKEND': os.getenv('TRANSCRIPTION_BACKEND', 'demo'),
+    'MODEL_NAME': os.getenv('TRANSCRIPTION_MODEL_NAME', 'facebook/wav2vec2-large-xlsr-53'),
+    'CACHE_DIR': os.getenv('TRANSCRIPTION_MODEL_CACHE', '/tmp/model_cache'),
+    'ONNX_PATH': os.getenv('TRANSCRIPTION_ONNX_PATH', ''),
+    'QUANTIZE': os.getenv('TRANSCRIPTION_QUANTIZE', ''),
+    'INTRA_OP_THREADS': int(os.getenv('TRANSCRIPTION_INTRA_OP_THREADS', '0')),
+    'INTER_OP_THREADS': int(os.getenv('TRANSCRIPTION_INTER_OP_THREADS', '0')),
+    'SHARED_WEIGHTS': os.getenv('TRANSCRIPTION_SHARED_WEIGHTS', 'False').lower() == 'true',
+}
+
+# Client audio: an Ogg Opus chunk may declare at most MAX_CHUNK_SECONDS of
+# audio, checked before it is decoded
+TRANSCRIPTION_AUDIO = {
+    'MAX_CHUNK_SECONDS': float(os.getenv('TRANSCRIPTION_MAX_CHUNK_SECONDS', '30')),
+}
+
+# Overlapping sliding-window inference (seconds). Each step adds HOP of new
+# audio; the model also sees LEFT_CONTEXT before and RIGHT_CONTEXT after it.
+# WebSocket sessions started with partials=true use the same windows to send
+# a partial_result every PARTIAL_INTERVAL_MS of audio and a final_result at
+# each utterance endpoint.
+TRANSCRIPTION_STREAMING = {
+    'ENABLED': os.getenv('TRANSCRIPTION_STREAMING', 'False').lower() == 'true',
+    'HOP': float(os.getenv('TRANSCRIPTION_STREAM_HOP', '1.0')),
+    'LEFT_CONTEXT': float(os.getenv('TRANSCRIPTION_STREAM_LEFT_CONTEXT', '1.0')),
+    'RIGHT_CONTEXT': float(os.getenv('TRANSCRIPTION_STREAM_RIGHT_CONTEXT', '0.5')),
+    'PARTIAL_INTERVAL_MS': float(os.getenv('TRANSCRIPTION_PARTIAL_INTERVAL_MS', '500')),
+}
+
+# Utterance endpointing for WebSocket sessions started with chunking='endpoint'
+# (seconds of trailing silence that ends a segment, and segment length limits)
+TRANSCRIPTION_ENDPOINTING = {
+    'END_SILENCE': float(os.getenv('TRANSCRIPTION_ENDPOINT_SILENCE', '0.5')),
+    'MIN_SEGMENT': float(os.getenv('TRANSCRIPTION_MIN_SEGMENT', '0.3')),
+    'MAX_SEGMENT': float(os.getenv('TRANSCRIPTION_MAX_SEGMENT', '8.0')),
+}
+
+# Per-language CTC heads on top of the shared encoder, loaded on first use.
+# HEADS_DIR holds <lang>.safetensors (weight, bias) and <lang>.vocab.json;
+# languages without one use the model's built-in head. Least recently used
+# heads are evicted above MEMORY_BUDGET_MB. Partial results and sliding-window
+# streaming (TRANSCRIPTION_STREAMING ENABLED) use the head too. Counters at
+# /api/metrics/languages/.
+TRANSCRIPTION_LANGUAGES = {
+    'HEADS_DIR': os.getenv('TRANSCRIPTION_LANGUAGE_HEADS_DIR', ''),
+    'MEMORY_BUDGET_MB': float(os.getenv('TRANSCRIPTION_LANGUAGE_BUDGET_MB', '256')),
+    'PREFETCH': os.getenv('TRANSCRIPTION_LANGUAGE_PREFETCH', 'True').lower() == 'true',
+}
+
+# Pool that runs WebSocket inference, separate from the thread Django uses
+# for ORM calls. KIND is 'thread' or 'process' (one model copy per process).
+TRANSCRIPTION_EXECUTOR = {
+    'KIND': os.getenv('TRANSCRIPTION_EXECUTOR', 'thread'),
+    'WORKERS': int(os.getenv('TRANSCRIPTION_EXECUTOR_WORKERS', '2')),
+}
+
+# Cross-session micro-batching (off by default): chunks from concurrent sessions are padded
+# into one attention-masked forward pass of up to MAX_BATCH_SIZE, waiting at most MAX_WAIT_MS
+# for the batch to fill. Stats at /api/metrics/batching/.
+TRANSCRIPTION_BATCHING = {
+    'ENABLED': os.getenv('TRANSCRIPTION_BATCHING', 'False').lower() == 'true',
+    'MAX_BATCH_SIZE': int(os.getenv('TRANSCRIPTION_MAX_BATCH_SIZE', '8')),
+    'MAX_WAIT_MS': float(os.getenv('TRANSCRIPTION_MAX_BATCH_WAIT_MS', '20')),
+}
+
+# Write-behind persistence of transcription results: rows are buffered and
+# written with bulk_create once MAX_PENDING are waiting or every MAX_DELAY_MS,
+# and always before a session ends or its results are read.
+TRANSCRIPTION_PERSISTENCE = {
+    'MAX_PENDING': int(os.getenv('TRANSCRIPTION_WRITE_MAX_PENDING', '50')),
+    'MAX_DELAY_MS': float(os.getenv('TRANSCRIPTION_WRITE_MAX_DELAY_MS', '500')),
+    # A session's rows that fail to write are retried after RETRY_DELAY_MS,
+    # doubling per failure, and dropped after MAX_RETRIES failures
+    'MAX_RETRIES': int(os.getenv('TRANSCRIPTION_WRITE_MAX_RETRIES', '5')),
+    'RETRY_DELAY_MS': float(os.getenv('TRANSCRIPTION_WRITE_RETRY_DELAY_MS', '500')),
+}
+
+# Results of recently seen chunks, keyed by a hash of session, chunk number,
+# language and samples, so resent chunks skip the model and the database.
+# Hit rate at /api/metrics/cache/.
+TRANSCRIPTION_RESULT_CACHE = {
+    'MAX_ENTRIES': int(os.getenv('TRANSCRIPTION_RESULT_CACHE_ENTRIES', '4096')),
+    'TTL_S': float(os.getenv('TRANSCRIPTION_RESULT_CACHE_TTL', '300')),
+}
+
+# Long-audio jobs (POST /api/jobs/): uploads are streamed to UPLOAD_DIR and
+# transcribed in the background, MAX_CONCURRENT at a time, with up to
+# MAX_QUEUED more waiting for a slot. Files are cut at utterance ends (up to
+# MAX_SEGMENT seconds); progress and results are committed every
+# PROGRESS_INTERVAL_MS and streamed from /api/jobs/<id>/events/.
+TRANSCRIPTION_JOBS = {
+    'UPLOAD_DIR': os.getenv('TRANSCRIPTION_JOB_DIR', '/tmp/transcription_jobs'),
+    'MAX_CONCURRENT': int(os.getenv('TRANSCRIPTION_MAX_CONCURRENT_JOBS', '2')),
+    'MAX_QUEUED': int(os.getenv('TRANSCRIPTION_MAX_QUEUED_JOBS', '20')),
+    'MAX_SEGMENT': float(os.getenv('TRANSCRIPTION_JOB_MAX_SEGMENT', '15.0')),
+    'PROGRESS_INTERVAL_MS': float(os.getenv('TRANSCRIPTION_JOB_PROGRESS_MS', '1000')),
+    'KEEP_UPLOADS': os.getenv('TRANSCRIPTION_JOB_KEEP_UPLOADS', 'False').lower() == 'true',
+}
+
+# Caption fan-out to read-only viewers (ws/transcription/<id>/captions/).
+# A speaker's results are published once per batch, at most every
+# PUBLISH_INTERVAL_MS, to the session's viewer group; viewers that fall
+# behind get merged updates. Late joiners get the last SNAPSHOT_SIZE captions
+# from the speaker, or from stored results when no speaker answers within
+# SNAPSHOT_TIMEOUT_MS. Counters at /api/metrics/captions/.
+TRANSCRIPTION_CAPTIONS = {
+    'ENABLED': os.getenv('TRANSCRIPTION_CAPTIONS', 'True').lower() == 'true',
+    'PUBLISH_INTERVAL_MS': float(os.getenv('TRANSCRIPTION_CAPTION_INTERVAL_MS', '200')),
+    'SNAPSHOT_SIZE': int(os.getenv('TRANSCRIPTION_CAPTION_SNAPSHOT_SIZE', '20')),
+    'SNAPSHOT_TIMEOUT_MS': float(os.getenv('TRANSCRIPTION_CAPTION_SNAPSHOT_TIMEOUT_MS', '500')),
+}
+
+# Per-stage latency tracing, exported at /api/metrics/latency/. WINDOW is the
+# number of recent chunks each percentile is computed over.
+TRANSCRIPTION_TRACING = {
+    'ENABLED': os.getenv('TRANSCRIPTION_TRACING', 'True').lower() == 'true',
+    'WINDOW': int(os.getenv('TRANSCRIPTION_TRACING_WINDOW', '1000')),
+}
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
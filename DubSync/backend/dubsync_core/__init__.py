@@ -0,0 +1,29 @@
+"""Framework-independent audio pipeline shared by the Streamlit app and the Django backend"""
+from .ring_buffer import AudioRingBuffer
+from .vad import SpeechSegmenter
+from .batching import MicroBatcher
+from .captions import CaptionFeed, CaptionLog
+from .endpointing import EndpointChunker
+from .registry import LanguageRegistry
+from .scheduling import BoundedChunkQueue, ChunkItem, Resequencer
+from .streaming import CTCStitcher, IncrementalDecoder, SlidingWindowStreamer, ctc_collapse, transcribe_windowed
+from .tracing import LatencyTracer
+
+__all__ = [
+    'AudioRingBuffer',
+    'BoundedChunkQueue',
+    'CTCStitcher',
+    'CaptionFeed',
+    'CaptionLog',
+    'ChunkItem',
+    'EndpointChunker',
+    'IncrementalDecoder',
+    'LanguageRegistry',
+    'LatencyTracer',
+    'MicroBatcher',
+    'Resequencer',
+    'SlidingWindowStreamer',
+    'SpeechSegmenter',
+    'ctc_collapse',
+    'transcribe_windowed',
+]
@@ -0,0 +1,317 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .streaming import ctc_collapse
+
+logger = logging.getLogger(__name__)
+
+# Demo checkpoint used until the IndicConformer weights are wired in
+DEFAULT_MODEL_NAME = "facebook/wav2vec2-large-xlsr-53"
+
+
+class InferenceBackend(ABC):
+    """Runs the CTC acoustic model: input values in, per-frame logits out.
+
+    ``logits`` takes a ``(batch, samples)`` float32 array of feature-extracted
+    input values and returns a ``(batch, frames, vocab)`` float32 array.
+    A zero-padded batch of unequal lengths passes its ``(batch, samples)``
+    ``attention_mask`` (1 for real samples, 0 for padding) along, so the
+    padding does not leak into the real frames.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def logits(self, input_values: np.ndarray, attention_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-frame CTC logits of a batch of input values"""
+
+    def hidden_states(self, input_values: np.ndarray, attention_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Shared encoder output ``(batch, frames, hidden)``, for per-language heads"""
+        raise NotImplementedError(f"{self.name} backend does not expose encoder hidden states")
+
+    def output_logits(self, hidden: np.ndarray) -> np.ndarray:
+        """The model's own CTC output layer applied to ``hidden_states`` output ``(..., hidden)``"""
+        raise NotImplementedError(f"{self.name} backend does not expose its output layer")
+
+
+class TorchBackend(InferenceBackend):
+    """In-process PyTorch eager execution"""
+
+    name = 'torch'
+
+    def __init__(self, model, device='cpu'):
+        self.model = model
+        self.device = device
+
+    def _mask(self, attention_mask: Optional[np.ndarray]):
+        import torch
+
+        if attention_mask is None:
+            return None
+        return torch.from_numpy(np.ascontiguousarray(attention_mask, dtype=np.int64)).to(self.device)
+
+    def logits(self, input_values: np.ndarray, attention_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        import torch
+
+        with torch.no_grad():
+            inputs = torch.from_numpy(np.ascontiguousarray(input_values, dtype=np.float32)).to(self.device)
+            return self.model(inputs, attention_mask=self._mask(attention_mask)).logits.cpu().numpy()
+
+    def hidden_states(self, input_values: np.ndarray, attention_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        import torch
+
+        with torch.no_grad():
+            inputs = torch.from_numpy(np.ascontiguousarray(input_values, dtype=np.float32)).to(self.device)
+            output = self.model.base_model(inputs, attention_mask=self._mask(attention_mask))
+            return output.last_hidden_state.cpu().numpy()
+
+    def output_logits(self, hidden: np.ndarray) -> np.ndarray:
+        import torch
+
+        with torch.no_grad():
+            hidden = torch.from_numpy(np.ascontiguousarray(hidden, dtype=np.float32)).to(self.device)
+            return self.model.lm_head(hidden).cpu().numpy()
+
+
+class LanguageHead:
+    """Language-specific CTC output layer and vocabulary on top of the shared encoder"""
+
+    def __init__(self, language: str, weight: np.ndarray, bias: Optional[np.ndarray], vocab: Dict[str, int],
+                 blank_token: str = '<pad>', word_delimiter: str = '|'):
+        self.language = language
+        self.weight = weight  # (vocab, hidden)
+        self.bias = bias
+        self.tokens = [''] * weight.shape[0]
+        for token, token_id in vocab.items():
+            if token_id < len(self.tokens):
+                self.tokens[token_id] = token
+        self.blank_id = vocab.get(blank_token, 0)
+        self.word_delimiter = word_delimiter
+
+    @property
+    def nbytes(self) -> int:
+        return self.weight.nbytes + (self.bias.nbytes if self.bias is not None else 0)
+
+    def logits(self, hidden: np.ndarray) -> np.ndarray:
+        """Project encoder frames ``(..., hidden)`` to this language's vocabulary"""
+        logits = hidden @ self.weight.T
+        if self.bias is not None:
+            logits += self.bias
+        return logits
+
+    def decode(self, frame_ids: np.ndarray) -> str:
+        """Greedy CTC decode of per-frame argmax ids"""
+        return self.decode_tokens(ctc_collapse(frame_ids, self.blank_id))
+
+    def decode_tokens(self, token_ids: np.ndarray) -> str:
+        """Text of token ids already collapsed (repeats merged, blanks dropped)"""
+        text = ''.join(self.tokens[i] for i in token_ids)
+        return ' '.join(text.replace(self.word_delimiter, ' ').split())
+
+
+def language_head_paths(heads_dir: str, language: str) -> Tuple[str, str]:
+    return (os.path.join(heads_dir, f"{language}.safetensors"),
+            os.path.join(heads_dir, f"{language}.vocab.json"))
+
+
+def load_language_head(heads_dir: str, language: str) -> Optional[LanguageHead]:
+    """Map ``<language>.safetensors`` (``weight``, optional ``bias``) and read its vocab.json.
+
+    Returns None when ``heads_dir`` has no head for the language. The weights
+    are memory-mapped, so worker processes share them.
+    """
+    from .shared_weights import map_shared_weights
+
+    weights_path, vocab_path = language_head_paths(heads_dir, language)
+    if not (os.path.exists(weights_path) and os.path.exists(vocab_path)):
+        return None
+    tensors = map_shared_weights(weights_path)
+    with open(vocab_path, encoding='utf-8') as f:
+        vocab = json.load(f)
+    return LanguageHead(language, tensors['weight'], tensors.get('bias'), vocab)
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime execution of an exported model"""
+
+    name = 'onnx'
+
+    def __init__(self, model_path: str, intra_op_threads: int = 0, inter_op_threads: int = 0,
+                 providers: Optional[list] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0 lets ONNX Runtime pick based on the number of physical cores
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        if inter_op_threads > 1:
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+
+        self.model_path = model_path
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options,
+            providers=providers or ['CPUExecutionProvider']
+        )
+        input_names = [node.name for node in self.session.get_inputs()]
+        self.input_name = input_names[0]
+        # Exports from before the mask input was added take input values only
+        self.mask_name = 'attention_mask' if 'attention_mask' in input_names else None
+
+    def logits(self, input_values: np.ndarray, attention_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        inputs = np.ascontiguousarray(input_values, dtype=np.float32)
+        if attention_mask is None:
+            if self.mask_name is None:
+                return self.session.run(None, {self.input_name: inputs})[0]
+            attention_mask = np.ones(inputs.shape, dtype=np.int64)
+        if self.mask_name is not None:
+            feeds = {self.input_name: inputs, self.mask_name: np.ascontiguousarray(attention_mask, dtype=np.int64)}
+            return self.session.run(None, feeds)[0]
+        lengths = attention_mask.sum(axis=1)
+        if np.all(lengths == inputs.shape[1]):
+            return self.session.run(None, {self.input_name: inputs})[0]
+        # No mask input: run each row on its own samples and pad the logits
+        rows = [self.session.run(None, {self.input_name: inputs[row:row + 1, :length]})[0][0]
+                for row, length in enumerate(lengths)]
+        frames = max(len(row) for row in rows)
+        out = np.zeros((len(rows), frames, rows[0].shape[-1]), dtype=rows[0].dtype)
+        for row, row_logits in enumerate(rows):
+            out[row, :len(row_logits)] = row_logits
+        return out
+
+
+def load_processor(model_name: str = DEFAULT_MODEL_NAME):
+    """Load only the feature extractor and tokenizer, without torch weights"""
+    from transformers import Wav2Vec2Processor
+
+    return Wav2Vec2Processor.from_pretrained(model_name)
+
+
+def load_ctc_model(model_name: str = DEFAULT_MODEL_NAME, device='cpu') -> Tuple[object, object]:
+    """Load a Hugging Face CTC model and its processor in eval mode"""
+    from transformers import Wav2Vec2ForCTC
+
+    processor = load_processor(model_name)
+    model = Wav2Vec2ForCTC.from_pretrained(model_name)
+    model = model.to(device)
+    model.eval()
+    return model, processor
+
+
+def export_onnx(model, path: str, opset: int = 17, sample_rate: int = 16000) -> str:
+    """Export a CTC model to ONNX with dynamic batch and time axes and an attention mask input"""
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_values, attention_mask):
+            return self.inner(input_values, attention_mask=attention_mask).logits
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    device = next(model.parameters()).device
+    dummy = torch.zeros(1, sample_rate, device=device)
+    dummy_mask = torch.ones(1, sample_rate, dtype=torch.int64, device=device)
+
+    logger.info(f"Exporting ONNX model to {path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            LogitsOnly(model).eval(),
+            (dummy, dummy_mask),
+            path,
+            input_names=['input_values', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_values': {0: 'batch', 1: 'samples'},
+                'attention_mask': {0: 'batch', 1: 'samples'},
+                'logits': {0: 'batch', 1: 'frames'},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    return path
+
+
+def default_onnx_path(model_name: str, cache_dir: str = 'model_cache') -> str:
+    return os.path.join(cache_dir, model_name.replace('/', '--') + '.onnx')
+
+
+def create_backend(name: str, model=None, device='cpu', onnx_path: Optional[str] = None,
+                   intra_op_threads: int = 0, inter_op_threads: int = 0) -> InferenceBackend:
+    """Build the configured backend; the ONNX file is exported from ``model`` if missing"""
+    if name == 'torch':
+        return TorchBackend(model, device)
+
+    if name == 'onnx':
+        if onnx_path is None:
+            raise ValueError("onnx backend needs onnx_path")
+        if not os.path.exists(onnx_path):
+            if model is None:
+                raise FileNotFoundError(f"ONNX model not found: {onnx_path}")
+            export_onnx(model, onnx_path)
+        return OnnxBackend(onnx_path, intra_op_threads, inter_op_threads)
+
+    raise ValueError(f"Unknown inference backend: {name}")
+
+
+def load_backend(backend_name: str, model_name: str = DEFAULT_MODEL_NAME, device='cpu',
+                 quantize: Optional[str] = None, cache_dir: str = 'model_cache',
+                 onnx_path: Optional[str] = None, intra_op_threads: int = 0,
+                 inter_op_threads: int = 0, shared_weights: bool = False) -> Tuple[object, object, InferenceBackend]:
+    """Load model, processor and inference backend in one step.
+
+    ``quantize='int8'`` applies dynamic INT8 quantization: to the Linear
+    layers in PyTorch for the torch backend, or to the exported graph for the
+    ONNX backend. Quantized weights are cached under ``cache_dir``.
+
+    ``shared_weights=True`` maps fp32 torch weights read-only from a
+    safetensors file under ``cache_dir``, so worker processes share them.
+
+    The ONNX backend returns no torch model: once the graph exists only the
+    processor is loaded, and the model loaded for an export is released.
+    """
+    if quantize not in (None, '', 'int8'):
+        raise ValueError(f"Unsupported quantization mode: {quantize}")
+
+    if shared_weights:
+        if backend_name == 'torch' and not quantize and str(device) == 'cpu':
+            from .shared_weights import load_shared_ctc_model
+
+            model, processor = load_shared_ctc_model(model_name, cache_dir)
+            return model, processor, TorchBackend(model, 'cpu')
+        logger.warning("Shared weights need the fp32 torch backend on CPU, loading a private copy")
+
+    if quantize and backend_name == 'torch':
+        from .quantization import load_quantized_ctc_model
+
+        if str(device) != 'cpu':
+            logger.warning("Dynamic INT8 quantization runs on CPU only, ignoring device")
+        model, processor = load_quantized_ctc_model(model_name, cache_dir)
+        return model, processor, TorchBackend(model, 'cpu')
+
+    if backend_name == 'onnx':
+        onnx_path = onnx_path or default_onnx_path(model_name, cache_dir)
+        if os.path.exists(onnx_path):
+            processor = load_processor(model_name)
+        else:
+            model, processor = load_ctc_model(model_name, device)
+            export_onnx(model, onnx_path)
+            del model
+        if quantize:
+            from .quantization import quantize_onnx_int8
+            onnx_path = quantize_onnx_int8(onnx_path)
+        backend = create_backend('onnx', onnx_path=onnx_path,
+                                 intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+        return None, processor, backend
+
+    model, processor = load_ctc_model(model_name, device)
+    backend = create_backend(backend_name, model=model, device=device, onnx_path=onnx_path,
+                             intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+    return model, processor, backend
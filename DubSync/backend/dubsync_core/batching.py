@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from .tracing import LatencyTracer
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects requests from many callers into batched calls of ``batch_fn``.
+
+    ``submit`` returns a ``concurrent.futures.Future`` right away, so
+    threads can block on ``result()`` and coroutines can await
+    ``asyncio.wrap_future``. A single dispatcher thread waits for the first
+    pending request, keeps collecting until ``max_batch_size`` requests are
+    pending or ``max_wait_s`` has passed since that first arrival, then calls
+    ``batch_fn`` once with the whole batch. ``batch_fn`` must return one
+    result per request, in order.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_s: float = 0.02, tracer: Optional[LatencyTracer] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_s
+        self.tracer = tracer or LatencyTracer()
+
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = Counter()
+        self._started_at = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, request: Any) -> Future:
+        """Queue one request; the future resolves to its result"""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((request, future, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_batch(self) -> list:
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return []
+            deadline = self._pending[0][2] + self.max_wait_s
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return  # closed and drained
+
+            now = time.monotonic()
+            for _, _, submitted_at in batch:
+                self.tracer.record('batch_wait', now - submitted_at)
+
+            try:
+                with self.tracer.span('batch_run'):
+                    results = self.batch_fn([request for request, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} requests")
+            except Exception as e:
+                logger.error(f"Error running batch of {len(batch)}: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] += 1
+
+    def stats(self) -> dict:
+        """Batch-size distribution, queue wait percentiles and throughput"""
+        elapsed = time.monotonic() - self._started_at
+        latency = self.tracer.summary()
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_s * 1000,
+            'pending': len(self._pending),
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'batch_sizes': {size: self.batch_sizes[size] for size in sorted(self.batch_sizes)},
+            'queue_wait': latency.get('batch_wait', {}),
+            'batch_run': latency.get('batch_run', {}),
+            'items_per_s': self.items / elapsed if elapsed > 0 else 0.0,
+        }
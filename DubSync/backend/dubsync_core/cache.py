@@ -0,0 +1,84 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+
+
+def chunk_key(session_id: str, chunk_number: int, language_code: str, sample_rate: int,
+              audio: np.ndarray) -> bytes:
+    """Digest identifying one chunk submission: same session, chunk, language and samples"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{session_id}\0{chunk_number}\0{language_code}\0{sample_rate}\0".encode('utf-8'))
+    digest.update(np.ascontiguousarray(audio))
+    return digest.digest()
+
+
+class ResultCache:
+    """Bounded LRU cache whose entries also expire ``ttl_s`` after they were stored.
+
+    Used to answer retried chunks without running the model again. ``get``
+    returns None on a miss or an expired entry, so None cannot be cached.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_s: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.clock = clock
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_s': self.ttl_s,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expired': self.expired,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,194 @@
+import json
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+# Batches a slow viewer may queue before they are merged into one message
+MAX_UNMERGED_BATCHES = 16
+
+
+def merge_updates(pending: OrderedDict, updates: Iterable[dict]) -> int:
+    """Merge caption updates into ``pending`` (chunk number -> update); returns how many were superseded.
+
+    A newer update of a chunk replaces the older one, except that a partial
+    never replaces the chunk's final.
+    """
+    superseded = 0
+    for update in updates:
+        chunk_number = update['chunk_number']
+        previous = pending.get(chunk_number)
+        if previous is not None:
+            superseded += 1
+            if previous['final'] and not update['final']:
+                continue
+        pending[chunk_number] = update
+    return superseded
+
+
+def captions_message(session_id: str, seq: Optional[int], updates: List[dict]) -> str:
+    return json.dumps({'type': 'captions', 'session_id': session_id, 'seq': seq, 'updates': updates},
+                      ensure_ascii=False)
+
+
+def snapshot_message(session_id: str, seq: Optional[int], captions: List[dict]) -> str:
+    return json.dumps({'type': 'caption_snapshot', 'session_id': session_id, 'seq': seq, 'captions': captions},
+                      ensure_ascii=False)
+
+
+class CaptionLog:
+    """A speaker's recent captions and the updates not yet published to viewers.
+
+    ``add`` records a partial or final caption. Updates are coalesced by
+    chunk number until ``take_batch``: a newer partial replaces an older one
+    and a final replaces its partials, so a batch holds one entry per
+    utterance however often results arrive. Each batch gets the next
+    sequence number. ``snapshot`` is the compact state a late joiner starts
+    from: the last ``max_finals`` final captions and the open partial, as of
+    the last batch taken.
+    """
+
+    def __init__(self, max_finals: int = 20):
+        self.max_finals = max(0, max_finals)
+        self.seq = 0
+
+        self._finals = OrderedDict()  # chunk_number -> final update, oldest first
+        self._partial = None
+        self._pending = OrderedDict()
+
+        self.updates_added = 0
+        self.updates_coalesced = 0
+
+    def add(self, chunk_number: int, transcription: str, final: bool = True, **fields):
+        update = {'chunk_number': chunk_number, 'transcription': transcription, 'final': final, **fields}
+        self.updates_added += 1
+        self.updates_coalesced += merge_updates(self._pending, [update])
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def take_batch(self) -> Optional[Tuple[int, List[dict]]]:
+        """Pending updates in chunk order with their sequence number, or None if there are none"""
+        if not self._pending:
+            return None
+        updates = sorted(self._pending.values(), key=lambda update: update['chunk_number'])
+        self._pending.clear()
+        for update in updates:
+            if not update['final']:
+                self._partial = update
+                continue
+            if self._partial is not None and self._partial['chunk_number'] <= update['chunk_number']:
+                self._partial = None
+            # An empty final only closes its partial
+            if update['transcription'] and self.max_finals:
+                self._finals.pop(update['chunk_number'], None)
+                self._finals[update['chunk_number']] = update
+                while len(self._finals) > self.max_finals:
+                    self._finals.popitem(last=False)
+        self.seq += 1
+        return self.seq, updates
+
+    def snapshot(self) -> Tuple[int, List[dict]]:
+        captions = list(self._finals.values())
+        if self._partial is not None:
+            captions.append(self._partial)
+        return self.seq, captions
+
+
+class CaptionFeed:
+    """One viewer's side of a session's captions: ordering, resync and coalescing.
+
+    Messages arrive from a publisher (one speaker connection) with increasing
+    sequence numbers and their client JSON already encoded. Until the first
+    snapshot, batches are held back. After it, a batch the snapshot already
+    covers is dropped. A gap, such as a batch the channel layer discarded for
+    a full viewer, makes ``on_batch`` ask for a fresh snapshot rather than a
+    replay. Snapshots go to every viewer of a session, so one a viewer in
+    sync with its publisher did not ask for is ignored. A new publisher (the
+    speaker reconnected) starts a new sequence.
+
+    Accepted messages wait in an outbox until ``next_message``. A viewer
+    that pulls the next message only once its previous send completed gets
+    one message whenever it can take one. Batches it fell behind on are
+    merged by chunk number, so it only sees the latest state of each
+    caption. A single waiting batch is passed on unchanged, without being
+    decoded or encoded again.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.publisher = None
+        self.seq = None
+        self.synced = False
+
+        self._held = []  # (publisher, seq, text) received before the snapshot
+        self._snapshot = None
+        self._texts = []  # accepted batches not yet merged
+        self._merged = OrderedDict()
+        self._merged_seq = None
+
+        self.batches_received = 0
+        self.batches_merged = 0
+        self.stale_batches = 0
+        self.resyncs = 0
+
+    def on_batch(self, publisher: str, seq: int, text: str) -> bool:
+        """Take in one published batch; returns True if a fresh snapshot is needed"""
+        self.batches_received += 1
+        if not self.synced:
+            self._held.append((publisher, seq, text))
+            return False
+        if publisher == self.publisher and self.seq is not None:
+            if seq <= self.seq:
+                self.stale_batches += 1
+                return False
+            if seq != self.seq + 1:
+                self.resyncs += 1
+                self.synced = False
+                self._held.append((publisher, seq, text))
+                return True
+        self.publisher = publisher
+        self.seq = seq
+        self._texts.append(text)
+        if len(self._texts) > MAX_UNMERGED_BATCHES:
+            self._merge_texts()
+        return False
+
+    def on_snapshot(self, publisher: Optional[str], seq: Optional[int], text: str) -> bool:
+        """Take in a snapshot: it replaces everything not yet sent; returns True if another is needed"""
+        if self.synced and publisher is not None and publisher == self.publisher:
+            return False
+        self.publisher = publisher
+        self.seq = seq
+        self.synced = True
+        self._snapshot = text
+        self._texts.clear()
+        self._merged.clear()
+
+        held, self._held = self._held, []
+        needs_snapshot = False
+        for batch in held:
+            self.batches_received -= 1  # counted when first held
+            needs_snapshot = self.on_batch(*batch) or needs_snapshot
+        return needs_snapshot
+
+    def _merge_texts(self):
+        for text in self._texts:
+            message = json.loads(text)
+            self.batches_merged += 1
+            merge_updates(self._merged, message['updates'])
+            self._merged_seq = message['seq']
+        self._texts.clear()
+
+    def next_message(self) -> Optional[str]:
+        """The next text to send to the client, or None when the outbox is empty"""
+        if self._snapshot is not None:
+            text, self._snapshot = self._snapshot, None
+            return text
+        if len(self._texts) == 1 and not self._merged:
+            return self._texts.pop()
+        if self._texts:
+            self._merge_texts()
+        if not self._merged:
+            return None
+        updates = sorted(self._merged.values(), key=lambda update: update['chunk_number'])
+        self._merged.clear()
+        return captions_message(self.session_id, self._merged_seq, updates)
@@ -0,0 +1,183 @@
+import logging
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .vad import SpeechSegmenter
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointChunker:
+    """Cuts a live audio stream into utterances instead of fixed-length chunks.
+
+    Audio is classified per VAD frame as it arrives. A segment opens on the
+    first speech frame (with a short pre-roll of the audio before it) and is
+    emitted once ``end_silence_s`` of trailing silence has been seen.
+    Segments shorter than ``min_segment_s`` of speech are discarded as
+    noise, and a segment reaching ``max_segment_s`` is force-flushed so long
+    utterances still produce regular results.
+
+    Segment storage is preallocated at ``max_segment_s``; emitted segments
+    are copies that the caller owns.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 end_silence_s: float = 0.5,
+                 min_segment_s: float = 0.3,
+                 max_segment_s: float = 8.0,
+                 preroll_s: float = 0.2,
+                 segmenter: Optional[SpeechSegmenter] = None):
+        self.segmenter = segmenter or SpeechSegmenter(sample_rate)
+        self.sample_rate = sample_rate
+        self.frame_size = self.segmenter.frame_size
+
+        def to_frames(seconds):
+            return max(1, int(round(seconds * sample_rate / self.frame_size)))
+
+        self.end_silence_frames = to_frames(end_silence_s)
+        self.min_speech_frames = to_frames(min_segment_s)
+        self.max_frames = to_frames(max_segment_s)
+        self.preroll = deque(maxlen=int(round(preroll_s * sample_rate / self.frame_size)))
+
+        self._segment = np.zeros(self.max_frames * self.frame_size, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._frames_seen = 0  # stream position, in whole frames
+        self._reset_segment()
+
+        self.segments_emitted = 0
+        self.forced_flushes = 0
+        self.segments_discarded = 0
+
+    def _reset_segment(self):
+        self._length = 0            # samples in self._segment
+        self._start = 0             # stream position of self._segment[0]
+        self._in_speech = False
+        self._speech_frames = 0
+        self._trailing_silence = 0  # frames
+
+    def _append(self, frame: np.ndarray):
+        self._segment[self._length:self._length + len(frame)] = frame
+        self._length += len(frame)
+
+    def _emit(self, keep: int) -> Optional[Tuple[int, np.ndarray]]:
+        """Close the current segment, keeping its first ``keep`` samples"""
+        segment = None
+        if self._speech_frames >= self.min_speech_frames:
+            segment = (self._start, self._segment[:keep].copy())
+            self.segments_emitted += 1
+        else:
+            self.segments_discarded += 1
+        next_start = self._start + self._length
+        self._reset_segment()
+        self._start = next_start
+        return segment
+
+    @property
+    def in_speech(self) -> bool:
+        """Whether an utterance is open: speech was seen and its endpoint not yet"""
+        return self._in_speech
+
+    def push(self, samples: np.ndarray) -> List[np.ndarray]:
+        """Add audio and return any utterances it completed"""
+        return [segment for _, segment in self.push_timed(samples)]
+
+    def push_timed(self, samples: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+        """Like ``push``, with each utterance's start position in samples"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        n_frames = len(samples) // self.frame_size
+        self._pending = samples[n_frames * self.frame_size:].copy()
+        if n_frames == 0:
+            return []
+
+        audio = samples[:n_frames * self.frame_size]
+        is_speech = self.segmenter.classify_frames(audio)
+
+        completed = []
+        for i in range(n_frames):
+            frame = audio[i * self.frame_size:(i + 1) * self.frame_size]
+            self._frames_seen += 1
+
+            if not self._in_speech:
+                if not is_speech[i]:
+                    self.preroll.append(frame.copy())
+                    continue
+                self._in_speech = True
+                self._start = (self._frames_seen - 1 - len(self.preroll)) * self.frame_size
+                for previous in self.preroll:
+                    self._append(previous)
+                self.preroll.clear()
+
+            self._append(frame)
+            if is_speech[i]:
+                self._speech_frames += 1
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+
+            if self._trailing_silence >= self.end_silence_frames:
+                # Endpoint: drop most of the trailing silence
+                tail = (self._trailing_silence - 1) * self.frame_size
+                segment = self._emit(self._length - tail)
+            elif self._length + self.frame_size > len(self._segment):
+                # Max length: flush now and keep listening in the same utterance
+                self.forced_flushes += 1
+                segment = self._emit(self._length)
+                self._in_speech = True
+            else:
+                continue
+
+            if segment is not None:
+                completed.append(segment)
+        return completed
+
+    def flush(self) -> List[np.ndarray]:
+        """Emit whatever utterance is in progress (e.g. when recording stops)"""
+        return [segment for _, segment in self.flush_timed()]
+
+    def flush_timed(self) -> List[Tuple[int, np.ndarray]]:
+        """Like ``flush``, with the utterance's start position in samples"""
+        if len(self._pending) and self._in_speech and self._length + len(self._pending) <= len(self._segment):
+            self._append(self._pending)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self.preroll.clear()
+
+        if not self._in_speech:
+            return []
+        keep = self._length - max(0, self._trailing_silence - 1) * self.frame_size
+        segment = self._emit(keep)
+        return [segment] if segment is not None else []
+
+    def stats(self) -> dict:
+        return {
+            'segments_emitted': self.segments_emitted,
+            'forced_flushes': self.forced_flushes,
+            'segments_discarded': self.segments_discarded,
+            'buffered_seconds': self._length / self.sample_rate,
+        }
+
+
+def iter_file_segments(path: str, chunker: EndpointChunker,
+                       block_seconds: float = 10.0) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield (start_sample, audio) utterances of an audio file without loading it whole.
+
+    The file is read block by block with soundfile, downmixed to mono and
+    resampled to the chunker's rate; filter state carries over between
+    blocks, so block edges leave no seams.
+    """
+    import soundfile as sf
+
+    from .resampling import StreamingResampler
+
+    with sf.SoundFile(path) as audio_file:
+        resampler = StreamingResampler(audio_file.samplerate, chunker.sample_rate)
+        blocksize = max(1, int(block_seconds * audio_file.samplerate))
+        for block in audio_file.blocks(blocksize=blocksize, dtype='float32', always_2d=True):
+            mono = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1)
+            yield from chunker.push_timed(resampler.process(mono))
+        yield from chunker.push_timed(resampler.flush())
+    yield from chunker.flush_timed()
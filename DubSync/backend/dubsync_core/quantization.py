@@ -0,0 +1,76 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_name(model_name: str) -> str:
+    return model_name.replace('/', '--')
+
+
+def quantize_dynamic_int8(model):
+    """Dynamic INT8 quantization of the model's Linear layers (CPU only)"""
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def torch_int8_cache_path(model_name: str, cache_dir: str) -> str:
+    import torch
+
+    # Packed INT8 weights are tied to the torch build that produced them
+    version = torch.__version__.split('+')[0]
+    return os.path.join(cache_dir, f"{_cache_name(model_name)}-int8-torch{version}.pt")
+
+
+def load_quantized_ctc_model(model_name: str, cache_dir: str):
+    """Load a dynamically quantized CTC model, reusing cached INT8 weights.
+
+    The first start loads the fp32 checkpoint, quantizes it and saves the
+    quantized state dict. Later starts build the quantized module structure
+    from the config alone and load the cached weights, skipping both the
+    fp32 weight load and the quantization pass.
+    """
+    import torch
+    from transformers import Wav2Vec2Config, Wav2Vec2ForCTC, Wav2Vec2Processor
+
+    processor = Wav2Vec2Processor.from_pretrained(model_name)
+    cache_path = torch_int8_cache_path(model_name, cache_dir)
+
+    if os.path.exists(cache_path):
+        logger.info(f"Loading cached INT8 weights from {cache_path}")
+        config = Wav2Vec2Config.from_pretrained(model_name)
+        try:
+            from transformers.modeling_utils import no_init_weights
+            with no_init_weights():
+                model = Wav2Vec2ForCTC(config)
+        except ImportError:
+            model = Wav2Vec2ForCTC(config)
+        model = quantize_dynamic_int8(model.eval())
+        model.load_state_dict(torch.load(cache_path, map_location='cpu'))
+        return model.eval(), processor
+
+    logger.info("Quantizing model to INT8 (first start, result will be cached)")
+    model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+    model = quantize_dynamic_int8(model)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, cache_path)
+    return model, processor
+
+
+def quantize_onnx_int8(onnx_path: str) -> str:
+    """Dynamic INT8 quantization of an exported ONNX model, cached next to it"""
+    quantized_path = os.path.splitext(onnx_path)[0] + '.int8.onnx'
+    if os.path.exists(quantized_path):
+        return quantized_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    logger.info(f"Quantizing {onnx_path} to INT8")
+    tmp_path = quantized_path + '.tmp'
+    quantize_dynamic(onnx_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, quantized_path)
+    return quantized_path
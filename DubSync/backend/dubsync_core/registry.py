@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def component_nbytes(component: Any) -> int:
+    """Approximate resident size of a loaded component.
+
+    Understands numpy arrays, torch modules and tensors, objects with an
+    ``nbytes`` attribute, and dicts, lists and tuples of those.
+    """
+    if component is None:
+        return 0
+    if isinstance(component, np.ndarray):
+        return component.nbytes
+    if isinstance(component, dict):
+        return sum(component_nbytes(value) for value in component.values())
+    if isinstance(component, (list, tuple)):
+        return sum(component_nbytes(value) for value in component)
+    if hasattr(component, 'parameters') and hasattr(component, 'buffers'):
+        tensors = list(component.parameters()) + list(component.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    if hasattr(component, 'numel') and hasattr(component, 'element_size'):
+        return component.numel() * component.element_size()
+    nbytes = getattr(component, 'nbytes', 0)
+    return nbytes if isinstance(nbytes, int) else 0
+
+
+class LanguageRegistry:
+    """Lazily loaded per-language components kept under a memory budget.
+
+    ``get`` returns the component for a language, calling ``loader`` on the
+    first request. Concurrent requests for the same language share one load.
+    Components are kept in least-recently-used order. After each load the
+    least recently used ones are evicted until the resident total fits
+    ``budget_bytes``; the component just loaded is never evicted, even if it
+    alone exceeds the budget. A caller still holding an evicted component
+    can keep using it, it is just no longer cached.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], budget_bytes: Optional[int] = None,
+                 size_fn: Callable[[Any], int] = component_nbytes):
+        self.loader = loader
+        self.budget_bytes = budget_bytes
+        self.size_fn = size_fn
+
+        self._resident = OrderedDict()  # language -> (component, nbytes)
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._prefetcher = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, language: str) -> Any:
+        with self._lock:
+            entry = self._resident.get(language)
+            if entry is not None:
+                self._resident.move_to_end(language)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            future = self._loading.get(language)
+            owner = future is None
+            if owner:
+                future = self._loading[language] = Future()
+
+        if owner:
+            self._load(language, future)
+        return future.result()
+
+    def _load(self, language: str, future: Future):
+        start = time.perf_counter()
+        try:
+            component = self.loader(language)
+            nbytes = self.size_fn(component)
+        except Exception as e:
+            logger.error(f"Error loading components for {language}: {e}")
+            with self._lock:
+                del self._loading[language]
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self.load_seconds += time.perf_counter() - start
+            self._resident[language] = (component, nbytes)
+            del self._loading[language]
+            self._evict(keep=language)
+        logger.info(f"Loaded components for {language} ({nbytes / 2**20:.1f} MB)")
+        future.set_result(component)
+
+    def _evict(self, keep: str):
+        if self.budget_bytes is None:
+            return
+        while self.resident_bytes > self.budget_bytes and len(self._resident) > 1:
+            language = next(iter(self._resident))
+            if language == keep:
+                break
+            del self._resident[language]
+            self.evictions += 1
+            logger.info(f"Evicted components for {language}")
+
+    def prefetch(self, language: str) -> Future:
+        """Load ``language`` in the background if it is not resident yet"""
+        with self._lock:
+            if language in self._resident:
+                future = Future()
+                future.set_result(self._resident[language][0])
+                return future
+            if self._prefetcher is None:
+                self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='language-prefetch')
+        return self._prefetcher.submit(self.get, language)
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._resident
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._resident.values())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            resident = {language: nbytes for language, (_, nbytes) in self._resident.items()}
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'load_seconds': self.load_seconds,
+            'resident': list(resident),
+            'resident_bytes': sum(resident.values()),
+            'budget_bytes': self.budget_bytes,
+        }
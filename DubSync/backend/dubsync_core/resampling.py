@@ -0,0 +1,148 @@
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MODEL_SAMPLE_RATE = 16000
+
+# Capture rates accepted from clients. Filter banks grow with the rates'
+# reduced ratio, so arbitrary rates are not resampled on request.
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000)
+
+# Outputs computed per row of the resampling matmul (rounded up to whole
+# filter periods). Longer rows waste more multiplications on zeros; shorter
+# ones make the matmul too thin to be fast.
+OUTPUTS_PER_ROW = 32
+
+
+@lru_cache(maxsize=32)
+def polyphase_bank(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Filter bank for resampling by ``up / down``, and its delay in upsampled samples.
+
+    The lowpass is the Kaiser-windowed FIR scipy.signal.resample_poly uses,
+    split into ``up`` phases of equal length. Each phase is stored reversed,
+    so an output sample is one dot product with a window of input samples.
+    Banks are built once per rate pair and shared by every resampler.
+    """
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * up
+    taps = np.concatenate((taps, np.zeros(-len(taps) % up)))
+    bank = taps.reshape(-1, up).T[:, ::-1]  # bank[p, -1 - m] = taps[p + m * up]
+    return np.ascontiguousarray(bank, dtype=np.float32), half_len
+
+
+@lru_cache(maxsize=32)
+def row_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Banded matrix that resamples one row of input into one row of outputs, and the row stride.
+
+    A row holds whole filter periods (``up`` outputs each), so every row
+    uses the same phases and the same matrix: output ``o`` of the row is
+    the window at ``offset[o]`` times phase ``(o * down + delay) % up``.
+    Consecutive rows start ``row_stride`` input samples apart.
+    """
+    bank, delay = polyphase_bank(up, down)
+    taps = bank.shape[1]
+    per_row = up * -(-OUTPUTS_PER_ROW // up)
+    t = np.arange(per_row) * down + delay
+    offsets = t // up - delay // up
+    matrix = np.zeros((int(offsets[-1]) + taps, per_row), dtype=np.float32)
+    for o in range(per_row):
+        matrix[offsets[o]:offsets[o] + taps, o] = bank[t[o] % up]
+    return matrix, per_row // up * down
+
+
+class StreamingResampler:
+    """Polyphase resampler that carries its filter state from one chunk to the next.
+
+    ``process`` returns every output sample whose input is complete, so
+    feeding a stream chunk by chunk gives the same samples as resampling it
+    in one piece: no clicks or gaps at chunk boundaries. The last few
+    milliseconds stay in the filter until ``flush``. Input may have leading
+    batch dimensions, ``(..., samples)``; each row is resampled
+    independently and must keep the same shape from chunk to chunk.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int = MODEL_SAMPLE_RATE):
+        common = gcd(source_rate, target_rate)
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.up = target_rate // common
+        self.down = source_rate // common
+        self.bank, self.delay = polyphase_bank(self.up, self.down) if self.up != self.down else (None, 0)
+        self.rows, self.row_stride = row_filter(self.up, self.down) if self.up != self.down else (None, 0)
+        self.reset()
+
+    def reset(self):
+        self._history = None  # input samples still needed by later outputs
+        self._history_start = 0  # stream index of _history[..., 0]
+        self._consumed = 0  # input samples seen
+        self._produced = 0  # output samples returned
+
+    def _ready(self, available: int) -> int:
+        """Number of outputs whose newest input sample index is below ``available``"""
+        return max(0, (available * self.up - 1 - self.delay) // self.down + 1)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.up == self.down:
+            return samples
+        taps = self.bank.shape[1]
+        if self._history is None:
+            # Silence before the stream start, as resample_poly assumes
+            self._history = np.zeros(samples.shape[:-1] + (taps - 1,), dtype=np.float32)
+            self._history_start = -(taps - 1)
+        buffer = np.concatenate((self._history, samples), axis=-1)
+        self._consumed += samples.shape[-1]
+        return self._run(buffer, self._ready(self._consumed))
+
+    def flush(self) -> np.ndarray:
+        """Return the outputs still held back by the filter delay"""
+        if self._history is None:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._consumed * self.up // self.down)
+        pad = np.zeros(self._history.shape[:-1] + (self.delay // self.up + self.bank.shape[1],), dtype=np.float32)
+        out = self._run(np.concatenate((self._history, pad), axis=-1), total)
+        self.reset()
+        return out
+
+    def _run(self, buffer: np.ndarray, end: int) -> np.ndarray:
+        start = self._produced
+        taps = self.bank.shape[1]
+        out = np.empty(buffer.shape[:-1] + (max(0, end - start),), dtype=np.float32)
+        if end > start:
+            # Output n uses inputs (t // up - taps + 1 .. t // up), t = n * down + delay.
+            # Whole rows of outputs are computed with one strided view and one
+            # matmul; the outputs before ``start`` and after ``end`` are dropped
+            row_len, per_row = self.rows.shape
+            first_row, rows = start // per_row, -(-end // per_row) - start // per_row
+            lo = first_row * self.row_stride + self.delay // self.up - taps + 1 - self._history_start
+            hi = lo + (rows - 1) * self.row_stride + row_len
+            # Inputs of dropped outputs may lie outside the buffer
+            pad = (max(0, -lo), max(0, hi - buffer.shape[-1]))
+            padded = np.pad(buffer, [(0, 0)] * (buffer.ndim - 1) + [pad]) if any(pad) else buffer
+            windows = sliding_window_view(padded[..., lo + pad[0]:hi + pad[0]], row_len, axis=-1)
+            # Rows overlap, so the view is copied before the matmul can use BLAS
+            rows_out = np.ascontiguousarray(windows[..., ::self.row_stride, :]) @ self.rows
+            skip = start - first_row * per_row
+            out[...] = rows_out.reshape(buffer.shape[:-1] + (-1,))[..., skip:skip + end - start]
+            self._produced = end
+
+        # Keep only the inputs later outputs still read
+        t_next = end * self.down + self.delay
+        keep_from = t_next // self.up - taps + 1
+        self._history = buffer[..., keep_from - self._history_start:].copy()
+        self._history_start = keep_from
+        return out
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = MODEL_SAMPLE_RATE) -> np.ndarray:
+    """Resample a complete signal (or a batch of equal-length signals on the last axis)"""
+    if source_rate == target_rate:
+        return np.asarray(samples, dtype=np.float32)
+    resampler = StreamingResampler(source_rate, target_rate)
+    return np.concatenate((resampler.process(samples), resampler.flush()), axis=-1)
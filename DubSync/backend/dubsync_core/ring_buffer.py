@@ -0,0 +1,123 @@
+import threading
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 ring buffer for real-time audio capture.
+
+    Designed for one producer (the PortAudio callback) and one or more
+    consumers. Storage is allocated once; writes and reads work on NumPy
+    slices so no per-sample Python objects are created.
+
+    Chunks handed out by ``pop_chunk`` are read-only views into the buffer.
+    Their memory is not reused until the consumer calls ``release`` with the
+    returned ticket, so a slow worker can never see its chunk overwritten.
+    Writes that do not fit are counted as overflows instead of silently
+    discarding older audio.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=dtype)
+        self._lock = threading.Lock()
+
+        # Monotonic sample counters; positions in the array are counter % capacity
+        self._write_pos = 0    # next sample to be written
+        self._read_pos = 0     # next sample to be handed out
+        self._release_pos = 0  # everything before this may be overwritten
+        self._pending = {}     # ticket start -> ticket end, released out of order
+
+        self.overflow_events = 0
+        self.overflow_samples = 0
+        self.wrapped_reads = 0
+
+    def __len__(self) -> int:
+        """Number of samples written but not yet handed out"""
+        return self._write_pos - self._read_pos
+
+    @property
+    def free_space(self) -> int:
+        return self.capacity - (self._write_pos - self._release_pos)
+
+    def write(self, samples: np.ndarray) -> int:
+        """Copy samples into the buffer, returning how many were dropped"""
+        samples = np.asarray(samples).reshape(-1)
+        with self._lock:
+            free = self.capacity - (self._write_pos - self._release_pos)
+            dropped = max(0, len(samples) - free)
+            if dropped:
+                self.overflow_events += 1
+                self.overflow_samples += dropped
+                samples = samples[:free]
+
+            n = len(samples)
+            if n:
+                start = self._write_pos % self.capacity
+                first = min(n, self.capacity - start)
+                self._buffer[start:start + first] = samples[:first]
+                if first < n:
+                    self._buffer[:n - first] = samples[first:]
+                self._write_pos += n
+
+        if dropped:
+            logger.warning(f"Audio ring buffer overflow: dropped {dropped} samples")
+        return dropped
+
+    def pop_chunk(self, size: int) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """Hand out the next ``size`` samples as ``(chunk, ticket)``.
+
+        Returns None if fewer than ``size`` samples are buffered. The chunk is
+        a zero-copy view unless it straddles the end of the storage, in which
+        case it is copied. Pass the ticket to ``release`` once done with it.
+        """
+        with self._lock:
+            if self._write_pos - self._read_pos < size:
+                return None
+
+            start = self._read_pos % self.capacity
+            if start + size <= self.capacity:
+                chunk = self._buffer[start:start + size]
+                chunk.flags.writeable = False
+            else:
+                first = self.capacity - start
+                chunk = np.concatenate((self._buffer[start:], self._buffer[:size - first]))
+                self.wrapped_reads += 1
+
+            ticket = (self._read_pos, self._read_pos + size)
+            self._read_pos += size
+            return chunk, ticket
+
+    def release(self, ticket: Tuple[int, int]):
+        """Return a chunk's storage to the writer.
+
+        Tickets may be released in any order; space is reclaimed once every
+        earlier chunk has been released as well.
+        """
+        with self._lock:
+            start, end = ticket
+            self._pending[start] = end
+            while self._release_pos in self._pending:
+                self._release_pos = self._pending.pop(self._release_pos)
+
+    def clear(self):
+        """Drop buffered audio and forget outstanding tickets"""
+        with self._lock:
+            self._write_pos = self._read_pos = self._release_pos = 0
+            self._pending.clear()
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'buffered': len(self),
+            'free': self.free_space,
+            'overflow_events': self.overflow_events,
+            'overflow_samples': self.overflow_samples,
+            'wrapped_reads': self.wrapped_reads,
+        }
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+
+class ChunkItem:
+    """An audio chunk waiting for transcription"""
+
+    __slots__ = ('audio', 'tickets', 'captured_at', 'seq')
+
+    def __init__(self, audio: np.ndarray, tickets: Optional[list] = None, captured_at: Optional[float] = None):
+        self.audio = audio
+        self.tickets = tickets or []  # ring buffer tickets to release when done
+        self.captured_at = time.monotonic() if captured_at is None else captured_at
+        self.seq = None               # assigned when a worker takes the chunk
+
+
+class BoundedChunkQueue:
+    """Bounded FIFO of ChunkItems with a selectable overload policy.
+
+    - ``block``: the producer waits (up to its timeout) for space.
+    - ``drop_oldest``: the oldest pending chunk is discarded to make room.
+    - ``merge``: the new chunk is appended to the newest pending one, so the
+      backlog is processed in fewer, longer inference calls. Once a merged
+      chunk reaches ``max_merge_samples`` the queue falls back to dropping
+      the oldest chunk.
+
+    Sequence numbers are assigned in ``get``, i.e. in capture order, so
+    dropped and merged chunks never leave gaps for the resequencer.
+    """
+
+    POLICIES = ('block', 'drop_oldest', 'merge')
+
+    def __init__(self, maxsize: int, policy: str = 'block', max_merge_samples: Optional[int] = None,
+                 release: Optional[Callable[[Any], None]] = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.max_merge_samples = max_merge_samples
+        self.release = release  # called with each ticket of discarded or copied chunks
+
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._next_seq = 0
+
+        self.dropped = 0
+        self.merged = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    def _release(self, item: ChunkItem):
+        if self.release is not None:
+            for ticket in item.tickets:
+                self.release(ticket)
+        item.tickets = []
+
+    def put(self, item: ChunkItem, timeout: Optional[float] = None) -> bool:
+        """Queue a chunk; returns False if it was rejected under ``block``.
+
+        Rejected chunks still belong to the caller, who must release them.
+        """
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                if self.policy == 'block':
+                    if not self._condition.wait_for(lambda: len(self._items) < self.maxsize, timeout):
+                        self.dropped += 1
+                        return False
+                elif self.policy == 'merge' and self._can_merge(item):
+                    tail = self._items[-1]
+                    tail.audio = np.concatenate((tail.audio, item.audio))
+                    # The merged audio is a copy, so both chunks' storage is free again
+                    self._release(tail)
+                    self._release(item)
+                    self.merged += 1
+                    return True
+                else:
+                    self._release(self._items.popleft())
+                    self.dropped += 1
+
+            self._items.append(item)
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._condition.notify()
+            return True
+
+    def _can_merge(self, item: ChunkItem) -> bool:
+        if self.max_merge_samples is None:
+            return True
+        return len(self._items[-1].audio) + len(item.audio) <= self.max_merge_samples
+
+    def get(self, timeout: Optional[float] = None) -> Optional[ChunkItem]:
+        """Take the oldest chunk and stamp its sequence number, or None on timeout"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._items) > 0, timeout):
+                return None
+            item = self._items.popleft()
+            item.seq = self._next_seq
+            self._next_seq += 1
+            self._condition.notify_all()
+            return item
+
+    def clear(self):
+        """Discard pending chunks and restart sequence numbering"""
+        with self._condition:
+            while self._items:
+                self._release(self._items.popleft())
+            self._next_seq = 0
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            'depth': len(self._items),
+            'max_depth': self.max_depth,
+            'capacity': self.maxsize,
+            'policy': self.policy,
+            'dropped': self.dropped,
+            'merged': self.merged,
+        }
+
+
+class Resequencer:
+    """Releases results in sequence order when workers finish out of order"""
+
+    def __init__(self, start: int = 0):
+        self._next = start
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def push(self, seq: int, result: Any) -> List[Any]:
+        """Add one result and return every result that is now in order"""
+        with self._lock:
+            self._pending[seq] = result
+            ready = []
+            while self._next in self._pending:
+                ready.append(self._pending.pop(self._next))
+                self._next += 1
+            return ready
+
+    def reset(self, start: int = 0):
+        with self._lock:
+            self._next = start
+            self._pending.clear()
+
+    @property
+    def waiting(self) -> int:
+        """Results held back behind a slower earlier chunk"""
+        return len(self._pending)
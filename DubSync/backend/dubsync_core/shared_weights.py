@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import struct
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# safetensors dtype names for the numpy dtypes model weights come in
+DTYPES = {
+    'F64': np.dtype('<f8'),
+    'F32': np.dtype('<f4'),
+    'F16': np.dtype('<f2'),
+    'I64': np.dtype('<i8'),
+    'I32': np.dtype('<i4'),
+    'I16': np.dtype('<i2'),
+    'I8': np.dtype('i1'),
+    'U8': np.dtype('u1'),
+    'BOOL': np.dtype('?'),
+}
+DTYPE_NAMES = {dtype: name for name, dtype in DTYPES.items()}
+
+# The data section starts 8-byte aligned (the safetensors convention)
+ALIGNMENT = 8
+
+
+def save_shared_weights(tensors: Dict[str, np.ndarray], path: str,
+                        metadata: Optional[Dict[str, str]] = None) -> str:
+    """Write ``tensors`` as a safetensors file that ``map_shared_weights`` can map.
+
+    Tensors are laid out back to back, widest dtype first, so each one
+    starts aligned to its element size. The file is written next to ``path``
+    and renamed into place, so worker processes starting at the same time
+    never map a partial file. ``metadata`` (strings only) goes into the
+    header's ``__metadata__``.
+    """
+    header = {}
+    if metadata:
+        header['__metadata__'] = {key: str(value) for key, value in metadata.items()}
+    offset = 0
+    arrays = []
+    for name, array in sorted(tensors.items(), key=lambda item: -item[1].dtype.itemsize):
+        array = np.ascontiguousarray(array)
+        dtype_name = DTYPE_NAMES.get(array.dtype.newbyteorder('<'))
+        if dtype_name is None:
+            raise ValueError(f"Unsupported dtype for {name}: {array.dtype}")
+        header[name] = {
+            'dtype': dtype_name,
+            'shape': list(array.shape),
+            'data_offsets': [offset, offset + array.nbytes],
+        }
+        arrays.append(array.astype(DTYPES[dtype_name], copy=False))
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    # Pad with spaces (valid JSON whitespace) so the data section starts aligned
+    header_bytes += b' ' * (-(8 + len(header_bytes)) % ALIGNMENT)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for array in arrays:
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_header(path: str):
+    with open(path, 'rb') as f:
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        return header_size, json.loads(f.read(header_size))
+
+
+def read_shared_weights_metadata(path: str) -> Dict[str, str]:
+    """The ``__metadata__`` of a safetensors file, empty if it has none"""
+    return _read_header(path)[1].get('__metadata__', {})
+
+
+def map_shared_weights(path: str) -> Dict[str, np.ndarray]:
+    """Map a safetensors file read-only; every tensor is a view into the file.
+
+    The pages live in the OS page cache, so any number of processes mapping
+    the same file share one physical copy of the weights.
+    """
+    header_size, header = _read_header(path)
+    header.pop('__metadata__', None)
+
+    data_start = 8 + header_size
+    if not header:
+        return {}
+    mapped = np.memmap(path, dtype=np.uint8, mode='r', offset=data_start)
+    tensors = {}
+    for name, info in header.items():
+        dtype = DTYPES.get(info['dtype'])
+        if dtype is None:
+            raise ValueError(f"Unsupported dtype for {name}: {info['dtype']}")
+        start, end = info['data_offsets']
+        tensors[name] = mapped[start:end].view(dtype).reshape(info['shape'])
+    return tensors
+
+
+def shared_weights_path(model_name: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, model_name.replace('/', '--') + '.safetensors')
+
+
+def checkpoint_revision(model_name: str, config) -> Optional[str]:
+    """Identify the checkpoint's weights: the Hub commit hash, or file sizes and mtimes of a local directory"""
+    if os.path.isdir(model_name):
+        stamps = []
+        for name in sorted(os.listdir(model_name)):
+            if name.endswith(('.bin', '.safetensors')):
+                stat = os.stat(os.path.join(model_name, name))
+                stamps.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        return ';'.join(stamps) or None
+    return getattr(config, '_commit_hash', None)
+
+
+def load_shared_ctc_model(model_name: str, cache_dir: str):
+    """Load a CTC model whose parameters alias a memory-mapped weights file.
+
+    The first process to start exports the checkpoint's state dict to
+    ``cache_dir``, recording the checkpoint revision in the file's metadata.
+    A file from another revision is exported again. Every process then
+    builds the module structure from the config alone and assigns the mapped
+    tensors as its parameters, so N workers hold one copy of the weights
+    between them instead of N.
+    """
+    import torch
+    from transformers import Wav2Vec2Config, Wav2Vec2ForCTC, Wav2Vec2Processor
+
+    processor = Wav2Vec2Processor.from_pretrained(model_name)
+    config = Wav2Vec2Config.from_pretrained(model_name)
+    revision = checkpoint_revision(model_name, config)
+    path = shared_weights_path(model_name, cache_dir)
+
+    export = not os.path.exists(path)
+    if not export:
+        cached = read_shared_weights_metadata(path).get('revision')
+        if revision is None:
+            logger.warning(f"Unknown revision of {model_name}, using shared weights {path} unchecked")
+        elif cached != revision:
+            logger.info(f"Shared weights {path} are from revision {cached}, not {revision}")
+            export = True
+
+    if export:
+        logger.info(f"Exporting shared weights to {path}")
+        model = Wav2Vec2ForCTC.from_pretrained(model_name)
+        save_shared_weights({name: tensor.detach().cpu().numpy()
+                             for name, tensor in model.state_dict().items()}, path,
+                            metadata={'model': model_name, 'revision': revision or ''})
+        del model
+
+    logger.info(f"Mapping shared weights from {path}")
+    try:
+        from transformers.modeling_utils import no_init_weights
+        with no_init_weights():
+            model = Wav2Vec2ForCTC(config)
+    except ImportError:
+        model = Wav2Vec2ForCTC(config)
+
+    with warnings.catch_warnings():
+        # The mapping is read-only; inference never writes to the weights
+        warnings.filterwarnings('ignore', message='The given NumPy array is not writable')
+        state_dict = {name: torch.from_numpy(array) for name, array in map_shared_weights(path).items()}
+    model.load_state_dict(state_dict, assign=True)
+    model.requires_grad_(False)
+    return model.eval(), processor
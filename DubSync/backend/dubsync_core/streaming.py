@@ -0,0 +1,237 @@
+import logging
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Wav2Vec2 / Conformer CTC encoders emit one frame per 20 ms at 16 kHz
+DEFAULT_SAMPLES_PER_FRAME = 320
+# Samples one frame reads: wav2vec2's conv front end emits (N - 400) // 320 + 1 frames
+DEFAULT_RECEPTIVE_FIELD = 400
+
+
+def ctc_collapse(frame_ids: np.ndarray, blank_id: int, prev_id: Optional[int] = None) -> np.ndarray:
+    """Greedy CTC collapse: merge repeated ids, then drop blanks.
+
+    ``prev_id`` is the last frame id of the previous segment, so a token that
+    spans a segment boundary is not emitted twice.
+    """
+    frame_ids = np.asarray(frame_ids, dtype=np.int64)
+    if len(frame_ids) == 0:
+        return frame_ids
+    keep = np.empty(len(frame_ids), dtype=bool)
+    keep[0] = prev_id is None or frame_ids[0] != prev_id
+    keep[1:] = frame_ids[1:] != frame_ids[:-1]
+    collapsed = frame_ids[keep]
+    return collapsed[collapsed != blank_id]
+
+
+class CTCStitcher:
+    """Turns a stream of per-frame logits into CTC tokens across segment boundaries"""
+
+    def __init__(self, blank_id: int = 0):
+        self.blank_id = blank_id
+        self._prev_id = None
+
+    def push(self, logits: np.ndarray) -> np.ndarray:
+        """Return the token ids completed by these frames"""
+        if len(logits) == 0:
+            return np.empty(0, dtype=np.int64)
+        frame_ids = np.argmax(logits, axis=-1)
+        tokens = ctc_collapse(frame_ids, self.blank_id, self._prev_id)
+        self._prev_id = int(frame_ids[-1])
+        return tokens
+
+    def peek(self, logits: np.ndarray) -> np.ndarray:
+        """Token ids these frames would add, without consuming them"""
+        if len(logits) == 0:
+            return np.empty(0, dtype=np.int64)
+        return ctc_collapse(np.argmax(logits, axis=-1), self.blank_id, self._prev_id)
+
+    def reset(self):
+        self._prev_id = None
+
+
+class SlidingWindowStreamer:
+    """Runs a CTC model on overlapping windows and keeps only the centre frames.
+
+    Each step advances by ``hop_s`` of new audio. The model sees
+    ``left_context_s`` of already-processed audio before that hop and
+    ``right_context_s`` of look-ahead after it, so the window length is
+    ``left + hop + right`` while the added latency is only ``hop + right``.
+    Frames computed for the context regions are discarded; the centre frames
+    of consecutive windows tile the stream exactly and can be merged before
+    CTC decoding.
+
+    ``logits_fn`` maps a 1-D float32 array to a ``(frames, vocab)`` array.
+    A frame reads ``receptive_field`` samples, more than its stride, so a
+    window whose audio ends at its last centre frame (no right context, or
+    the end of the stream in ``peek`` and ``flush``) is zero-padded by the
+    overhang; otherwise the encoder would emit one frame too few.
+    """
+
+    def __init__(self, logits_fn: Callable[[np.ndarray], np.ndarray],
+                 sample_rate: int = 16000,
+                 hop_s: float = 1.0,
+                 left_context_s: float = 1.0,
+                 right_context_s: float = 0.5,
+                 samples_per_frame: int = DEFAULT_SAMPLES_PER_FRAME,
+                 receptive_field: int = DEFAULT_RECEPTIVE_FIELD):
+        self.logits_fn = logits_fn
+        self.sample_rate = sample_rate
+        self.samples_per_frame = samples_per_frame
+        self.overhang = max(0, receptive_field - samples_per_frame)
+
+        # Snap everything to whole encoder frames so centres line up exactly
+        def to_samples(seconds):
+            return int(round(seconds * sample_rate / samples_per_frame)) * samples_per_frame
+
+        self.hop = to_samples(hop_s)
+        self.left_context = to_samples(left_context_s)
+        self.right_context = to_samples(right_context_s)
+        if self.hop <= 0:
+            raise ValueError("hop must be at least one encoder frame")
+        if self.left_context < 0 or self.right_context < 0:
+            raise ValueError("context lengths must not be negative")
+
+        self.reset()
+
+    @property
+    def window(self) -> int:
+        """Window length in samples"""
+        return self.left_context + self.hop + self.right_context
+
+    @property
+    def latency_s(self) -> float:
+        """Audio that must arrive after a sample before its frames are final"""
+        return (self.hop + self.right_context) / self.sample_rate
+
+    def reset(self):
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._audio_start = 0   # stream position of self._audio[0]
+        self._next_center = 0   # stream position of the next centre to emit
+        self.windows_run = 0
+
+    def _stream_end(self) -> int:
+        return self._audio_start + len(self._audio)
+
+    def _run_window(self, center: int, center_end: int) -> np.ndarray:
+        start = max(self._audio_start, center - self.left_context)
+        end = min(self._stream_end(), center_end + self.right_context)
+        window = self._audio[start - self._audio_start:end - self._audio_start]
+        pad = center_end + self.overhang - end
+        if pad > 0:
+            window = np.concatenate((window, np.zeros(pad, dtype=np.float32)))
+        logits = self.logits_fn(window)
+        self.windows_run += 1
+
+        first = (center - start) // self.samples_per_frame
+        last = first + (center_end - center) // self.samples_per_frame
+        return logits[first:min(last, len(logits))]
+
+    def _trim(self):
+        keep_from = max(self._audio_start, self._next_center - self.left_context)
+        if keep_from > self._audio_start:
+            self._audio = self._audio[keep_from - self._audio_start:]
+            self._audio_start = keep_from
+
+    def accept(self, samples: np.ndarray) -> np.ndarray:
+        """Add audio and return the centre logits that are now final"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self._audio = np.concatenate((self._audio, samples))
+
+        outputs = []
+        while self._next_center + self.hop + self.right_context <= self._stream_end():
+            outputs.append(self._run_window(self._next_center, self._next_center + self.hop))
+            self._next_center += self.hop
+        self._trim()
+
+        return np.concatenate(outputs) if outputs else np.zeros((0, 0), dtype=np.float32)
+
+    def peek(self) -> np.ndarray:
+        """Provisional logits for the pending audio; they may change once more audio arrives.
+
+        The pending audio is shorter than ``hop + right_context``, so it is
+        run as one window with left context and no look-ahead.
+        """
+        pending_frames = (self._stream_end() - self._next_center) // self.samples_per_frame
+        center_end = self._next_center + pending_frames * self.samples_per_frame
+        if center_end <= self._next_center:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._run_window(self._next_center, center_end)
+
+    def flush(self) -> np.ndarray:
+        """Process the remaining audio with whatever right context exists"""
+        outputs = []
+        while self._next_center < self._stream_end():
+            center_end = min(self._next_center + self.hop, self._stream_end())
+            if center_end - self._next_center < self.samples_per_frame:
+                break
+            outputs.append(self._run_window(self._next_center, center_end))
+            self._next_center = center_end
+        self._trim()
+
+        return np.concatenate(outputs) if outputs else np.zeros((0, 0), dtype=np.float32)
+
+
+class IncrementalDecoder:
+    """Interim CTC hypotheses for a growing utterance, without re-running the model on old audio.
+
+    Audio goes through a SlidingWindowStreamer; its final centre frames are
+    collapsed into committed tokens as they become available and are never
+    computed again. ``hypothesis`` adds a provisional decode of the pending
+    tail (at most ``hop + right_context`` of audio, plus left context), so an
+    interim result costs one window however long the utterance is.
+    ``finish`` decodes the tail for good and resets for the next utterance.
+
+    ``decode_fn`` maps collapsed token ids to text.
+    """
+
+    def __init__(self, streamer: SlidingWindowStreamer, decode_fn: Callable[[np.ndarray], str],
+                 blank_id: int = 0):
+        self.streamer = streamer
+        self.decode_fn = decode_fn
+        self.stitcher = CTCStitcher(blank_id)
+        self.reset()
+
+    def reset(self):
+        self.streamer.reset()
+        self.stitcher.reset()
+        self._tokens = []  # committed token arrays, in stream order
+        self.samples = 0
+
+    def accept(self, samples: np.ndarray):
+        """Add audio, committing the tokens of every centre that became final"""
+        self._tokens.append(self.stitcher.push(self.streamer.accept(samples)))
+        self.samples += len(samples)
+
+    def _text(self, tokens: list) -> str:
+        tokens = np.concatenate(tokens) if tokens else np.empty(0, dtype=np.int64)
+        return self.decode_fn(tokens) if len(tokens) else ""
+
+    def hypothesis(self) -> str:
+        """Committed text plus the current guess for the pending tail"""
+        return self._text(self._tokens + [self.stitcher.peek(self.streamer.peek())])
+
+    def finish(self) -> str:
+        """Final text of the utterance"""
+        text = self._text(self._tokens + [self.stitcher.push(self.streamer.flush())])
+        self.reset()
+        return text
+
+
+def transcribe_windowed(audio: np.ndarray,
+                        logits_fn: Callable[[np.ndarray], np.ndarray],
+                        decode_fn: Callable[[np.ndarray], str],
+                        blank_id: int = 0,
+                        **streamer_kwargs) -> str:
+    """Transcribe a whole array with overlapping windows and one CTC decode.
+
+    ``decode_fn`` maps collapsed token ids to text.
+    """
+    streamer = SlidingWindowStreamer(logits_fn, **streamer_kwargs)
+    stitcher = CTCStitcher(blank_id)
+    tokens = [stitcher.push(streamer.accept(audio)), stitcher.push(streamer.flush())]
+    tokens = np.concatenate(tokens)
+    return decode_fn(tokens) if len(tokens) else ""
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class _Span:
+    """Times one ``with`` block and records it on exit"""
+
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer: 'LatencyTracer', name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class LatencyTracer:
+    """Per-stage latency spans aggregated into rolling percentiles.
+
+    Each stage keeps its last ``window`` durations in a fixed-size deque, so
+    recording is an append and percentiles are only computed when
+    ``summary`` is called. When disabled, ``span`` returns a shared no-op
+    context manager and ``record`` returns immediately.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = 1000, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        """Context manager that records the duration of its block under ``name``"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float):
+        """Record one duration in seconds"""
+        if not self.enabled:
+            return
+        samples = self._samples.get(name)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(name, deque(maxlen=self.window))
+        samples.append(seconds)
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def record_since(self, name: str, start: Optional[float]):
+        """Record the time elapsed since a ``time.monotonic()`` timestamp"""
+        if start is not None:
+            self.record(name, time.monotonic() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Rolling p50/p95/p99/max in milliseconds for every stage"""
+        with self._lock:
+            stages = list(self._samples.items())
+        result = {}
+        for name, samples in stages:
+            values = np.array(samples, dtype=np.float64) * 1000
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, self.PERCENTILES)
+            result[name] = {
+                'count': self._counts.get(name, 0),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(values.max()),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
@@ -0,0 +1,150 @@
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import webrtcvad
+except ImportError:  # energy pre-filter only
+    webrtcvad = None
+
+
+class SpeechSegmenter:
+    """Two-stage voice activity detection returning speech segment boundaries.
+
+    A vectorised NumPy pass computes per-frame energy and zero-crossing rate
+    and rejects obvious silence. Only the frames that survive are sent to
+    webrtcvad (when installed). The per-frame decisions are then smoothed:
+    short blips are dropped, and each speech run is extended by a pre-roll
+    before it and a hangover after it so word onsets and tails are kept.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 frame_ms: int = 30,
+                 aggressiveness: int = 2,
+                 energy_threshold_db: float = -50.0,
+                 max_zero_crossing_rate: float = 0.35,
+                 hangover_ms: int = 300,
+                 preroll_ms: int = 90,
+                 min_speech_ms: int = 60,
+                 use_webrtc: bool = True):
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("webrtcvad frames must be 10, 20 or 30 ms")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.energy_threshold_db = energy_threshold_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.hangover_frames = int(np.ceil(hangover_ms / frame_ms))
+        self.preroll_frames = int(np.ceil(preroll_ms / frame_ms))
+        self.min_speech_frames = max(1, int(np.ceil(min_speech_ms / frame_ms)))
+
+        self.vad = None
+        if use_webrtc:
+            if webrtcvad is not None:
+                self.vad = webrtcvad.Vad(aggressiveness)
+            else:
+                logger.warning("webrtcvad not installed, using the energy pre-filter only")
+
+        # Counters for reporting how much work each stage saved
+        self.frames_total = 0
+        self.frames_prefiltered = 0
+        self.frames_vad_checked = 0
+
+    def frame_features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-frame energy (dBFS) and zero-crossing rate for whole frames"""
+        n_frames = len(audio) // self.frame_size
+        frames = np.asarray(audio[:n_frames * self.frame_size], dtype=np.float32)
+        frames = frames.reshape(n_frames, self.frame_size)
+
+        energy = np.einsum('ij,ij->i', frames, frames) / self.frame_size
+        energy_db = 10.0 * np.log10(energy + 1e-12)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+        return energy_db, zcr
+
+    def classify_frames(self, audio: np.ndarray) -> np.ndarray:
+        """Raw (unsmoothed) speech decision for each whole frame"""
+        energy_db, zcr = self.frame_features(audio)
+
+        # Quiet frames, and quiet noise-like frames with many zero crossings,
+        # never reach webrtcvad
+        candidates = energy_db >= self.energy_threshold_db
+        candidates &= ~((zcr > self.max_zero_crossing_rate) &
+                        (energy_db < self.energy_threshold_db + 10.0))
+
+        self.frames_total += len(candidates)
+        self.frames_prefiltered += int(len(candidates) - np.count_nonzero(candidates))
+        if self.vad is None or not candidates.any():
+            return candidates
+
+        # One int16 conversion for the whole chunk; frames are memoryview slices
+        pcm = (np.clip(audio[:len(candidates) * self.frame_size], -1.0, 1.0) * 32767).astype(np.int16)
+        raw = memoryview(pcm.tobytes())
+        frame_bytes = self.frame_size * 2
+
+        is_speech = np.zeros(len(candidates), dtype=bool)
+        for i in np.flatnonzero(candidates):
+            is_speech[i] = self.vad.is_speech(raw[i * frame_bytes:(i + 1) * frame_bytes], self.sample_rate)
+        self.frames_vad_checked += int(np.count_nonzero(candidates))
+        return is_speech
+
+    def smooth(self, is_speech: np.ndarray) -> np.ndarray:
+        """Drop short blips, then apply pre-roll and hangover"""
+        n = len(is_speech)
+        if n == 0 or not is_speech.any():
+            return np.zeros(n, dtype=bool)
+
+        starts, ends = _runs(is_speech)
+        keep = (ends - starts) >= self.min_speech_frames
+        cleaned = np.zeros(n, dtype=bool)
+        for start, end in zip(starts[keep], ends[keep]):
+            cleaned[start:end] = True
+
+        # Frame i is speech if any cleaned frame lies in [i - hangover, i + preroll]
+        counts = np.concatenate(([0], np.cumsum(cleaned)))
+        idx = np.arange(n)
+        lo = np.clip(idx - self.hangover_frames, 0, n)
+        hi = np.clip(idx + self.preroll_frames + 1, 0, n)
+        return (counts[hi] - counts[lo]) > 0
+
+    def segments(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """Speech segments as ``(start_sample, end_sample)`` pairs"""
+        speech = self.smooth(self.classify_frames(audio))
+        if not speech.any():
+            return []
+
+        starts, ends = _runs(speech)
+        bounds = []
+        for start, end in zip(starts * self.frame_size, ends * self.frame_size):
+            # A segment running into the last whole frame keeps the partial tail
+            if end == len(speech) * self.frame_size:
+                end = len(audio)
+            bounds.append((int(start), int(end)))
+        return bounds
+
+    @staticmethod
+    def extract(audio: np.ndarray, segments: List[Tuple[int, int]]) -> np.ndarray:
+        """Concatenate the speech spans of ``audio``"""
+        if len(segments) == 1:
+            start, end = segments[0]
+            return audio[start:end]
+        return np.concatenate([audio[start:end] for start, end in segments]) if segments else audio[:0]
+
+    def stats(self) -> dict:
+        return {
+            'frames_total': self.frames_total,
+            'frames_prefiltered': self.frames_prefiltered,
+            'frames_vad_checked': self.frames_vad_checked,
+        }
+
+
+def _runs(flags: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start (inclusive) and end (exclusive) indices of True runs"""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
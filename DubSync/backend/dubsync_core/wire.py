@@ -0,0 +1,181 @@
+import io
+import struct
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Binary audio frame: a fixed 16-byte little-endian header, then raw PCM.
+#
+#   offset  size  field
+#   0       2     magic b'DS'
+#   2       1     protocol version (1)
+#   3       1     sample format (SAMPLE_FORMATS)
+#   4       4     chunk number, uint32
+#   8       4     sample rate, uint32
+#   12      4     language code, ASCII, NUL-padded
+#
+# The header length keeps the payload 4-byte aligned, so PCM samples can be
+# viewed in place with np.frombuffer. An Opus payload is one complete Ogg
+# Opus stream per chunk; its own header carries the sample rate.
+FRAME_MAGIC = b'DS'
+FRAME_VERSION = 1
+HEADER = struct.Struct('<2sBBII4s')
+HEADER_SIZE = HEADER.size
+
+FORMAT_FLOAT32 = 1
+FORMAT_INT16 = 2
+FORMAT_OPUS = 3
+
+# Payload dtype per format; Opus payloads are opaque bytes until decoded
+SAMPLE_FORMATS = {
+    FORMAT_FLOAT32: np.dtype('<f4'),
+    FORMAT_INT16: np.dtype('<i2'),
+    FORMAT_OPUS: np.dtype('u1'),
+}
+
+# Names used by the JSON/REST ``encoding`` field
+ENCODINGS = {
+    'float32': FORMAT_FLOAT32,
+    'int16': FORMAT_INT16,
+    'opus': FORMAT_OPUS,
+}
+
+INT16_SCALE = np.float32(1.0 / 32768)
+
+# Longest Opus stream decoded per chunk, by the duration its header declares
+MAX_CHUNK_SECONDS = 30.0
+# Decode buffer kept between calls (10 s at 48 kHz); longer chunks get a one-off array
+MAX_BUFFER_SAMPLES = 480000
+
+
+class FrameError(ValueError):
+    """A binary frame that does not follow the wire format"""
+
+
+class FrameHeader:
+    """Decoded header fields of one binary audio frame"""
+
+    __slots__ = ('sample_format', 'chunk_number', 'sample_rate', 'language_code')
+
+    def __init__(self, sample_format: int, chunk_number: int, sample_rate: int, language_code: str):
+        self.sample_format = sample_format
+        self.chunk_number = chunk_number
+        self.sample_rate = sample_rate
+        self.language_code = language_code
+
+
+def encode_samples(samples: np.ndarray, sample_format: int = FORMAT_FLOAT32, sample_rate: int = 16000) -> bytes:
+    """Encode float samples in [-1, 1] as a payload of the given format"""
+    if sample_format == FORMAT_FLOAT32:
+        return np.ascontiguousarray(samples, dtype='<f4').tobytes()
+    if sample_format == FORMAT_INT16:
+        scaled = np.clip(np.asarray(samples, dtype=np.float32) * 32768, -32768, 32767)
+        return np.rint(scaled).astype('<i2').tobytes()
+    if sample_format == FORMAT_OPUS:
+        import soundfile as sf
+
+        buffer = io.BytesIO()
+        sf.write(buffer, np.asarray(samples, dtype=np.float32), sample_rate, format='OGG', subtype='OPUS')
+        return buffer.getvalue()
+    raise FrameError(f"Unsupported sample format: {sample_format}")
+
+
+def pack_audio_frame(samples: np.ndarray, chunk_number: int, sample_rate: int = 16000,
+                     language_code: str = 'hi', sample_format: int = FORMAT_FLOAT32) -> bytes:
+    """Encode samples and their metadata as one binary frame"""
+    if sample_format not in SAMPLE_FORMATS:
+        raise FrameError(f"Unsupported sample format: {sample_format}")
+    language = language_code.encode('ascii')
+    if len(language) > 4:
+        raise FrameError(f"Language code too long: {language_code}")
+    header = HEADER.pack(FRAME_MAGIC, FRAME_VERSION, sample_format, chunk_number, sample_rate, language)
+    return header + encode_samples(samples, sample_format, sample_rate)
+
+
+def unpack_audio_frame(data: bytes) -> Tuple[FrameHeader, np.ndarray]:
+    """Split a binary frame; the payload is a read-only view of ``data`` in the format's dtype"""
+    if len(data) < HEADER_SIZE:
+        raise FrameError(f"Frame shorter than the {HEADER_SIZE}-byte header")
+    magic, version, sample_format, chunk_number, sample_rate, language = HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise FrameError("Not a DubSync audio frame")
+    dtype = SAMPLE_FORMATS.get(sample_format)
+    if dtype is None:
+        raise FrameError(f"Unsupported sample format: {sample_format}")
+    if (len(data) - HEADER_SIZE) % dtype.itemsize:
+        raise FrameError("Payload is not a whole number of samples")
+
+    header = FrameHeader(sample_format, chunk_number, sample_rate,
+                         language.rstrip(b'\0').decode('ascii'))
+    return header, np.frombuffer(data, dtype=dtype, offset=HEADER_SIZE)
+
+
+class AudioDecoder:
+    """Converts payloads of any sample format to float32 model input.
+
+    PCM conversion is one vectorized pass into a buffer that is reused
+    between calls and grows up to ``max_buffer_samples``, so steady-state
+    streaming allocates nothing. The returned array is a view of that
+    buffer: it is valid until the next ``decode`` call, and callers that
+    keep audio longer (queues, chunkers) must copy it. float32 payloads are
+    returned as-is, without a copy.
+
+    An Opus stream's header declares its length; streams declaring more than
+    ``max_chunk_s`` seconds are rejected before anything is allocated.
+    """
+
+    def __init__(self, initial_samples: int = 0, max_chunk_s: float = MAX_CHUNK_SECONDS,
+                 max_buffer_samples: int = MAX_BUFFER_SAMPLES):
+        self.max_chunk_s = max_chunk_s
+        self.max_buffer_samples = max_buffer_samples
+        self._buffer = np.empty(min(initial_samples, max_buffer_samples), dtype=np.float32)
+
+    def _reserve(self, samples: int) -> np.ndarray:
+        if samples > self.max_buffer_samples:
+            return np.empty(samples, dtype=np.float32)
+        if len(self._buffer) < samples:
+            self._buffer = np.empty(min(max(samples, 2 * len(self._buffer)), self.max_buffer_samples),
+                                    dtype=np.float32)
+        return self._buffer[:samples]
+
+    def decode(self, payload, sample_format: int, sample_rate: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """Return (float32 samples, sample rate); Opus streams report their own rate"""
+        if sample_format == FORMAT_FLOAT32:
+            return np.frombuffer(payload, dtype='<f4'), sample_rate
+        if sample_format == FORMAT_INT16:
+            pcm = np.frombuffer(payload, dtype='<i2')
+            out = self._reserve(len(pcm))
+            np.multiply(pcm, INT16_SCALE, out=out)
+            return out, sample_rate
+        if sample_format == FORMAT_OPUS:
+            return self._decode_opus(payload)
+        raise FrameError(f"Unsupported sample format: {sample_format}")
+
+    def _decode_opus(self, payload) -> Tuple[np.ndarray, int]:
+        import soundfile as sf
+
+        try:
+            with sf.SoundFile(io.BytesIO(payload)) as f:
+                if f.frames > self.max_chunk_s * f.samplerate:
+                    raise FrameError(f"Opus stream of {f.frames / f.samplerate:.1f} s is longer than "
+                                     f"the {self.max_chunk_s:g} s chunk limit")
+                if f.channels == 1:
+                    out = self._reserve(f.frames)
+                    frames = f.read(f.frames, dtype='float32', out=out)
+                    return out[:len(frames)], f.samplerate
+                # Down-mix the rare multi-channel stream
+                return f.read(dtype='float32').mean(axis=1, dtype=np.float32), f.samplerate
+        except RuntimeError as e:  # soundfile's decode errors
+            raise FrameError(f"Invalid Opus payload: {e}")
+
+
+_local = threading.local()
+
+
+def thread_decoder(**options) -> AudioDecoder:
+    """An AudioDecoder owned by the calling thread, for request handlers; ``options`` apply when it is created"""
+    decoder = getattr(_local, 'decoder', None)
+    if decoder is None:
+        decoder = _local.decoder = AudioDecoder(**options)
+    return decoder
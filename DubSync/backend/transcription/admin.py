@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import TranscriptionSession, TranscriptionResult
+from .models import TranscriptionJob, TranscriptionSession, TranscriptionResult
 
 @admin.register(TranscriptionSession)
 class TranscriptionSessionAdmin(admin.ModelAdmin):
@@ -17,4 +17,11 @@ class TranscriptionResultAdmin(admin.ModelAdmin):
     
     def transcription_text_preview(self, obj):
         return obj.transcription_text[:100] + "..." if len(obj.transcription_text) > 100 else obj.transcription_text
-    transcription_text_preview.short_description = "Transcription Preview"
\ No newline at end of file
+    transcription_text_preview.short_description = "Transcription Preview"
+
+@admin.register(TranscriptionJob)
+class TranscriptionJobAdmin(admin.ModelAdmin):
+    list_display = ['job_id', 'file_name', 'status', 'segments_done', 'duration_seconds', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['job_id', 'file_name']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
\ No newline at end of file
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+
+from dubsync_core.captions import CaptionFeed, CaptionLog, captions_message, snapshot_message
+
+logger = logging.getLogger(__name__)
+
+
+def speaker_group(session_id: str) -> str:
+    """Channel layer group of a session's speaker connection; viewers ask it for snapshots"""
+    return f'transcription_{session_id}'
+
+
+def viewer_group(session_id: str) -> str:
+    """Channel layer group of a session's caption viewers"""
+    return f'captions_{session_id}'
+
+
+class CaptionMetrics:
+    """Per-process counters of caption publishing and viewing"""
+
+    COUNTERS = ('batches_published', 'updates_published', 'updates_coalesced', 'snapshots_published',
+                'database_snapshots', 'viewer_messages')
+    # Counters kept by each viewer's CaptionFeed, summed over live and closed feeds
+    FEED_COUNTERS = ('batches_received', 'batches_merged', 'stale_batches', 'resyncs')
+
+    def __init__(self):
+        self.publishers = 0
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self._feeds = set()
+        self._closed_feeds = dict.fromkeys(self.FEED_COUNTERS, 0)
+
+    def count(self, name: str, n: int = 1):
+        self.counts[name] += n
+
+    def add_feed(self, feed: CaptionFeed):
+        self._feeds.add(feed)
+
+    def remove_feed(self, feed: CaptionFeed):
+        if feed in self._feeds:
+            self._feeds.remove(feed)
+            for name in self.FEED_COUNTERS:
+                self._closed_feeds[name] += getattr(feed, name)
+
+    def stats(self) -> dict:
+        feeds = {f'viewer_{name}': total + sum(getattr(feed, name) for feed in self._feeds)
+                 for name, total in self._closed_feeds.items()}
+        return {'publishers': self.publishers, 'viewers': len(self._feeds), **self.counts, **feeds}
+
+
+caption_stats = CaptionMetrics()
+
+
+class CaptionPublisher:
+    """Publishes one speaker connection's results to the viewers of its session.
+
+    Results are coalesced in a CaptionLog and sent as one group message per
+    batch, at most every ``interval_s``: the first result after a quiet
+    spell goes out at once, later ones wait for the rest of the interval.
+    A message carries the client JSON already encoded, so the channel layer
+    copies one string per viewer and viewers forward it without re-encoding.
+    Snapshot requests are throttled the same way and answered with one
+    snapshot to the whole group, so a burst of joining viewers costs one
+    snapshot rather than one each; viewers that are in sync ignore it.
+    """
+
+    def __init__(self, channel_layer, session_id: str, publisher_id: str, interval_s: float = 0.2,
+                 max_snapshot: int = 20):
+        self.channel_layer = channel_layer
+        self.session_id = session_id
+        self.publisher_id = publisher_id
+        self.interval_s = interval_s
+        self.group = viewer_group(session_id)
+        self.log = CaptionLog(max_finals=max_snapshot)
+
+        self._published_at = float('-inf')
+        self._flush_task = None
+        self._snapshot_requested = False
+        caption_stats.publishers += 1
+
+    async def add(self, chunk_number: int, transcription: str, final: bool = True, **fields):
+        """Queue a result for viewers"""
+        coalesced = self.log.updates_coalesced
+        self.log.add(chunk_number, transcription, final, **fields)
+        caption_stats.count('updates_coalesced', self.log.updates_coalesced - coalesced)
+        await self.schedule()
+
+    async def request_snapshot(self):
+        """Queue a snapshot for viewers that joined or lost updates"""
+        self._snapshot_requested = True
+        await self.schedule()
+
+    async def schedule(self):
+        """Publish now, unless the last publish was less than ``interval_s`` ago"""
+        if self._flush_task is not None:
+            return  # goes out with the scheduled batch
+        wait = self._published_at + self.interval_s - time.monotonic()
+        if wait <= 0:
+            await self.publish()
+        else:
+            self._flush_task = asyncio.ensure_future(self._publish_later(wait))
+
+    async def _publish_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        try:
+            await self.publish()
+        except Exception as e:
+            logger.error(f"Error publishing captions of session {self.session_id}: {e}")
+
+    async def publish(self):
+        """Send the pending updates as one batch, then the snapshot if one was requested"""
+        batch = self.log.take_batch()
+        if batch is None and not self._snapshot_requested:
+            return
+        self._published_at = time.monotonic()
+        if batch is not None:
+            seq, updates = batch
+            await self.channel_layer.group_send(self.group, {
+                'type': 'caption.batch',
+                'publisher': self.publisher_id,
+                'seq': seq,
+                'text': captions_message(self.session_id, seq, updates)
+            })
+            caption_stats.count('batches_published')
+            caption_stats.count('updates_published', len(updates))
+
+        if self._snapshot_requested:
+            self._snapshot_requested = False
+            seq, captions = self.log.snapshot()
+            await self.channel_layer.group_send(self.group, {
+                'type': 'caption.snapshot',
+                'publisher': self.publisher_id,
+                'seq': seq,
+                'text': snapshot_message(self.session_id, seq, captions)
+            })
+            caption_stats.count('snapshots_published')
+
+    async def close(self):
+        """Publish what is still pending; the publisher is not used afterwards"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        caption_stats.publishers -= 1
+        await self.publish()
@@ -1,10 +1,23 @@
+import asyncio
 import json
 import base64
+import time
 import numpy as np
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import IndicConformerModel, TranscriptionSession, TranscriptionResult
+from django.conf import settings
+from dubsync_core import CaptionFeed, EndpointChunker
+from dubsync_core.cache import chunk_key
+from dubsync_core.captions import snapshot_message
+from dubsync_core.resampling import MODEL_SAMPLE_RATE, SUPPORTED_SAMPLE_RATES, StreamingResampler
+from dubsync_core.wire import ENCODINGS, AudioDecoder, FrameError, unpack_audio_frame
+from .captions import CaptionPublisher, caption_stats, speaker_group, viewer_group
+from .inference import run_in_thread, transcribe_async
+from .models import (
+    LANGUAGE_MAPPING, TRANSCRIPTION_ERROR_PREFIX, IndicConformerModel, TranscriptionResult, TranscriptionSession
+)
+from .persistence import get_result_buffer, get_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +26,38 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
     
     async def connect(self):
         self.session_id = self.scope['url_route']['kwargs']['session_id']
-        self.room_group_name = f'transcription_{self.session_id}'
+        self.room_group_name = speaker_group(self.session_id)
+        
+        # Utterance chunking, enabled per session with start_session
+        self.chunker = None
+        self.segment_number = 0
+        
+        # Converts int16/Opus input to float32 in a buffer reused across chunks
+        audio = getattr(settings, 'TRANSCRIPTION_AUDIO', {})
+        self.decoder = AudioDecoder(max_chunk_s=audio.get('MAX_CHUNK_SECONDS', 30.0))
+        # Brings other capture rates to 16 kHz without seams between chunks
+        self.resampler = None
+        
+        # Interim results, enabled per session with start_session partials=true
+        self.partial_decoder = None
+        self.partial_language = None  # language whose head partial_decoder uses
+        self.stream_position = 0  # 16 kHz samples received this session
+        self.reset_utterance()
+        
+        # Session row cached for the connection; results are written behind
+        self.session = None
+        self.results = get_result_buffer()
+        self.cache = get_result_cache()
+        
+        # Results are also published to the session's read-only caption viewers
+        captions = getattr(settings, 'TRANSCRIPTION_CAPTIONS', {})
+        self.captions = None
+        if captions.get('ENABLED', True):
+            self.captions = CaptionPublisher(
+                self.channel_layer, self.session_id, self.channel_name,
+                interval_s=captions.get('PUBLISH_INTERVAL_MS', 200) / 1000,
+                max_snapshot=captions.get('SNAPSHOT_SIZE', 20)
+            )
         
         # Join room group
         await self.channel_layer.group_add(
@@ -30,13 +74,33 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
         }))
     
     async def disconnect(self, close_code):
+        # Write out this session's buffered results
+        if self.session is not None:
+            try:
+                await database_sync_to_async(self.results.flush)(self.session)
+            except Exception as e:
+                # The rows stay buffered for a later flush; cleanup still runs
+                logger.error(f"Error flushing results on disconnect: {e}")
+        
+        # Viewers get the results still waiting for the next batch
+        if self.captions is not None:
+            try:
+                await self.captions.close()
+            except Exception as e:
+                logger.error(f"Error publishing captions: {e}")
+        
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
+        # Binary frames carry raw audio; JSON text frames carry control messages
+        if bytes_data is not None:
+            await self.handle_audio_frame(bytes_data)
+            return
+        
         try:
             data = json.loads(text_data)
             message_type = data.get('type')
@@ -68,11 +132,22 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
     async def handle_audio_chunk(self, data):
         """Handle incoming audio chunk for transcription"""
         try:
+            # Capture timestamp for queue-wait and end-to-end latency
+            received_at = time.monotonic()
+            
             # Extract audio data
             audio_data = data.get('audio_data')
             language_code = data.get('language_code', 'hi')
-            chunk_number = data.get('chunk_number', 0)
+            chunk_number = data.get('chunk_number')
             sample_rate = data.get('sample_rate', 16000)
+            encoding = data.get('encoding', 'float32')
+            
+            if encoding not in ENCODINGS:
+                await self.send(text_data=json.dumps({
+                    'type': 'error',
+                    'message': f'Unsupported encoding: {encoding}'
+                }))
+                return
             
             if not audio_data:
                 await self.send(text_data=json.dumps({
@@ -81,45 +156,311 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
                 }))
                 return
             
+            # Results are stored once per (session, chunk_number); a default
+            # would make every chunk after the first a resend of chunk 0
+            if not isinstance(chunk_number, int) or isinstance(chunk_number, bool) or chunk_number < 0:
+                await self.send(text_data=json.dumps({
+                    'type': 'error',
+                    'message': 'chunk_number must be a non-negative integer'
+                }))
+                return
+            
             # Decode audio data
-            audio_bytes = base64.b64decode(audio_data)
-            audio_array = np.frombuffer(audio_bytes, dtype=np.float32)
+            audio_array, sample_rate = self.decode_audio_data(audio_data, encoding, sample_rate)
             
-            # Get transcription
-            transcription = await self.transcribe_audio(
-                audio_array, sample_rate, language_code, chunk_number
-            )
+            await self.process_audio(audio_array, sample_rate, language_code, chunk_number, received_at)
             
-            # Send transcription result
+        except Exception as e:
+            logger.error(f"Error handling audio chunk: {e}")
             await self.send(text_data=json.dumps({
-                'type': 'transcription_result',
-                'session_id': self.session_id,
-                'chunk_number': chunk_number,
-                'transcription': transcription,
-                'language_code': language_code
+                'type': 'error',
+                'message': f'Failed to process audio chunk: {str(e)}'
             }))
+    
+    async def handle_audio_frame(self, frame):
+        """Handle a binary audio frame: fixed header plus raw PCM (see dubsync_core.wire)"""
+        try:
+            received_at = time.monotonic()
             
+            # float32 samples are viewed in place, other formats decoded once
+            header, payload = unpack_audio_frame(frame)
+            audio_array, sample_rate = self.decoder.decode(payload, header.sample_format, header.sample_rate)
+            
+            await self.process_audio(
+                audio_array, sample_rate, header.language_code, header.chunk_number, received_at
+            )
+            
+        except FrameError as e:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': f'Invalid audio frame: {str(e)}'
+            }))
         except Exception as e:
-            logger.error(f"Error handling audio chunk: {e}")
+            logger.error(f"Error handling audio frame: {e}")
             await self.send(text_data=json.dumps({
                 'type': 'error',
                 'message': f'Failed to process audio chunk: {str(e)}'
             }))
     
+    def decode_audio_data(self, audio_data, encoding='float32', sample_rate=16000):
+        """Decode base64 audio of a JSON audio_chunk message to (float32 samples, sample rate)"""
+        return self.decoder.decode(base64.b64decode(audio_data), ENCODINGS[encoding], sample_rate)
+    
+    async def resample(self, audio_array, sample_rate):
+        """Convert a chunk to 16 kHz off the event loop, keeping filter state from the session's previous chunk"""
+        if sample_rate == MODEL_SAMPLE_RATE:
+            return audio_array
+        return await run_in_thread(self._resample, audio_array, sample_rate)
+    
+    def _resample(self, audio_array, sample_rate):
+        if self.resampler is None or self.resampler.source_rate != sample_rate:
+            self.resampler = StreamingResampler(sample_rate, MODEL_SAMPLE_RATE)
+        return self.resampler.process(audio_array)
+    
+    async def check_language(self, language_code):
+        """Send an error and return False unless the language code is supported"""
+        if isinstance(language_code, str) and language_code in LANGUAGE_MAPPING:
+            return True
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'message': f'Unsupported language code: {language_code}'
+        }))
+        return False
+    
+    async def process_audio(self, audio_array, sample_rate, language_code, chunk_number, received_at=None):
+        """Transcribe decoded audio and send the result, whichever framing it came in"""
+        # The code selects a language head file and a registry entry
+        if not await self.check_language(language_code):
+            return
+        # JSON field, frame header or Opus stream header: all set by the client
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': f'Unsupported sample rate: {sample_rate}'
+            }))
+            return
+        
+        # With endpointing, results are sent per completed utterance
+        if self.chunker is not None:
+            self.segment_language = language_code
+            audio_array = await self.resample(audio_array, sample_rate)
+            if self.partial_decoder is not None:
+                await self.stream_partials(audio_array, language_code, received_at)
+                return
+            for segment in self.chunker.push(audio_array):
+                await self.transcribe_segment(segment, MODEL_SAMPLE_RATE, language_code, received_at)
+            return
+        
+        # Answer a resent chunk before it advances the resampler state
+        key = chunk_key(self.session_id, chunk_number, language_code, sample_rate, audio_array)
+        transcription = self.cache.get(key)
+        
+        # Get transcription
+        if transcription is None:
+            transcription = await self.transcribe_audio(
+                await self.resample(audio_array, sample_rate), MODEL_SAMPLE_RATE, language_code,
+                chunk_number, received_at, key=key
+            )
+        
+        # Send transcription result
+        await self.send_transcription(chunk_number, transcription, language_code)
+    
+    async def send_transcription(self, chunk_number, transcription, language_code):
+        """Send a transcription result to the client"""
+        await self.send(text_data=json.dumps({
+            'type': 'transcription_result',
+            'session_id': self.session_id,
+            'chunk_number': chunk_number,
+            'transcription': transcription,
+            'language_code': language_code
+        }))
+        await self.publish_caption(chunk_number, transcription, True, language_code=language_code)
+    
+    async def publish_caption(self, chunk_number, transcription, final, **fields):
+        """Pass a result on to the session's caption viewers"""
+        if self.captions is None or transcription.startswith(TRANSCRIPTION_ERROR_PREFIX):
+            return
+        try:
+            await self.captions.add(chunk_number, transcription, final, **fields)
+        except Exception as e:
+            logger.error(f"Error publishing captions: {e}")
+    
+    async def caption_snapshot_request(self, event):
+        """A viewer joined or lost updates: publish the recent captions"""
+        if self.captions is not None:
+            try:
+                await self.captions.request_snapshot()
+            except Exception as e:
+                logger.error(f"Error sending caption snapshot: {e}")
+    
+    async def transcribe_segment(self, segment, sample_rate, language_code, received_at=None):
+        """Transcribe and send one endpointed utterance"""
+        chunk_number = self.segment_number
+        self.segment_number += 1
+        
+        transcription = await self.transcribe_audio(
+            segment, sample_rate, language_code, chunk_number, received_at
+        )
+        await self.send_transcription(chunk_number, transcription, language_code)
+    
+    def reset_utterance(self):
+        """Forget the open utterance of a partial-results session"""
+        self.utterance_start = None  # stream position where the open utterance's audio starts
+        self.utterance_received_at = None
+        self.samples_since_partial = 0
+        self.last_partial = ""
+        self.first_word_sent = False
+    
+    async def stream_partials(self, audio_array, language_code, received_at=None, end_of_stream=False):
+        """Decode the open utterance incrementally: partial results at the set cadence, a final one at its end"""
+        chunk_start = self.stream_position
+        self.stream_position += len(audio_array)
+        ended = self.chunker.push(audio_array)
+        if end_of_stream:
+            ended += self.chunker.flush()
+        
+        # Silence between utterances is not decoded
+        if self.utterance_start is None:
+            if not (ended or self.chunker.in_speech):
+                return
+            self.utterance_start = chunk_start
+            self.utterance_received_at = received_at
+            # An utterance is decoded with the head of the language it starts in
+            if language_code != self.partial_language:
+                self.partial_decoder = await run_in_thread(
+                    IndicConformerModel.get_instance().create_incremental_decoder, language_code
+                )
+                self.partial_language = language_code
+        
+        try:
+            await run_in_thread(self.partial_decoder.accept, audio_array)
+            
+            # Endpoint, length limit, noise too short to keep, or end of session.
+            # Audio after a cut in the same chunk stays with this utterance.
+            if ended or not self.chunker.in_speech or end_of_stream:
+                await self.finish_utterance(language_code, received_at)
+                return
+            
+            self.samples_since_partial += len(audio_array)
+            if self.samples_since_partial >= self.partial_interval:
+                self.samples_since_partial = 0
+                transcription = await run_in_thread(self.partial_decoder.hypothesis)
+                if transcription and transcription != self.last_partial:
+                    self.last_partial = transcription
+                    await self.send_hypothesis('partial_result', self.segment_number, transcription, language_code)
+        except Exception:
+            # Start the next utterance from a clean decoder
+            self.partial_decoder.reset()
+            self.reset_utterance()
+            raise
+    
+    async def finish_utterance(self, language_code, received_at=None):
+        """Decode the rest of the open utterance, store it and send its final result"""
+        transcription = await run_in_thread(self.partial_decoder.finish)
+        # Noise that never produced text ends silently; anything shown as partial gets a final
+        if transcription or self.last_partial:
+            chunk_number = self.segment_number
+            self.segment_number += 1
+            if transcription:
+                await self.store_result(
+                    chunk_number, transcription, received_at,
+                    start_seconds=self.utterance_start / MODEL_SAMPLE_RATE,
+                    end_seconds=self.stream_position / MODEL_SAMPLE_RATE
+                )
+            await self.send_hypothesis('final_result', chunk_number, transcription, language_code)
+        self.reset_utterance()
+    
+    async def send_hypothesis(self, message_type, chunk_number, transcription, language_code):
+        """Send a partial or final result of the open utterance"""
+        # Time to first word: from the chunk where speech started to the first text sent
+        if transcription and not self.first_word_sent:
+            self.first_word_sent = True
+            IndicConformerModel.get_instance().tracer.record_since('first_word', self.utterance_received_at)
+        
+        # Seconds of session audio, so clients can time results against their capture clock
+        offsets = {
+            'utterance_start': self.utterance_start / MODEL_SAMPLE_RATE,
+            'audio_end': self.stream_position / MODEL_SAMPLE_RATE
+        }
+        await self.send(text_data=json.dumps({
+            'type': message_type,
+            'session_id': self.session_id,
+            'chunk_number': chunk_number,
+            'transcription': transcription,
+            'language_code': language_code,
+            **offsets
+        }))
+        await self.publish_caption(
+            chunk_number, transcription, message_type == 'final_result', language_code=language_code, **offsets
+        )
+    
     async def handle_start_session(self, data):
         """Handle session start"""
         language_code = data.get('language_code', 'hi')
+        chunking = data.get('chunking', 'fixed')
+        partials = bool(data.get('partials', False))
         
+        if not await self.check_language(language_code):
+            return
+        
+        # Load the language's components while the client starts streaming
+        IndicConformerModel.get_instance().prefetch_language(language_code)
         session = await self.create_session(language_code)
         
+        # 'endpoint' buffers incoming audio and cuts it at utterance ends;
+        # partial results also need the endpoints, for their final results
+        if chunking == 'endpoint' or partials:
+            endpointing = getattr(settings, 'TRANSCRIPTION_ENDPOINTING', {})
+            self.chunker = EndpointChunker(
+                end_silence_s=endpointing.get('END_SILENCE', 0.5),
+                min_segment_s=endpointing.get('MIN_SEGMENT', 0.3),
+                max_segment_s=endpointing.get('MAX_SEGMENT', 8.0),
+            )
+            # Continue after segments stored by an earlier connection
+            self.segment_number = await self.next_segment_number()
+            self.segment_language = language_code
+        else:
+            # Client-numbered chunks; drop any chunker from an earlier session
+            self.chunker = None
+            self.segment_number = 0
+        
+        # Interim results decode frame-level logits, which demo mode has none of
+        self.partial_decoder = None
+        if partials and self.chunker is not None:
+            model_instance = IndicConformerModel.get_instance()
+            # Finals are decoded with the language's head, as chunk results are
+            self.partial_decoder = await run_in_thread(model_instance.create_incremental_decoder, language_code)
+            self.partial_language = language_code
+            interval_ms = model_instance.streaming_settings.get('PARTIAL_INTERVAL_MS', 500)
+            self.partial_interval = int(interval_ms * MODEL_SAMPLE_RATE / 1000)
+        
+        # The new session's audio starts from silence, not the last session's tail
+        self.resampler = None
+        self.stream_position = 0
+        self.reset_utterance()
+        
         await self.send(text_data=json.dumps({
             'type': 'session_started',
             'session_id': self.session_id,
-            'language_code': language_code
+            'language_code': language_code,
+            'chunking': 'endpoint' if self.chunker is not None else 'fixed',
+            'partials': self.partial_decoder is not None
         }))
     
     async def handle_end_session(self, data):
         """Handle session end"""
+        # Transcribe the utterance still in progress
+        if self.chunker is not None:
+            tail = self.resampler.flush() if self.resampler is not None else np.zeros(0, dtype=np.float32)
+            if self.partial_decoder is not None:
+                await self.stream_partials(tail, self.segment_language, end_of_stream=True)
+            else:
+                segments = self.chunker.push(tail) + self.chunker.flush()
+                for segment in segments:
+                    await self.transcribe_segment(segment, MODEL_SAMPLE_RATE, self.segment_language)
+            self.chunker = None
+            self.partial_decoder = None
+        
         await self.end_session()
         
         await self.send(text_data=json.dumps({
@@ -130,53 +471,202 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def create_session(self, language_code):
         """Create transcription session in database"""
-        session, created = TranscriptionSession.objects.get_or_create(
-            session_id=self.session_id,
-            defaults={
-                'language_code': language_code,
-                'is_active': True
-            }
-        )
-        return session
+        self.session = self.results.get_session(self.session_id, language_code)
+        return self.session
+    
+    @database_sync_to_async
+    def next_segment_number(self):
+        """Chunk number the next endpointed segment of this session gets"""
+        return self.results.next_chunk_number(self.session)
     
     @database_sync_to_async
     def end_session(self):
         """End transcription session in database"""
         try:
-            session = TranscriptionSession.objects.get(session_id=self.session_id)
+            session = self.session or TranscriptionSession.objects.get(session_id=self.session_id)
+            try:
+                self.results.flush(session)
+            except Exception as e:
+                # The rows stay buffered for a later flush; the session still ends
+                logger.error(f"Error flushing results on session end: {e}")
             session.is_active = False
-            session.save()
+            session.save(update_fields=['is_active', 'updated_at'])
         except TranscriptionSession.DoesNotExist:
             pass
     
-    @database_sync_to_async
-    def transcribe_audio(self, audio_array, sample_rate, language_code, chunk_number):
-        """Transcribe audio using IndicConformer model"""
+    async def transcribe_audio(self, audio_array, sample_rate, language_code, chunk_number, received_at=None,
+                               key=None):
+        """Transcribe on the inference executor, then queue the result for write-behind"""
+        # A resent chunk is answered from the cache, without inference or a second row.
+        # Callers that already checked the cache pass the key they looked up.
+        if key is None:
+            key = chunk_key(self.session_id, chunk_number, language_code, sample_rate, audio_array)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
-            # Get model instance
-            model_instance = IndicConformerModel.get_instance()
-            
-            # Transcribe
             if len(audio_array) == 0:
                 transcription = ""
             else:
-                transcription = model_instance.transcribe(
-                    audio_array, sample_rate, language_code
-                )
-            
-            # Save result to database
-            try:
-                session = TranscriptionSession.objects.get(session_id=self.session_id)
-                TranscriptionResult.objects.create(
-                    session=session,
-                    chunk_number=chunk_number,
-                    transcription_text=transcription
-                )
-            except TranscriptionSession.DoesNotExist:
-                logger.warning(f"Session {self.session_id} not found in database")
-            
-            return transcription
-            
+                transcription = await transcribe_async(audio_array, sample_rate, language_code, received_at)
         except Exception as e:
             logger.error(f"Error in transcription: {e}")
-            return f"[Transcription error: {str(e)}]"
\ No newline at end of file
+            return f"[Transcription error: {str(e)}]"
+        
+        # Failed chunks are neither cached nor stored, so a retry runs again
+        if transcription.startswith(TRANSCRIPTION_ERROR_PREFIX):
+            return transcription
+        self.cache.put(key, transcription)
+        await self.store_result(chunk_number, transcription, received_at)
+        return transcription
+    
+    async def store_result(self, chunk_number, transcription, received_at=None, **offsets):
+        """Queue a result row for write-behind and record the end-to-end latency"""
+        # Session create/end and result saves never wait behind a forward pass
+        if self.session is None:
+            self.session = await self.load_session()
+        if self.session is not None:
+            self.results.add(self.session, chunk_number, transcription, **offsets)
+        IndicConformerModel.get_instance().tracer.record_since('total', received_at)
+    
+    @database_sync_to_async
+    def load_session(self):
+        """Look up the session row once for a connection that skipped start_session"""
+        try:
+            session = TranscriptionSession.objects.get(session_id=self.session_id)
+            self.results.remember_session(session)
+            return session
+        except TranscriptionSession.DoesNotExist:
+            logger.warning(f"Session {self.session_id} not found in database")
+            return None
+
+
+class CaptionViewerConsumer(AsyncWebsocketConsumer):
+    """Read-only WebSocket consumer that follows the captions of a transcription session"""
+    
+    async def connect(self):
+        self.session_id = self.scope['url_route']['kwargs']['session_id']
+        self.group_name = viewer_group(self.session_id)
+        self.feed = None
+        
+        captions = getattr(settings, 'TRANSCRIPTION_CAPTIONS', {})
+        if not captions.get('ENABLED', True):
+            await self.close()
+            return
+        self.snapshot_size = captions.get('SNAPSHOT_SIZE', 20)
+        self.snapshot_timeout_s = captions.get('SNAPSHOT_TIMEOUT_MS', 500) / 1000
+        
+        # Orders, resyncs and coalesces the speaker's batches for this viewer
+        self.feed = CaptionFeed(self.session_id)
+        self.writer = None
+        self.snapshot_fallback = None
+        
+        await self.channel_layer.group_add(
+            self.group_name,
+            self.channel_name
+        )
+        
+        await self.accept()
+        caption_stats.add_feed(self.feed)
+        
+        await self.send(text_data=json.dumps({
+            'type': 'connection_established',
+            'session_id': self.session_id,
+            'role': 'viewer'
+        }))
+        
+        # Late joiners start from a snapshot of the recent captions
+        await self.request_snapshot()
+    
+    async def disconnect(self, close_code):
+        if self.feed is None:
+            return
+        for task in (self.writer, self.snapshot_fallback):
+            if task is not None:
+                task.cancel()
+        caption_stats.remove_feed(self.feed)
+        
+        await self.channel_layer.group_discard(
+            self.group_name,
+            self.channel_name
+        )
+    
+    async def receive(self, text_data=None, bytes_data=None):
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'message': 'Caption viewers are read-only'
+        }))
+    
+    async def request_snapshot(self):
+        """Ask the session's speaker for its recent captions, falling back to stored results"""
+        await self.channel_layer.group_send(speaker_group(self.session_id), {
+            'type': 'caption.snapshot_request'
+        })
+        if self.snapshot_fallback is None:
+            self.snapshot_fallback = asyncio.ensure_future(self.load_stored_snapshot())
+    
+    async def load_stored_snapshot(self):
+        """Without an answer from a speaker, start from the session's stored results"""
+        await asyncio.sleep(self.snapshot_timeout_s)
+        try:
+            captions = await self.recent_results()
+        except Exception as e:
+            logger.error(f"Error loading captions of session {self.session_id}: {e}")
+            captions = []
+        self.snapshot_fallback = None
+        # A speaker's snapshot that arrived meanwhile is more recent
+        if not self.feed.synced:
+            caption_stats.count('database_snapshots')
+            await self.apply_snapshot(None, None, snapshot_message(self.session_id, None, captions))
+    
+    @database_sync_to_async
+    def recent_results(self):
+        """Last stored results of the session, oldest first, as final captions"""
+        rows = (
+            TranscriptionResult.objects
+            .filter(session__session_id=self.session_id)
+            .order_by('-chunk_number')
+            .values_list('chunk_number', 'transcription_text')[:self.snapshot_size]
+        )
+        return [{'chunk_number': chunk_number, 'transcription': text, 'final': True}
+                for chunk_number, text in reversed(rows)]
+    
+    async def caption_snapshot(self, event):
+        """Recent captions published by the speaker for viewers that asked for them"""
+        if self.snapshot_fallback is not None:
+            self.snapshot_fallback.cancel()
+            self.snapshot_fallback = None
+        await self.apply_snapshot(event['publisher'], event['seq'], event['text'])
+    
+    async def apply_snapshot(self, publisher, seq, text):
+        if self.feed.on_snapshot(publisher, seq, text):
+            await self.request_snapshot()
+        self.deliver()
+    
+    async def caption_batch(self, event):
+        """A batch of caption updates published by the speaker"""
+        # A gap means updates were lost; a fresh snapshot replaces the backlog
+        if self.feed.on_batch(event['publisher'], event['seq'], event['text']):
+            await self.request_snapshot()
+        self.deliver()
+    
+    def deliver(self):
+        """Start sending the feed's outbox unless a send to this viewer is under way"""
+        if self.writer is None:
+            self.writer = asyncio.ensure_future(self.write_messages())
+    
+    async def write_messages(self):
+        # The next message is taken only once the previous send returned, so
+        # whatever arrives meanwhile is merged into one message
+        try:
+            while True:
+                text = self.feed.next_message()
+                if text is None:
+                    break
+                await self.send(text_data=text)
+                caption_stats.count('viewer_messages')
+        except Exception as e:
+            logger.error(f"Error sending captions: {e}")
+        finally:
+            self.writer = None
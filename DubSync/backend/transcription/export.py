@@ -0,0 +1,123 @@
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from channels.db import database_sync_to_async
+from django.db.models import Q
+
+from .models import TranscriptionResult, TranscriptionSession
+
+# Rows fetched per keyset page
+EXPORT_BATCH_SIZE = 500
+
+# Cue times of rows stored without audio offsets assume fixed-length chunks
+DEFAULT_CHUNK_SECONDS = 2.0
+
+EXPORT_CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'srt': 'application/x-subrip; charset=utf-8',
+    'vtt': 'text/vtt; charset=utf-8',
+}
+
+ResultRow = Tuple[int, int, str, float, object, Optional[float], Optional[float]]
+
+
+@database_sync_to_async
+def _results_page(session: TranscriptionSession, last: Optional[ResultRow], batch_size: int) -> List[ResultRow]:
+    columns = ('id', 'chunk_number', 'transcription_text', 'confidence_score', 'timestamp',
+               'start_seconds', 'end_seconds')
+    page = TranscriptionResult.objects.filter(session=session).order_by('chunk_number', 'id')
+    if last is not None:
+        last_id, last_chunk = last[0], last[1]
+        page = page.filter(Q(chunk_number__gt=last_chunk) | Q(chunk_number=last_chunk, id__gt=last_id))
+    return list(page.values_list(*columns)[:batch_size])
+
+
+async def iter_session_results(session: TranscriptionSession,
+                               batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[ResultRow]:
+    """Yield (id, chunk_number, text, confidence, timestamp, start_seconds, end_seconds) in chunk order.
+
+    Rows are read one keyset page at a time. Each page resumes after the last
+    (chunk_number, id) seen instead of using OFFSET, so every query is an
+    index range scan on (session, chunk_number) and only one page is ever
+    held in memory. The generator is async so the ASGI handler streams it;
+    Django buffers a sync iterator into a list before sending any of it.
+    """
+    last = None
+    while True:
+        rows = await _results_page(session, last, batch_size)
+        for row in rows:
+            yield row
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _cue_times(chunk_number: int, chunk_seconds: float, separator: str,
+               start_seconds: Optional[float] = None, end_seconds: Optional[float] = None) -> str:
+    if start_seconds is None or end_seconds is None:
+        start_seconds, end_seconds = chunk_number * chunk_seconds, (chunk_number + 1) * chunk_seconds
+    return f"{_timestamp(start_seconds, separator)} --> {_timestamp(end_seconds, separator)}"
+
+
+def _cue_text(text: str) -> str:
+    # A blank line inside a cue would end it early
+    return '\n'.join(line for line in text.splitlines() if line.strip())
+
+
+async def export_jsonl(rows: AsyncIterator[ResultRow], chunk_seconds: float) -> AsyncIterator[str]:
+    async for _, chunk_number, text, confidence, timestamp, start_seconds, end_seconds in rows:
+        yield json.dumps({
+            'chunk_number': chunk_number,
+            'transcription_text': text,
+            'confidence_score': confidence,
+            'start_seconds': start_seconds,
+            'end_seconds': end_seconds,
+            'timestamp': timestamp.isoformat(),
+        }, ensure_ascii=False) + '\n'
+
+
+async def _cues(rows: AsyncIterator[ResultRow], chunk_seconds: float,
+                separator: str) -> AsyncIterator[Tuple[str, str]]:
+    """(cue times, cue text) of rows with text; silent chunks would be empty cues, which end a subtitle file"""
+    async for _, chunk_number, text, _, _, start_seconds, end_seconds in rows:
+        text = _cue_text(text)
+        if text:
+            yield _cue_times(chunk_number, chunk_seconds, separator, start_seconds, end_seconds), text
+
+
+async def export_srt(rows: AsyncIterator[ResultRow], chunk_seconds: float) -> AsyncIterator[str]:
+    index = 0
+    async for times, text in _cues(rows, chunk_seconds, ','):
+        index += 1
+        yield f"{index}\n{times}\n{text}\n\n"
+
+
+async def export_vtt(rows: AsyncIterator[ResultRow], chunk_seconds: float) -> AsyncIterator[str]:
+    yield "WEBVTT\n\n"
+    async for times, text in _cues(rows, chunk_seconds, '.'):
+        yield f"{times}\n{text}\n\n"
+
+
+EXPORTERS = {
+    'jsonl': export_jsonl,
+    'srt': export_srt,
+    'vtt': export_vtt,
+}
+
+
+def export_session(session: TranscriptionSession, export_format: str,
+                   chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+                   batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    """Lazily render every result of ``session`` in ``export_format``"""
+    exporter = EXPORTERS.get(export_format)
+    if exporter is None:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return exporter(iter_session_results(session, batch_size), chunk_seconds)
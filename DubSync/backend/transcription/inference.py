@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .models import IndicConformerModel
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    """The inference pool, kept apart from the thread Django runs ORM calls on"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                config = getattr(settings, 'TRANSCRIPTION_EXECUTOR', {})
+                kind = config.get('KIND', 'thread')
+                workers = config.get('WORKERS', 2)
+                if kind == 'process':
+                    _executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+                elif kind == 'thread':
+                    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+                else:
+                    raise ValueError(f"Unknown inference executor: {kind}")
+                logger.info(f"Inference executor: {workers} {kind} workers")
+    return _executor
+
+
+def _init_worker():
+    """Set up Django in a worker process so it can load its own model copy"""
+    import django
+    django.setup()
+
+
+def _transcribe(audio_data, sample_rate, language_code, received_at=None):
+    model_instance = IndicConformerModel.get_instance()
+    # time.monotonic is system-wide, so this also holds in a worker process
+    model_instance.tracer.record_since('queue_wait', received_at)
+    return model_instance.transcribe(audio_data, sample_rate, language_code)
+
+
+async def run_in_thread(fn, *args):
+    """Run stateful per-session work (e.g. incremental decoding) off the event loop.
+
+    Such work cannot move to a worker process, so it uses the inference pool
+    only when that is a thread pool, and the loop's default pool otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    return await loop.run_in_executor(executor if isinstance(executor, ThreadPoolExecutor) else None, fn, *args)
+
+
+async def transcribe_async(audio_data, sample_rate, language_code, received_at=None) -> str:
+    """Transcribe off the event loop and off the database thread.
+
+    Goes through the cross-session batcher when it is enabled, otherwise
+    through the inference executor.
+    """
+    model_instance = IndicConformerModel.get_instance()
+    if model_instance.batcher is not None:
+        model_instance.tracer.record_since('queue_wait', received_at)
+        return await asyncio.wrap_future(model_instance.submit(audio_data, sample_rate, language_code))
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), _transcribe, audio_data, sample_rate, language_code, received_at
+    )
@@ -0,0 +1,335 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from dubsync_core import EndpointChunker
+from dubsync_core.endpointing import iter_file_segments
+from dubsync_core.resampling import MODEL_SAMPLE_RATE
+
+from .export import EXPORT_BATCH_SIZE
+from .models import (
+    TRANSCRIPTION_ERROR_PREFIX, IndicConformerModel, TranscriptionJob, TranscriptionResult, TranscriptionSession
+)
+from .persistence import ResultBuffer, get_result_buffer
+
+logger = logging.getLogger(__name__)
+
+# Seconds of audio read from the upload at a time
+READ_BLOCK_SECONDS = 10.0
+
+# How often an event stream checks for new results, and how long it may stay
+# silent before sending a comment so proxies keep the connection open
+EVENT_POLL_INTERVAL_S = 0.5
+EVENT_KEEPALIVE_S = 15.0
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        return True  # os.kill would terminate it
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+class JobRunner:
+    """Transcribes uploaded long-audio files in the background.
+
+    At most ``max_concurrent`` jobs run at once, each on its own thread; up
+    to ``max_queued`` more wait for a slot and ``submit`` refuses the rest.
+    A job reads its file block by block, cuts it at utterance ends and
+    transcribes the segments in order through the shared model (and the
+    micro-batcher, when enabled). Each segment becomes a TranscriptionResult
+    row of the job's session, queued on the write-behind result buffer.
+    Every ``progress_interval_s`` the session's rows are flushed and then the
+    job's progress is saved, so a reader that sees the progress also sees
+    every result it covers. Uploads live in ``upload_dir`` until their job
+    ends.
+
+    Jobs record the process running them as ``host:pid``. A process that
+    exits mid-job leaves it queued or running; ``fail_interrupted_jobs``,
+    called when a process creates its runner, marks such jobs of this host
+    failed so their event streams end.
+    """
+
+    def __init__(self, upload_dir: str, max_concurrent: int = 2, max_queued: int = 20, max_segment_s: float = 15.0,
+                 progress_interval_s: float = 1.0, keep_uploads: bool = False,
+                 results: Optional[ResultBuffer] = None):
+        self.upload_dir = upload_dir
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max(0, max_queued)
+        self.max_segment_s = max_segment_s
+        self.progress_interval_s = progress_interval_s
+        self.keep_uploads = keep_uploads
+        self.results = results or get_result_buffer()
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='transcription-job')
+        self._lock = threading.Lock()
+        self._active = 0  # submitted jobs not yet finished, running or waiting
+
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+
+    def has_capacity(self) -> bool:
+        return self._active < self.max_concurrent + self.max_queued
+
+    def submit(self, job: TranscriptionJob) -> bool:
+        """Queue a job; returns False when the queue is full"""
+        with self._lock:
+            if not self.has_capacity():
+                return False
+            self._active += 1
+        self._executor.submit(self._run, job.pk)
+        return True
+
+    def fail_interrupted_jobs(self) -> int:
+        """Fail unfinished jobs of processes on this host that are gone; returns how many were failed.
+
+        A job of this runner's own id is from an earlier process that had the
+        same pid (a restarted container), since this runner has not started
+        any job yet. Jobs without a runner predate the field.
+        """
+        host = self.runner_id.rsplit(':', 1)[0]
+        interrupted = []
+        unfinished = TranscriptionJob.objects.exclude(status__in=TranscriptionJob.FINISHED)
+        for pk, runner in unfinished.values_list('pk', 'runner'):
+            runner_host, _, pid = runner.rpartition(':')
+            if (not runner or runner == self.runner_id
+                    or (runner_host == host and pid.isdigit() and not _process_alive(int(pid)))):
+                interrupted.append(pk)
+        if not interrupted:
+            return 0
+
+        failed = unfinished.filter(pk__in=interrupted).update(
+            status=TranscriptionJob.STATUS_FAILED,
+            error='Interrupted: the server process running the job exited',
+            finished_at=timezone.now()
+        )
+        TranscriptionSession.objects.filter(job__pk__in=interrupted).update(is_active=False)
+        logger.warning(f"Marked {failed} interrupted transcription jobs failed")
+        self.jobs_failed += failed
+        return failed
+
+    def _run(self, pk: int):
+        try:
+            job = TranscriptionJob.objects.select_related('session').get(pk=pk)
+            self.process(job)
+        except Exception as e:
+            logger.error(f"Error running transcription job {pk}: {e}")
+        finally:
+            with self._lock:
+                self._active -= 1
+            close_old_connections()
+
+    def process(self, job: TranscriptionJob):
+        """Transcribe one job's file from start to end, committing progress as it goes"""
+        model_instance = IndicConformerModel.get_instance()
+        session = job.session
+        try:
+            job.status = TranscriptionJob.STATUS_RUNNING
+            job.started_at = timezone.now()
+            job.save(update_fields=['status', 'started_at'])
+
+            endpointing = getattr(settings, 'TRANSCRIPTION_ENDPOINTING', {})
+            chunker = EndpointChunker(
+                MODEL_SAMPLE_RATE,
+                end_silence_s=endpointing.get('END_SILENCE', 0.5),
+                min_segment_s=endpointing.get('MIN_SEGMENT', 0.3),
+                max_segment_s=self.max_segment_s,
+            )
+            saved_at = time.monotonic()
+            segments = iter_file_segments(job.audio_path, chunker, READ_BLOCK_SECONDS)
+            for index, (start, audio) in enumerate(segments):
+                text = model_instance.transcribe_scheduled(audio, MODEL_SAMPLE_RATE, session.language_code)
+                # A failed segment is skipped; its chunk number stays unused
+                if text.startswith(TRANSCRIPTION_ERROR_PREFIX):
+                    job.segments_failed += 1
+                else:
+                    self.results.add(session, index, text, start_seconds=start / MODEL_SAMPLE_RATE,
+                                     end_seconds=(start + len(audio)) / MODEL_SAMPLE_RATE)
+                    job.segments_done += 1
+                job.processed_seconds = (start + len(audio)) / MODEL_SAMPLE_RATE
+                if time.monotonic() - saved_at >= self.progress_interval_s:
+                    self._save_progress(job)
+                    saved_at = time.monotonic()
+            # A job is only completed once every result is stored
+            self.results.flush(session)
+            job.status = TranscriptionJob.STATUS_COMPLETED
+            job.processed_seconds = job.duration_seconds or job.processed_seconds
+        except Exception as e:
+            logger.error(f"Error transcribing job {job.job_id}: {e}")
+            job.status = TranscriptionJob.STATUS_FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = timezone.now()
+            self._finish(job)
+            if job.status == TranscriptionJob.STATUS_COMPLETED:
+                self.jobs_completed += 1
+            else:
+                self.jobs_failed += 1
+            try:
+                session.is_active = False
+                session.save(update_fields=['is_active', 'updated_at'])
+            except Exception as e:
+                logger.error(f"Error ending session of job {job.job_id}: {e}")
+            if not self.keep_uploads:
+                try:
+                    os.remove(job.audio_path)
+                except OSError as e:
+                    logger.error(f"Error removing upload of job {job.job_id}: {e}")
+
+    def _finish(self, job: TranscriptionJob):
+        """Save the job's end state; a job whose results cannot be stored is saved failed"""
+        try:
+            self._save_progress(job, 'status', 'error', 'finished_at')
+            return
+        except Exception as e:
+            logger.error(f"Error storing results of job {job.job_id}: {e}")
+            if job.status != TranscriptionJob.STATUS_FAILED:
+                job.status = TranscriptionJob.STATUS_FAILED
+                job.error = str(e)
+        try:
+            # Without the flush, so a failing result write cannot leave the job running
+            job.save(update_fields=['processed_seconds', 'segments_done', 'segments_failed',
+                                    'status', 'error', 'finished_at'])
+        except Exception as e:
+            logger.error(f"Error saving job {job.job_id}: {e}")
+
+    def _save_progress(self, job: TranscriptionJob, *fields: str):
+        # Results first: progress never runs ahead of what readers can fetch
+        self.results.flush(job.session)
+        job.save(update_fields=['processed_seconds', 'segments_done', 'segments_failed', *fields])
+
+    def stats(self) -> dict:
+        active = self._active
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queued': self.max_queued,
+            'running': min(active, self.max_concurrent),
+            'queued': max(0, active - self.max_concurrent),
+            'jobs_completed': self.jobs_completed,
+            'jobs_failed': self.jobs_failed,
+        }
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide job runner configured from TRANSCRIPTION_JOBS"""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                config = getattr(settings, 'TRANSCRIPTION_JOBS', {})
+                _runner = JobRunner(
+                    upload_dir=config.get('UPLOAD_DIR', '/tmp/transcription_jobs'),
+                    max_concurrent=config.get('MAX_CONCURRENT', 2),
+                    max_queued=config.get('MAX_QUEUED', 20),
+                    max_segment_s=config.get('MAX_SEGMENT', 15.0),
+                    progress_interval_s=config.get('PROGRESS_INTERVAL_MS', 1000) / 1000,
+                    keep_uploads=config.get('KEEP_UPLOADS', False)
+                )
+                try:
+                    _runner.fail_interrupted_jobs()
+                except Exception as e:
+                    logger.error(f"Error failing interrupted transcription jobs: {e}")
+    return _runner
+
+
+def job_state(job: TranscriptionJob) -> dict:
+    return {
+        'job_id': job.job_id,
+        'session_id': job.session.session_id,
+        'status': job.status,
+        'progress': round(job.progress, 4),
+        'duration_seconds': job.duration_seconds,
+        'processed_seconds': round(job.processed_seconds, 3),
+        'segments_done': job.segments_done,
+        'segments_failed': job.segments_failed,
+        'error': job.error or None,
+    }
+
+
+def _event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return '\n'.join(lines) + '\n\n'
+
+
+@database_sync_to_async
+def _load_job(job_id: str) -> TranscriptionJob:
+    return TranscriptionJob.objects.select_related('session').get(job_id=job_id)
+
+
+@database_sync_to_async
+def _results_after(job: TranscriptionJob, last_chunk: int) -> List[Tuple]:
+    # chunk_number is unique per session, so it alone is the keyset
+    return list(
+        TranscriptionResult.objects
+        .filter(session_id=job.session_id, chunk_number__gt=last_chunk)
+        .order_by('chunk_number')
+        .values_list('chunk_number', 'transcription_text', 'confidence_score', 'start_seconds', 'end_seconds',
+                     'timestamp')[:EXPORT_BATCH_SIZE]
+    )
+
+
+async def job_events(job_id: str, last_chunk: int = -1,
+                     poll_interval_s: float = EVENT_POLL_INTERVAL_S) -> AsyncIterator[str]:
+    """Server-sent events for one job: results in chunk order, progress, then its end.
+
+    ``result`` events carry the chunk number as their id, so a client that
+    reconnects with Last-Event-ID continues after the last result it got.
+    ``progress`` is sent whenever it changes and ``end`` once the job has
+    finished and every result has been sent. Only committed rows are read,
+    so any server process can stream any job.
+    """
+    state = None
+    quiet_since = time.monotonic()
+    while True:
+        # The job is read before its results: once it is seen finished, the
+        # runner has already flushed every row
+        job = await _load_job(job_id)
+        rows = await _results_after(job, last_chunk)
+        for chunk_number, text, confidence, start_seconds, end_seconds, timestamp in rows:
+            yield _event('result', {
+                'chunk_number': chunk_number,
+                'transcription_text': text,
+                'confidence_score': confidence,
+                'start_seconds': start_seconds,
+                'end_seconds': end_seconds,
+                'timestamp': timestamp.isoformat(),
+            }, event_id=chunk_number)
+            last_chunk = chunk_number
+
+        if len(rows) == EXPORT_BATCH_SIZE:
+            continue  # more committed rows are waiting
+        if job_state(job) != state:
+            state = job_state(job)
+            yield _event('progress', state)
+            quiet_since = time.monotonic()
+        elif rows:
+            quiet_since = time.monotonic()
+        if job.status in TranscriptionJob.FINISHED:
+            yield _event('end', state)
+            return
+
+        if time.monotonic() - quiet_since >= EVENT_KEEPALIVE_S:
+            yield ': keepalive\n\n'
+            quiet_since = time.monotonic()
+        await asyncio.sleep(poll_interval_s)
@@ -0,0 +1,100 @@
+import time
+import tracemalloc
+
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from transcription.models import TranscriptionResult, TranscriptionSession
+from transcription.serializers import TranscriptionResultSerializer
+
+
+class Command(BaseCommand):
+    help = ('Compare peak memory of the all-at-once results view and the streamed export, '
+            'served through the ASGI handler as under Daphne')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                            help='results per session')
+        parser.add_argument('--format', default='jsonl', choices=['jsonl', 'srt', 'vtt'])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'results':>8} {'serializer MB':>14} {'s':>6} {'streamed MB':>12} {'s':>6} "
+                          f"{'first byte s':>12}")
+        for size in options['sizes']:
+            session = self.create_session(size)
+            try:
+                full_peak, full_s = self.measure(lambda: self.serialize_all(session))
+                stream_peak, stream_s = self.measure(lambda: self.stream(session, options['format']))
+            finally:
+                session.delete()
+            self.stdout.write(f"{size:>8} {full_peak / 2**20:>14.1f} {full_s:>6.2f} "
+                              f"{stream_peak / 2**20:>12.1f} {stream_s:>6.2f} {self.first_byte_s:>12.3f}")
+
+    def create_session(self, size):
+        TranscriptionSession.objects.filter(session_id='bench_export').delete()
+        session = TranscriptionSession.objects.create(session_id='bench_export', language_code='hi')
+        text = 'नमस्ते, यह एक परीक्षण वाक्य है जो निर्यात को मापने के लिए है'
+        TranscriptionResult.objects.bulk_create(
+            (TranscriptionResult(session=session, chunk_number=i, transcription_text=text)
+             for i in range(size)),
+            batch_size=1000
+        )
+        return session
+
+    def serialize_all(self, session):
+        """What get_session_results does: every row, serialized and rendered at once"""
+        results = TranscriptionResult.objects.filter(session=session).order_by('chunk_number')
+        return len(JSONRenderer().render(TranscriptionResultSerializer(results, many=True).data))
+
+    def stream(self, session, export_format):
+        """GET the export through Django's ASGI handler, discarding each body message as it arrives.
+
+        A response the handler buffers shows up here as a peak that grows with
+        the session and a first byte that arrives only at the end.
+        """
+        return async_to_sync(self.asgi_get)(f'/api/session/{session.session_id}/export/{export_format}/')
+
+    async def asgi_get(self, path):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'root_path': '', 'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+        }
+        requested = False
+        start = time.perf_counter()
+        self.first_byte_s = None
+        status, size = None, 0
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message.get('body'):
+                if self.first_byte_s is None:
+                    self.first_byte_s = time.perf_counter() - start
+                size += len(message['body'])
+
+        await get_asgi_application()(scope, receive, send)
+        if status != 200:
+            raise CommandError(f"Export returned HTTP {status}")
+        return size
+
+    def measure(self, fn):
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak, time.perf_counter() - start
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from transcription.models import TranscriptionResult, TranscriptionSession
+from transcription.persistence import ResultBuffer
+
+
+class Command(BaseCommand):
+    help = 'Compare result-persistence throughput: per-chunk writes vs the write-behind buffer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=100)
+        parser.add_argument('--chunks', type=int, default=20, help='chunks per session')
+        parser.add_argument('--max-pending', type=int, default=50)
+        parser.add_argument('--max-delay-ms', type=float, default=500)
+
+    def handle(self, *args, **options):
+        sessions = options['sessions']
+        chunks = options['chunks']
+        total = sessions * chunks
+
+        direct = self.run(sessions, chunks, self.direct_writer())
+        buffer = ResultBuffer(max_pending=options['max_pending'], max_delay_s=options['max_delay_ms'] / 1000)
+        buffered = self.run(sessions, chunks, self.buffered_writer(buffer))
+
+        self.stdout.write(f"{sessions} concurrent sessions x {chunks} chunks = {total} results")
+        self.stdout.write(f"{'persistence':<14} {'seconds':>8} {'chunks/s':>10}")
+        self.stdout.write(f"{'per-chunk':<14} {direct:>8.2f} {total / direct:>10.0f}")
+        self.stdout.write(f"{'write-behind':<14} {buffered:>8.2f} {total / buffered:>10.0f}")
+        self.stdout.write(f"write-behind: {buffer.flushes} flushes, x{direct / buffered:.1f} chunks/s")
+
+    def direct_writer(self):
+        """The previous path: look the session up and insert one row per chunk"""
+        def write(session_id, chunk_number):
+            session, _ = TranscriptionSession.objects.get_or_create(
+                session_id=session_id,
+                defaults={'language_code': 'hi', 'is_active': True}
+            )
+            TranscriptionResult.objects.create(
+                session=session, chunk_number=chunk_number, transcription_text='bench'
+            )
+
+        def finish(session_id):
+            pass
+
+        return write, finish
+
+    def buffered_writer(self, buffer):
+        def write(session_id, chunk_number):
+            buffer.add(buffer.get_session(session_id, 'hi'), chunk_number, 'bench')
+
+        def finish(session_id):
+            buffer.flush(buffer.get_session(session_id, 'hi'))
+
+        return write, finish
+
+    def run(self, sessions, chunks, writer):
+        """Wall time for every session to write all its chunks, one thread per session"""
+        write, finish = writer
+        session_ids = [f"bench_persist_{i}" for i in range(sessions)]
+        TranscriptionSession.objects.filter(session_id__in=session_ids).delete()
+        errors = []
+
+        def session_worker(session_id):
+            try:
+                for chunk_number in range(chunks):
+                    write(session_id, chunk_number)
+                finish(session_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=session_worker, args=(session_id,)) for session_id in session_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        written = TranscriptionResult.objects.filter(session__session_id__in=session_ids).count()
+        TranscriptionSession.objects.filter(session_id__in=session_ids).delete()
+        if errors:
+            raise RuntimeError(f"{len(errors)} sessions failed, first error: {errors[0]}")
+        if written != sessions * chunks:
+            raise RuntimeError(f"Expected {sessions * chunks} results, found {written}")
+        return elapsed
@@ -0,0 +1,77 @@
+import asyncio
+import base64
+import json
+import time
+
+import numpy as np
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import re_path
+
+from dubsync_core.wire import pack_audio_frame
+from transcription.consumers import TranscriptionConsumer
+
+
+class FramingOnlyConsumer(TranscriptionConsumer):
+    """Runs the real receive and decode path, then acks instead of transcribing"""
+
+    async def process_audio(self, audio_array, sample_rate, language_code, chunk_number, received_at=None):
+        await self.send(text_data='{"type": "ack"}')
+
+
+class Command(BaseCommand):
+    help = 'Compare per-chunk server CPU for JSON/base64 and binary WebSocket audio frames'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunks', type=int, default=500)
+        parser.add_argument('--chunk-seconds', type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        samples = int(options['chunk_seconds'] * 16000)
+        audio = np.random.default_rng(0).uniform(-0.5, 0.5, samples).astype(np.float32)
+        chunks = options['chunks']
+
+        json_messages = [
+            json.dumps({
+                'type': 'audio_chunk',
+                'audio_data': base64.b64encode(audio.tobytes()).decode('ascii'),
+                'language_code': 'hi',
+                'chunk_number': i,
+                'sample_rate': 16000,
+            })
+            for i in range(chunks)
+        ]
+        binary_frames = [pack_audio_frame(audio, i, 16000, 'hi') for i in range(chunks)]
+
+        with override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}):
+            json_cpu = asyncio.run(self.run(json_messages, 'text_data'))
+            binary_cpu = asyncio.run(self.run(binary_frames, 'bytes_data'))
+
+        self.stdout.write(f"{chunks} chunks of {options['chunk_seconds']:.1f} s float32 audio")
+        self.stdout.write(f"{'framing':<14} {'bytes/chunk':>12} {'CPU us/chunk':>13}")
+        self.stdout.write(f"{'json+base64':<14} {len(json_messages[0]):>12} {json_cpu * 1e6 / chunks:>13.1f}")
+        self.stdout.write(f"{'binary':<14} {len(binary_frames[0]):>12} {binary_cpu * 1e6 / chunks:>13.1f}")
+        self.stdout.write(f"binary frames: {1 - len(binary_frames[0]) / len(json_messages[0]):.0%} smaller, "
+                          f"x{json_cpu / max(binary_cpu, 1e-9):.1f} less CPU per chunk")
+
+    async def run(self, messages, field):
+        """Process CPU seconds to push every message through the consumer"""
+        application = URLRouter([
+            re_path(r'ws/transcription/(?P<session_id>\w+)/$', FramingOnlyConsumer.as_asgi()),
+        ])
+        communicator = WebsocketCommunicator(application, '/ws/transcription/bench/')
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise RuntimeError("WebSocket connection refused")
+        await communicator.receive_from()  # connection_established
+
+        start = time.process_time()
+        for message in messages:
+            await communicator.send_to(**{field: message})
+            await communicator.receive_from()
+        elapsed = time.process_time() - start
+
+        await communicator.disconnect()
+        return elapsed
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transcriptionresult',
+            index=models.Index(fields=['session', 'chunk_number'], name='transcriptio_session_chunk_idx'),
+        ),
+    ]
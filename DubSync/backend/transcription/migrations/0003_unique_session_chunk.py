@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:16
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_results(apps, schema_editor):
+    """Keep the first stored result of each (session, chunk_number)"""
+    TranscriptionResult = apps.get_model('transcription', 'TranscriptionResult')
+    duplicates = (
+        TranscriptionResult.objects
+        .values('session_id', 'chunk_number')
+        .annotate(first_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        TranscriptionResult.objects.filter(
+            session_id=duplicate['session_id'],
+            chunk_number=duplicate['chunk_number'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0002_result_session_chunk_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='transcriptionresult',
+            constraint=models.UniqueConstraint(fields=('session', 'chunk_number'), name='unique_session_chunk'),
+        ),
+        # The unique constraint's index replaces the plain composite index
+        migrations.RemoveIndex(
+            model_name='transcriptionresult',
+            name='transcriptio_session_chunk_idx',
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0003_unique_session_chunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=100, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('audio_path', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('processed_seconds', models.FloatField(default=0.0)),
+                ('segments_done', models.IntegerField(default=0)),
+                ('segments_failed', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='job', to='transcription.transcriptionsession')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcription', '0004_transcription_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='runner',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='transcriptionresult',
+            name='end_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transcriptionresult',
+            name='start_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
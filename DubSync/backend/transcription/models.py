@@ -3,11 +3,68 @@ import logging
 import threading
 import random
 import time
-from typing import Optional, Dict, Any
+from concurrent.futures import Future
+from functools import partial
+from typing import Optional, Dict, Any, List, Tuple
+from django.conf import settings
 from django.db import models
+from dubsync_core import (
+    IncrementalDecoder, LanguageRegistry, LatencyTracer, MicroBatcher, SlidingWindowStreamer, transcribe_windowed
+)
+from dubsync_core.backends import DEFAULT_MODEL_NAME, load_backend, load_language_head
+from dubsync_core.resampling import MODEL_SAMPLE_RATE, resample
 
 logger = logging.getLogger(__name__)
 
+# Input samples per output frame of the wav2vec2-style CTC encoder
+SAMPLES_PER_FRAME = 320
+
+# Failed chunks still return text, starting with this marker
+TRANSCRIPTION_ERROR_PREFIX = "[Transcription error"
+
+# Languages IndicConformer supports; codes are also registry keys and head file names
+LANGUAGE_MAPPING = {
+    'as': 'Assamese',
+    'bn': 'Bengali', 
+    'brx': 'Bodo',
+    'doi': 'Dogri',
+    'gu': 'Gujarati',
+    'hi': 'Hindi',
+    'kn': 'Kannada',
+    'kok': 'Konkani',
+    'ks': 'Kashmiri',
+    'mai': 'Maithili',
+    'ml': 'Malayalam',
+    'mni': 'Manipuri',
+    'mr': 'Marathi',
+    'ne': 'Nepali',
+    'or': 'Odia',
+    'pa': 'Punjabi',
+    'sa': 'Sanskrit',
+    'sat': 'Santali',
+    'sd': 'Sindhi',
+    'ta': 'Tamil',
+    'te': 'Telugu',
+    'ur': 'Urdu'
+}
+
+# Demo language samples
+DEMO_SAMPLES = {
+    'hi': ['नमस्ते, मैं हिंदी में बोल रहा हूं', 'यह एक परीक्षण है', 'आपका स्वागत है'],
+    'bn': ['নমস্কার, আমি বাংলায় কথা বলছি', 'এটি একটি পরীক্ষা', 'আপনাকে স্বাগতম'],
+    'ta': ['வணக்கம், நான் தமிழில் பேசுகிறேன்', 'இது ஒரு சோதனை', 'உங்களை வரவேற்கிறோம்'],
+    'te': ['నమస్కారం, నేను తెలుగులో మాట్లాడుతున్నాను', 'ఇది ఒక పరీక్ష', 'మీకు స్వాగతం'],
+    'gu': ['નમસ્તે, હું ગુજરાતીમાં બોલી રહ્યો છું', 'આ એક પરીક્ષણ છે', 'તમારું સ્વાગત છે'],
+    'mr': ['नमस्कार, मी मराठीत बोलत आहे', 'ही एक चाचणी आहे', 'तुमचे स्वागत आहे'],
+    'pa': ['ਸਤ ਸ੍ਰੀ ਅਕਾਲ, ਮੈਂ ਪੰਜਾਬੀ ਵਿੱਚ ਬੋਲ ਰਿਹਾ ਹਾਂ', 'ਇਹ ਇੱਕ ਟੈਸਟ ਹੈ', 'ਤੁਹਾਡਾ ਸੁਆਗਤ ਹੈ'],
+    'kn': ['ನಮಸ್ಕಾರ, ನಾನು ಕನ್ನಡದಲ್ಲಿ ಮಾತನಾಡುತ್ತಿದ್ದೇನೆ', 'ಇದು ಒಂದು ಪರೀಕ್ಷೆ', 'ನಿಮಗೆ ಸ್ವಾಗತ'],
+    'ml': ['നമസ്കാരം, ഞാൻ മലയാളത്തിൽ സംസാരിക്കുന്നു', 'ഇത് ഒരു പരീക്ഷണമാണ്', 'നിങ്ങളെ സ്വാഗതം ചെയ്യുന്നു'],
+    'or': ['ନମସ୍କାର, ମୁଁ ଓଡ଼ିଆରେ କହୁଛି', 'ଏହା ଏକ ପରୀକ୍ଷା', 'ଆପଣଙ୍କୁ ସ୍ୱାଗତ'],
+    'as': ['নমস্কাৰ, মই অসমীয়াত কৈছো', 'এইটো এটা পৰীক্ষা', 'আপোনাক স্বাগতম'],
+    'ur': ['السلام علیکم، میں اردو میں بول رہا ہوں', 'یہ ایک ٹیسٹ ہے', 'آپ کا خیر مقدم']
+}
+
+
 class IndicConformerModel:
     """Singleton class to manage the IndicConformer model"""
     _instance = None
@@ -17,7 +74,43 @@ class IndicConformerModel:
         self.model = None
         self.device = None
         self.is_loaded = False
+        self.backend = None
+        self.processor = None
+        self.model_settings = getattr(settings, 'TRANSCRIPTION_MODEL', {})
+        
+        # Frame-level CTC access, set by backends that expose logits
+        self.logits_fn = None
+        self.decode_tokens = None
+        self.blank_id = 0
+        self.streaming_settings = getattr(settings, 'TRANSCRIPTION_STREAMING', {})
+        
+        # Shared by every request and consumer that uses the model
+        tracing = getattr(settings, 'TRANSCRIPTION_TRACING', {})
+        self.tracer = LatencyTracer(
+            window=tracing.get('WINDOW', 1000),
+            enabled=tracing.get('ENABLED', True)
+        )
+        
         self._initialize_model()
+        
+        # Per-language components, loaded on first use and evicted LRU
+        self.language_settings = getattr(settings, 'TRANSCRIPTION_LANGUAGES', {})
+        budget_mb = self.language_settings.get('MEMORY_BUDGET_MB', 256)
+        self.languages = LanguageRegistry(
+            self._load_language,
+            budget_bytes=int(budget_mb * 2**20) if budget_mb else None
+        )
+        
+        # Cross-session micro-batching: concurrent chunks share one forward pass
+        self.batcher = None
+        batching = getattr(settings, 'TRANSCRIPTION_BATCHING', {})
+        if batching.get('ENABLED', False):
+            self.batcher = MicroBatcher(
+                self._transcribe_requests,
+                max_batch_size=batching.get('MAX_BATCH_SIZE', 8),
+                max_wait_s=batching.get('MAX_WAIT_MS', 20) / 1000,
+                tracer=self.tracer
+            )
     
     @classmethod
     def get_instance(cls):
@@ -28,7 +121,12 @@ class IndicConformerModel:
         return cls._instance
     
     def _initialize_model(self):
-        """Initialize the demo IndicConformer model"""
+        """Initialize the configured model backend ('demo', 'torch' or 'onnx')"""
+        backend_name = self.model_settings.get('BACKEND', 'demo')
+        if backend_name != 'demo':
+            self._initialize_ctc_backend(backend_name)
+            return
+        
         try:
             # Demo mode - always use CPU
             self.device = "cpu"
@@ -43,6 +141,70 @@ class IndicConformerModel:
             logger.error(f"Failed to initialize demo model: {e}")
             self.is_loaded = False
     
+    def _initialize_ctc_backend(self, backend_name: str):
+        """Load the CTC model and run it through the selected inference backend"""
+        try:
+            self.device = "cpu"
+            model_name = self.model_settings.get('MODEL_NAME', DEFAULT_MODEL_NAME)
+            logger.info(f"Loading {model_name} with the {backend_name} backend")
+            
+            self.model, self.processor, self.backend = load_backend(
+                backend_name,
+                model_name=model_name,
+                device=self.device,
+                quantize=self.model_settings.get('QUANTIZE') or None,
+                cache_dir=self.model_settings.get('CACHE_DIR', 'model_cache'),
+                onnx_path=self.model_settings.get('ONNX_PATH') or None,
+                intra_op_threads=self.model_settings.get('INTRA_OP_THREADS', 0),
+                inter_op_threads=self.model_settings.get('INTER_OP_THREADS', 0),
+                shared_weights=self.model_settings.get('SHARED_WEIGHTS', False),
+            )
+            
+            self.logits_fn = self.compute_logits
+            self.decode_tokens = lambda ids: self.processor.tokenizer.decode(ids, group_tokens=False)
+            self.blank_id = self.processor.tokenizer.pad_token_id
+            self.is_loaded = True
+            logger.info(f"IndicConformer model initialized ({backend_name} backend)")
+            
+        except Exception as e:
+            logger.error(f"Failed to initialize {backend_name} backend: {e}")
+            self.is_loaded = False
+    
+    def _load_language(self, language_code: str):
+        """Registry loader: the language's CTC head, phrase list in demo mode, or None for the built-in head"""
+        if language_code not in LANGUAGE_MAPPING:
+            raise ValueError(f"Unsupported language code: {language_code}")
+        if self.backend is None:
+            return DEMO_SAMPLES.get(language_code, DEMO_SAMPLES['hi'])
+        
+        heads_dir = self.language_settings.get('HEADS_DIR')
+        if not heads_dir:
+            return None
+        head = load_language_head(heads_dir, language_code)
+        if head is None:
+            logger.warning(f"No language head for {language_code} in {heads_dir}, using the built-in head")
+        return head
+    
+    def prefetch_language(self, language_code: str):
+        """Start loading a language's components before its first chunk arrives"""
+        if self.language_settings.get('PREFETCH', True):
+            self.languages.prefetch(language_code)
+    
+    def compute_logits(self, audio_data: np.ndarray, head=None) -> np.ndarray:
+        """Per-frame CTC logits (frames, vocab) for one mono 16 kHz array"""
+        with self.tracer.span('preprocess'):
+            inputs = self.processor(audio_data, sampling_rate=16000, return_tensors="np")
+        with self.tracer.span('forward'):
+            if head is None:
+                return self.backend.logits(inputs.input_values)[0]
+            return head.logits(self.backend.hidden_states(inputs.input_values)[0])
+    
+    def decode_logits(self, logits: np.ndarray, head=None) -> str:
+        predicted_ids = np.argmax(logits, axis=-1)
+        if head is None:
+            return self.processor.decode(predicted_ids).strip()
+        return head.decode(predicted_ids)
+    
     def _create_dummy_model(self):
         """Create a dummy model for development/testing"""
         logger.warning("Creating dummy model for development")
@@ -50,54 +212,188 @@ class IndicConformerModel:
         self.is_loaded = False
     
     def preprocess_audio(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
-        """Demo audio preprocessing"""
+        """Resample a complete chunk to the model's 16 kHz input rate"""
         try:
-            # Simple demo preprocessing - just return the input
-            return audio_data
+            # WebSocket streams arrive here already at 16 kHz, resampled with
+            # per-session filter state in TranscriptionConsumer; this covers
+            # standalone chunks such as REST uploads
+            return resample(audio_data, sample_rate, MODEL_SAMPLE_RATE)
             
         except Exception as e:
             logger.error(f"Error preprocessing audio: {e}")
             raise
     
-    def transcribe(self, audio_data: np.ndarray, sample_rate: int, language_code: str) -> str:
+    def create_streamer(self, head=None) -> Optional[SlidingWindowStreamer]:
+        """Create a sliding-window streamer using the configured window, or None without logits"""
+        if self.logits_fn is None:
+            return None
+        return SlidingWindowStreamer(
+            self.logits_fn if head is None else partial(self.compute_logits, head=head),
+            hop_s=self.streaming_settings.get('HOP', 1.0),
+            left_context_s=self.streaming_settings.get('LEFT_CONTEXT', 1.0),
+            right_context_s=self.streaming_settings.get('RIGHT_CONTEXT', 0.5),
+        )
+    
+    def create_incremental_decoder(self, language_code: Optional[str] = None) -> Optional[IncrementalDecoder]:
+        """Create a decoder for interim results of a growing utterance, or None without logits.
+
+        Uses the language's head when it has one, like ``transcribe``; may
+        block while the head loads.
+        """
+        if self.logits_fn is None:
+            return None
+        head = None
+        if language_code is not None and self.backend is not None:
+            head = self.languages.get(language_code)
+        streamer = self.create_streamer(head)
+        if head is None:
+            return IncrementalDecoder(streamer, self.decode_tokens, blank_id=self.blank_id)
+        return IncrementalDecoder(streamer, head.decode_tokens, blank_id=head.blank_id)
+    
+    def transcribe_streaming(self, audio_data: np.ndarray, language_code: Optional[str] = None) -> str:
+        """Transcribe with overlapping windows, merging centre frames before one CTC decode.
+
+        Uses the language's head when it has one, like the whole-chunk path.
+        """
+        head = None
+        if language_code is not None and self.backend is not None:
+            head = self.languages.get(language_code)
+        if head is None:
+            logits_fn, decode_tokens, blank_id = self.logits_fn, self.decode_tokens, self.blank_id
+        else:
+            logits_fn, decode_tokens, blank_id = partial(self.compute_logits, head=head), head.decode_tokens, head.blank_id
+        return transcribe_windowed(
+            audio_data,
+            logits_fn,
+            decode_tokens,
+            blank_id=blank_id,
+            hop_s=self.streaming_settings.get('HOP', 1.0),
+            left_context_s=self.streaming_settings.get('LEFT_CONTEXT', 1.0),
+            right_context_s=self.streaming_settings.get('RIGHT_CONTEXT', 0.5),
+        )
+    
+    def transcribe(self, audio_data: np.ndarray, sample_rate: int, language_code: str,
+                   streaming: Optional[bool] = None) -> str:
         """Transcribe audio data"""
+        if streaming is None:
+            streaming = self.streaming_settings.get('ENABLED', False)
+        audio_data = self.preprocess_audio(audio_data, sample_rate)
+        if streaming and self.logits_fn is not None:
+            try:
+                return self.transcribe_streaming(audio_data, language_code)
+            except Exception as e:
+                logger.error(f"Error during streaming transcription: {e}")
+                return f"[Transcription error: {str(e)}]"
+        
+        if self.backend is not None:
+            try:
+                if len(audio_data) == 0:
+                    return ""
+                head = self.languages.get(language_code)
+                logits = self.compute_logits(audio_data, head)
+                with self.tracer.span('decode'):
+                    return self.decode_logits(logits, head)
+            except Exception as e:
+                logger.error(f"Error during transcription: {e}")
+                return f"[Transcription error: {str(e)}]"
+        
         try:
-            # Demo mode - simulate transcription
-            import random
-            import time
-            
-            # Demo language samples
-            demo_samples = {
-                'hi': ['नमस्ते, मैं हिंदी में बोल रहा हूं', 'यह एक परीक्षण है', 'आपका स्वागत है'],
-                'bn': ['নমস্কার, আমি বাংলায় কথা বলছি', 'এটি একটি পরীক্ষা', 'আপনাকে স্বাগতম'],
-                'ta': ['வணக்கம், நான் தமிழில் பேசுகிறேன்', 'இது ஒரு சோதனை', 'உங்களை வரவேற்கிறோம்'],
-                'te': ['నమస్కారం, నేను తెలుగులో మాట్లాడుతున్నాను', 'ఇది ఒక పరీక్ష', 'మీకు స్వాగతం'],
-                'gu': ['નમસ્તે, હું ગુજરાતીમાં બોલી રહ્યો છું', 'આ એક પરીક્ષણ છે', 'તમારું સ્વાગત છે'],
-                'mr': ['नमस्कार, मी मराठीत बोलत आहे', 'ही एक चाचणी आहे', 'तुमचे स्वागत आहे'],
-                'pa': ['ਸਤ ਸ੍ਰੀ ਅਕਾਲ, ਮੈਂ ਪੰਜਾਬੀ ਵਿੱਚ ਬੋਲ ਰਿਹਾ ਹਾਂ', 'ਇਹ ਇੱਕ ਟੈਸਟ ਹੈ', 'ਤੁਹਾਡਾ ਸੁਆਗਤ ਹੈ'],
-                'kn': ['ನಮಸ್ಕಾರ, ನಾನು ಕನ್ನಡದಲ್ಲಿ ಮಾತನಾಡುತ್ತಿದ್ದೇನೆ', 'ಇದು ಒಂದು ಪರೀಕ್ಷೆ', 'ನಿಮಗೆ ಸ್ವಾಗತ'],
-                'ml': ['നമസ്കാരം, ഞാൻ മലയാളത്തിൽ സംസാരിക്കുന്നു', 'ഇത് ഒരു പരീക്ഷണമാണ്', 'നിങ്ങളെ സ്വാഗതം ചെയ്യുന്നു'],
-                'or': ['ନମସ୍କାର, ମୁଁ ଓଡ଼ିଆରେ କହୁଛି', 'ଏହା ଏକ ପରୀକ୍ଷା', 'ଆପଣଙ୍କୁ ସ୍ୱାଗତ'],
-                'as': ['নমস্কাৰ, মই অসমীয়াত কৈছো', 'এইটো এটা পৰীক্ষা', 'আপোনাক স্বাগতম'],
-                'ur': ['السلام علیکم، میں اردو میں بول رہا ہوں', 'یہ ایک ٹیسٹ ہے', 'آپ کا خیر مقدم']
-            }
-            
-            # Simulate processing time
-            time.sleep(random.uniform(0.5, 1.2))
-            
-            # Check if audio has content
-            if len(audio_data) == 0 or np.max(np.abs(audio_data)) < 0.01:
-                return ""
-            
-            # Get samples for the language
-            samples = demo_samples.get(language_code, demo_samples['hi'])
+            # Demo mode - simulate processing time
+            with self.tracer.span('forward'):
+                time.sleep(random.uniform(0.5, 1.2))
             
-            # Return a random sample
-            return random.choice(samples)
+            return self._demo_transcription(audio_data, language_code)
                     
         except Exception as e:
             logger.error(f"Error during transcription: {e}")
             return f"Demo transcription for {language_code}"
+    
+    def transcribe_batch(self, audio_batch: List[np.ndarray], sample_rate: int,
+                         language_codes: List[str]) -> List[str]:
+        """Transcribe several chunks with one zero-padded, attention-masked forward pass"""
+        audio_batch = [self.preprocess_audio(audio, sample_rate) for audio in audio_batch]
+        sample_rate = MODEL_SAMPLE_RATE
+        if self.backend is None:
+            # Demo mode - one simulated forward pass for the whole batch
+            with self.tracer.span('forward'):
+                time.sleep(random.uniform(0.5, 1.2))
+            return [self._demo_transcription(audio, language)
+                    for audio, language in zip(audio_batch, language_codes)]
+        
+        if self.streaming_settings.get('ENABLED', False):
+            # Windowed inference carries per-chunk state and is not batched
+            return [self.transcribe(audio, sample_rate, language)
+                    for audio, language in zip(audio_batch, language_codes)]
+        
+        results = [""] * len(audio_batch)
+        indices = [i for i, audio in enumerate(audio_batch) if len(audio) > 0]
+        if not indices:
+            return results
+        
+        try:
+            heads = [self.languages.get(language_codes[i]) for i in indices]
+            with self.tracer.span('preprocess'):
+                inputs = self.processor(
+                    [audio_batch[i] for i in indices], sampling_rate=16000,
+                    padding=True, return_tensors="np"
+                )
+                # Present when the checkpoint's feature extractor expects it
+                # (layer-norm models such as XLS-R); group-norm models are
+                # trained on zero padding and must not get one
+                attention_mask = inputs.get('attention_mask')
+            with self.tracer.span('forward'):
+                # One encoder pass is shared by every language in the batch; rows
+                # using the built-in head go through the model's own output layer
+                hidden = None
+                logits = None
+                if any(head is not None for head in heads):
+                    hidden = self.backend.hidden_states(inputs.input_values, attention_mask)
+                else:
+                    logits = self.backend.logits(inputs.input_values, attention_mask)
+            with self.tracer.span('decode'):
+                for row, (i, head) in enumerate(zip(indices, heads)):
+                    # Drop the frames that only cover padding
+                    frames = max(1, len(audio_batch[i]) // SAMPLES_PER_FRAME)
+                    if logits is not None:
+                        row_logits = logits[row, :frames]
+                    elif head is None:
+                        row_logits = self.backend.output_logits(hidden[row, :frames])
+                    else:
+                        row_logits = head.logits(hidden[row, :frames])
+                    results[i] = self.decode_logits(row_logits, head)
+            return results
+        except Exception as e:
+            logger.error(f"Error during batch transcription: {e}")
+            return [f"[Transcription error: {str(e)}]"] * len(audio_batch)
+    
+    def _transcribe_requests(self, requests: List[Tuple[np.ndarray, int, str]]) -> List[str]:
+        """MicroBatcher callback: one batch of (audio, sample_rate, language_code)"""
+        # Sessions may send different rates; bring each chunk to 16 kHz first
+        audio_batch = [self.preprocess_audio(audio, sample_rate) for audio, sample_rate, _ in requests]
+        language_codes = [language for _, _, language in requests]
+        return self.transcribe_batch(audio_batch, MODEL_SAMPLE_RATE, language_codes)
+    
+    def submit(self, audio_data: np.ndarray, sample_rate: int, language_code: str) -> Future:
+        """Queue a chunk for the cross-session batcher; requires batching to be enabled"""
+        return self.batcher.submit((audio_data, sample_rate, language_code))
+    
+    def transcribe_scheduled(self, audio_data: np.ndarray, sample_rate: int, language_code: str) -> str:
+        """Blocking transcribe that goes through the batcher when it is enabled"""
+        if self.batcher is None or len(audio_data) == 0:
+            return self.transcribe(audio_data, sample_rate, language_code)
+        return self.submit(audio_data, sample_rate, language_code).result()
+    
+    def _demo_transcription(self, audio_data: np.ndarray, language_code: str) -> str:
+        """Canned phrase for the language, or empty for silent audio"""
+        # Check if audio has content
+        if len(audio_data) == 0 or np.max(np.abs(audio_data)) < 0.01:
+            return ""
+        
+        # Get samples for the language
+        samples = self.languages.get(language_code)
+        
+        # Return a random sample
+        return random.choice(samples)
 
 
 class TranscriptionSession(models.Model):
@@ -118,10 +414,63 @@ class TranscriptionResult(models.Model):
     chunk_number = models.IntegerField()
     transcription_text = models.TextField()
     confidence_score = models.FloatField(null=True, blank=True)
+    # Seconds into the session's audio, where known (job segments, utterances with partials)
+    start_seconds = models.FloatField(null=True, blank=True)
+    end_seconds = models.FloatField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['chunk_number']
+        constraints = [
+            # One result per chunk, however often it is retried; the constraint's
+            # index also serves per-session reads and exports in chunk order
+            models.UniqueConstraint(fields=['session', 'chunk_number'], name='unique_session_chunk'),
+        ]
+    
+    def __str__(self):
+        return f"Chunk {self.chunk_number}: {self.transcription_text[:50]}..."
+
+class TranscriptionJob(models.Model):
+    """Model to track a long-audio file transcribed in the background"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    FINISHED = (STATUS_COMPLETED, STATUS_FAILED)
+    
+    job_id = models.CharField(max_length=100, unique=True)
+    # Results are stored as the session's TranscriptionResult rows, one per segment
+    session = models.OneToOneField(TranscriptionSession, on_delete=models.CASCADE, related_name='job')
+    file_name = models.CharField(max_length=255)
+    audio_path = models.CharField(max_length=500)
+    # host:pid of the process that runs the job; its unfinished jobs are failed once it is gone
+    runner = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    processed_seconds = models.FloatField(default=0.0)
+    segments_done = models.IntegerField(default=0)
+    segments_failed = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    @property
+    def progress(self) -> float:
+        if self.status == self.STATUS_COMPLETED:
+            return 1.0
+        if not self.duration_seconds:
+            return 0.0
+        return min(1.0, self.processed_seconds / self.duration_seconds)
     
     def __str__(self):
-        return f"Chunk {self.chunk_number}: {self.transcription_text[:50]}..."
\ No newline at end of file
+        return f"Job {self.job_id} - {self.status}"
@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max
+from dubsync_core import LatencyTracer
+from dubsync_core.cache import ResultCache
+
+from .models import IndicConformerModel, TranscriptionResult, TranscriptionSession
+
+logger = logging.getLogger(__name__)
+
+
+class ResultBuffer:
+    """Write-behind buffer for TranscriptionResult rows.
+
+    ``add`` only appends an unsaved row to memory. Rows are written with one
+    ``bulk_create`` per flush, which happens when ``max_pending`` rows are
+    waiting, every ``max_delay_s`` on a background thread, and whenever a
+    caller needs the data (session end, disconnect, reading results).
+    Flushes are serialized, so once ``flush`` returns without raising, every
+    requested row added before the call has been committed. A row for a
+    (session, chunk_number) that is already stored is skipped, so the first
+    result of a retried chunk wins; if its text differs, the conflict is
+    logged and counted.
+
+    Each session's rows are written in their own transaction, so a failing
+    session does not hold back the others. Its rows go back to the front of
+    its queue and the background writer retries them after ``retry_delay_s``,
+    doubling per failure; after ``max_retries`` failed writes they are
+    dropped and counted.
+    """
+
+    def __init__(self, max_pending: int = 50, max_delay_s: float = 0.5, session_cache_size: int = 1024,
+                 max_retries: int = 5, retry_delay_s: float = 0.5, tracer: Optional[LatencyTracer] = None):
+        self.max_pending = max(1, max_pending)
+        self.max_delay_s = max_delay_s
+        self.session_cache_size = session_cache_size
+        self.max_retries = max(0, max_retries)
+        self.retry_delay_s = retry_delay_s
+        self.tracer = tracer or LatencyTracer(enabled=False)
+
+        self._pending: Dict[int, List[TranscriptionResult]] = {}
+        self._pending_count = 0
+        self._failures: Dict[int, int] = {}  # session pk -> failed writes of its oldest pending rows
+        self._retry_at: Dict[int, float] = {}  # session pk -> monotonic time of the next retry
+        self._sessions = OrderedDict()  # session_id -> TranscriptionSession, LRU
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.rows_skipped = 0
+        self.conflicts = 0
+        self.flushes = 0
+        self.write_errors = 0
+
+    def get_session(self, session_id: str, language_code: str = 'hi') -> TranscriptionSession:
+        """Session row for ``session_id``, created if missing and cached afterwards"""
+        with self._condition:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                return session
+        session, _ = TranscriptionSession.objects.get_or_create(
+            session_id=session_id,
+            defaults={'language_code': language_code, 'is_active': True}
+        )
+        self.remember_session(session)
+        return session
+
+    def remember_session(self, session: TranscriptionSession):
+        with self._condition:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.session_cache_size:
+                self._sessions.popitem(last=False)
+
+    def add(self, session: TranscriptionSession, chunk_number: int, transcription_text: str,
+            confidence_score: Optional[float] = None, start_seconds: Optional[float] = None,
+            end_seconds: Optional[float] = None):
+        """Queue one result row for the next flush"""
+        row = TranscriptionResult(
+            session=session,
+            chunk_number=chunk_number,
+            transcription_text=transcription_text,
+            confidence_score=confidence_score,
+            start_seconds=start_seconds,
+            end_seconds=end_seconds
+        )
+        with self._condition:
+            self._pending.setdefault(session.pk, []).append(row)
+            self._pending_count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='result-writer', daemon=True)
+                self._thread.start()
+            if self._pending_count >= self.max_pending:
+                self._condition.notify()
+
+    def flush(self, session: Optional[TranscriptionSession] = None) -> int:
+        """Write pending rows (of one session, or of all not waiting for a retry) and return how many were written.
+
+        Failed rows are queued again and the first error is raised once
+        every session has been tried.
+        """
+        with self._flush_lock:
+            with self._condition:
+                if session is None:
+                    now = time.monotonic()
+                    keys = [pk for pk in self._pending if self._retry_at.get(pk, 0) <= now]
+                else:
+                    keys = [session.pk] if session.pk in self._pending else []
+                batches = [(pk, self._pending.pop(pk)) for pk in keys]
+                self._pending_count -= sum(len(rows) for _, rows in batches)
+
+            written = 0
+            error = None
+            for pk, rows in batches:
+                try:
+                    with self.tracer.span('db_write'), transaction.atomic():
+                        new_rows = self._unstored(pk, rows)
+                        TranscriptionResult.objects.bulk_create(new_rows, ignore_conflicts=True)
+                except Exception as e:
+                    self._requeue(pk, rows, e)
+                    error = error or e
+                    continue
+                with self._condition:
+                    self._failures.pop(pk, None)
+                    self._retry_at.pop(pk, None)
+                written += len(new_rows)
+                self.flushes += 1
+            self.rows_written += written
+            if error is not None:
+                raise error
+            return written
+
+    def _unstored(self, pk: int, rows: List[TranscriptionResult]) -> List[TranscriptionResult]:
+        """Rows whose chunk is neither stored nor earlier in ``rows``; differing text for a taken chunk is a conflict"""
+        stored = dict(TranscriptionResult.objects.filter(
+            session_id=pk, chunk_number__in={row.chunk_number for row in rows}
+        ).values_list('chunk_number', 'transcription_text'))
+        new_rows = []
+        for row in rows:
+            text = stored.get(row.chunk_number)
+            if text is None:
+                stored[row.chunk_number] = row.transcription_text
+                new_rows.append(row)
+                continue
+            self.rows_skipped += 1
+            if text != row.transcription_text:
+                self.conflicts += 1
+                logger.warning(f"Chunk {row.chunk_number} of session {row.session.session_id} is already "
+                               f"stored with different text, keeping the first result")
+        return new_rows
+
+    def _requeue(self, pk: int, rows: List[TranscriptionResult], error: Exception):
+        """Put a session's failed rows back for a later retry, or drop them after ``max_retries``"""
+        self.write_errors += 1
+        with self._condition:
+            failures = self._failures.get(pk, 0) + 1
+            if failures > self.max_retries:
+                self._failures.pop(pk, None)
+                self._retry_at.pop(pk, None)
+                self.rows_dropped += len(rows)
+            else:
+                self._failures[pk] = failures
+                self._retry_at[pk] = time.monotonic() + self.retry_delay_s * 2 ** (failures - 1)
+                self._pending[pk] = rows + self._pending.get(pk, [])
+                self._pending_count += len(rows)
+        if failures > self.max_retries:
+            logger.error(f"Dropping {len(rows)} transcription results after {failures} failed writes: {error}")
+        else:
+            logger.error(f"Error writing {len(rows)} transcription results (attempt {failures}), "
+                         f"retrying: {error}")
+
+    def _due_count(self) -> int:
+        """Pending rows not waiting for a retry; called with the condition held"""
+        if not self._retry_at:
+            return self._pending_count
+        now = time.monotonic()
+        return sum(len(rows) for pk, rows in self._pending.items() if self._retry_at.get(pk, 0) <= now)
+
+    def next_chunk_number(self, session: TranscriptionSession) -> int:
+        """First chunk number not yet used by ``session``, counting rows still pending"""
+        self.flush(session)
+        last = TranscriptionResult.objects.filter(session=session).aggregate(last=Max('chunk_number'))['last']
+        return 0 if last is None else last + 1
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._due_count() >= self.max_pending, self.max_delay_s)
+            try:
+                self.flush()
+            except Exception:
+                pass  # already logged; failed rows wait for their retry
+            finally:
+                close_old_connections()
+
+    def stats(self) -> dict:
+        return {
+            'pending': self._pending_count,
+            'rows_written': self.rows_written,
+            'rows_dropped': self.rows_dropped,
+            'rows_skipped': self.rows_skipped,
+            'conflicts': self.conflicts,
+            'flushes': self.flushes,
+            'write_errors': self.write_errors,
+            'retrying_sessions': len(self._retry_at),
+            'cached_sessions': len(self._sessions),
+        }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_result_buffer() -> ResultBuffer:
+    """Process-wide result buffer configured from TRANSCRIPTION_PERSISTENCE"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = getattr(settings, 'TRANSCRIPTION_PERSISTENCE', {})
+                _buffer = ResultBuffer(
+                    max_pending=config.get('MAX_PENDING', 50),
+                    max_delay_s=config.get('MAX_DELAY_MS', 500) / 1000,
+                    max_retries=config.get('MAX_RETRIES', 5),
+                    retry_delay_s=config.get('RETRY_DELAY_MS', 500) / 1000,
+                    tracer=IndicConformerModel.get_instance().tracer
+                )
+    return _buffer
+
+
+_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """Process-wide cache of chunk results configured from TRANSCRIPTION_RESULT_CACHE"""
+    global _cache
+    if _cache is None:
+        with _buffer_lock:
+            if _cache is None:
+                config = getattr(settings, 'TRANSCRIPTION_RESULT_CACHE', {})
+                _cache = ResultCache(
+                    max_entries=config.get('MAX_ENTRIES', 4096),
+                    ttl_s=config.get('TTL_S', 300)
+                )
+    return _cache
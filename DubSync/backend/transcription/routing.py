@@ -3,4 +3,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/transcription/(?P<session_id>\w+)/$', consumers.TranscriptionConsumer.as_asgi()),
+    re_path(r'ws/transcription/(?P<session_id>\w+)/captions/$', consumers.CaptionViewerConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from dubsync_core.resampling import SUPPORTED_SAMPLE_RATES
+from dubsync_core.wire import ENCODINGS
 from .models import TranscriptionSession, TranscriptionResult
 
 class TranscriptionSessionSerializer(serializers.ModelSerializer):
@@ -13,10 +15,11 @@ class TranscriptionResultSerializer(serializers.ModelSerializer):
 
 class AudioChunkSerializer(serializers.Serializer):
     audio_data = serializers.CharField()  # Base64 encoded audio
+    encoding = serializers.ChoiceField(choices=list(ENCODINGS), default='float32')
     session_id = serializers.CharField(max_length=100)
     language_code = serializers.CharField(max_length=10)
     chunk_number = serializers.IntegerField()
-    sample_rate = serializers.IntegerField(default=16000)
+    sample_rate = serializers.ChoiceField(choices=SUPPORTED_SAMPLE_RATES, default=16000)
 
 class LanguageSerializer(serializers.Serializer):
     code = serializers.CharField(max_length=10)
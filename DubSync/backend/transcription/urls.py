@@ -3,9 +3,19 @@ from . import views
 
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
+    path('metrics/latency/', views.latency_metrics, name='latency_metrics'),
+    path('metrics/batching/', views.batching_metrics, name='batching_metrics'),
+    path('metrics/languages/', views.language_metrics, name='language_metrics'),
+    path('metrics/cache/', views.cache_metrics, name='cache_metrics'),
+    path('metrics/jobs/', views.job_metrics, name='job_metrics'),
+    path('metrics/captions/', views.caption_metrics, name='caption_metrics'),
     path('languages/', views.get_supported_languages, name='supported_languages'),
     path('transcribe/', views.TranscriptionView.as_view(), name='transcribe'),
     path('session/create/', views.create_session, name='create_session'),
     path('session/<str:session_id>/end/', views.end_session, name='end_session'),
     path('session/<str:session_id>/results/', views.get_session_results, name='session_results'),
+    path('session/<str:session_id>/export/<str:export_format>/', views.export_session_results, name='export_session_results'),
+    path('jobs/', views.create_job, name='create_job'),
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<str:job_id>/events/', views.job_events_stream, name='job_events'),
 ]
\ No newline at end of file
@@ -1,15 +1,34 @@
 import base64
-import numpy as np
+import math
+import os
+import time
 import logging
 import uuid
+import soundfile as sf
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
 from django.utils.decorators import method_decorator
-from .models import IndicConformerModel, TranscriptionSession, TranscriptionResult
+from django.views.decorators.http import require_GET
+from .export import DEFAULT_CHUNK_SECONDS, EXPORT_CONTENT_TYPES, export_session
+from dubsync_core.cache import chunk_key
+from dubsync_core.resampling import SUPPORTED_SAMPLE_RATES
+from dubsync_core.wire import ENCODINGS, thread_decoder
+from .captions import caption_stats
+from .jobs import get_job_runner, job_events, job_state
+from .models import (
+    LANGUAGE_MAPPING, TRANSCRIPTION_ERROR_PREFIX, IndicConformerModel, TranscriptionJob, TranscriptionSession,
+    TranscriptionResult
+)
+from .persistence import get_result_buffer, get_result_cache
 from .serializers import (
     AudioChunkSerializer, 
     TranscriptionSessionSerializer, 
@@ -19,32 +38,6 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
-# Language mapping for IndicConformer
-LANGUAGE_MAPPING = {
-    'as': 'Assamese',
-    'bn': 'Bengali', 
-    'brx': 'Bodo',
-    'doi': 'Dogri',
-    'gu': 'Gujarati',
-    'hi': 'Hindi',
-    'kn': 'Kannada',
-    'kok': 'Konkani',
-    'ks': 'Kashmiri',
-    'mai': 'Maithili',
-    'ml': 'Malayalam',
-    'mni': 'Manipuri',
-    'mr': 'Marathi',
-    'ne': 'Nepali',
-    'or': 'Odia',
-    'pa': 'Punjabi',
-    'sa': 'Sanskrit',
-    'sat': 'Santali',
-    'sd': 'Sindhi',
-    'ta': 'Tamil',
-    'te': 'Telugu',
-    'ur': 'Urdu'
-}
-
 @api_view(['GET'])
 def get_supported_languages(request):
     """Get list of supported languages"""
@@ -61,14 +54,55 @@ def health_check(request):
     return Response({
         'status': 'healthy',
         'model_loaded': model_instance.is_loaded,
+        'backend': model_instance.backend.name if model_instance.backend else 'demo',
+        'quantize': model_instance.model_settings.get('QUANTIZE') or None,
         'device': str(model_instance.device) if model_instance.device else 'unknown'
     })
 
+@api_view(['GET'])
+def latency_metrics(request):
+    """Rolling per-stage latency percentiles (milliseconds)"""
+    tracer = IndicConformerModel.get_instance().tracer
+    return Response({
+        'enabled': tracer.enabled,
+        'window': tracer.window,
+        'stages': tracer.summary()
+    })
+
+@api_view(['GET'])
+def batching_metrics(request):
+    """Micro-batching scheduler stats: batch sizes, queue wait, throughput"""
+    batcher = IndicConformerModel.get_instance().batcher
+    if batcher is None:
+        return Response({'enabled': False})
+    return Response({'enabled': True, **batcher.stats()})
+
+@api_view(['GET'])
+def cache_metrics(request):
+    """Duplicate-chunk result cache: hit rate, size, expirations and evictions"""
+    return Response(get_result_cache().stats())
+
+@api_view(['GET'])
+def language_metrics(request):
+    """Language registry counters: hits, misses, evictions and resident languages"""
+    return Response(IndicConformerModel.get_instance().languages.stats())
+
+@api_view(['GET'])
+def job_metrics(request):
+    """Long-audio job runner: running and queued jobs, limits and outcomes"""
+    return Response(get_job_runner().stats())
+
+@api_view(['GET'])
+def caption_metrics(request):
+    """Caption fan-out: publishers, viewers, batches, coalescing and snapshots"""
+    return Response(caption_stats.stats())
+
 @method_decorator(csrf_exempt, name='dispatch')
 class TranscriptionView(APIView):
     """Main transcription endpoint"""
     
     def post(self, request):
+        received_at = time.monotonic()
         try:
             # Validate input data
             serializer = AudioChunkSerializer(data=request.data)
@@ -80,10 +114,13 @@ class TranscriptionView(APIView):
             
             data = serializer.validated_data
             
-            # Decode base64 audio data
+            # Decode base64 audio data (float32, int16 PCM or Ogg Opus)
             try:
                 audio_bytes = base64.b64decode(data['audio_data'])
-                audio_array = np.frombuffer(audio_bytes, dtype=np.float32)
+                max_chunk_s = getattr(settings, 'TRANSCRIPTION_AUDIO', {}).get('MAX_CHUNK_SECONDS', 30.0)
+                audio_array, sample_rate = thread_decoder(max_chunk_s=max_chunk_s).decode(
+                    audio_bytes, ENCODINGS[data['encoding']], data['sample_rate']
+                )
             except Exception as e:
                 logger.error(f"Error decoding audio data: {e}")
                 return Response(
@@ -91,6 +128,14 @@ class TranscriptionView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            # Opus streams carry their own rate, which the serializer has not seen
+            if sample_rate not in SUPPORTED_SAMPLE_RATES:
+                return Response(
+                    {'error': f'Unsupported sample rate: {sample_rate}',
+                     'sample_rates': list(SUPPORTED_SAMPLE_RATES)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
             # Validate language code
             language_code = data['language_code']
             if language_code not in LANGUAGE_MAPPING:
@@ -99,42 +144,48 @@ class TranscriptionView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Get or create transcription session
             session_id = data['session_id']
-            session, created = TranscriptionSession.objects.get_or_create(
-                session_id=session_id,
-                defaults={
-                    'language_code': language_code,
-                    'is_active': True
-                }
-            )
             
-            # Get model instance and transcribe
-            model_instance = IndicConformerModel.get_instance()
+            # A resent chunk is answered from the cache, without inference or a second row
+            cache = get_result_cache()
+            key = chunk_key(session_id, data['chunk_number'], language_code, sample_rate, audio_array)
+            transcription_text = cache.get(key)
             
-            if len(audio_array) == 0:
-                transcription_text = ""
-            else:
-                transcription_text = model_instance.transcribe(
-                    audio_array, 
-                    data['sample_rate'], 
-                    language_code
-                )
-            
-            # Save transcription result
-            result = TranscriptionResult.objects.create(
-                session=session,
-                chunk_number=data['chunk_number'],
-                transcription_text=transcription_text,
-                confidence_score=None  # Could be added later
-            )
+            if transcription_text is None:
+                # Get or create transcription session (cached after the first chunk)
+                results = get_result_buffer()
+                session = results.get_session(session_id, language_code)
+                
+                # Get model instance and transcribe
+                model_instance = IndicConformerModel.get_instance()
+                
+                if len(audio_array) == 0:
+                    transcription_text = ""
+                else:
+                    transcription_text = model_instance.transcribe_scheduled(
+                        audio_array, 
+                        sample_rate, 
+                        language_code
+                    )
+                
+                # Failed chunks are neither cached nor stored, so a retry runs again
+                if not transcription_text.startswith(TRANSCRIPTION_ERROR_PREFIX):
+                    cache.put(key, transcription_text)
+                    # Queue transcription result; it is written in the next batch
+                    results.add(
+                        session,
+                        data['chunk_number'],
+                        transcription_text,
+                        confidence_score=None  # Could be added later
+                    )
+                model_instance.tracer.record_since('total', received_at)
             
             return Response({
                 'session_id': session_id,
                 'chunk_number': data['chunk_number'],
                 'transcription': transcription_text,
                 'language': LANGUAGE_MAPPING[language_code],
-                'timestamp': result.timestamp.isoformat()
+                'timestamp': timezone.now().isoformat()
             })
             
         except Exception as e:
@@ -156,12 +207,16 @@ def create_session(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Load the language's components while the client starts streaming
+        IndicConformerModel.get_instance().prefetch_language(language_code)
+        
         session_id = str(uuid.uuid4())
         session = TranscriptionSession.objects.create(
             session_id=session_id,
             language_code=language_code,
             is_active=True
         )
+        get_result_buffer().remember_session(session)
         
         serializer = TranscriptionSessionSerializer(session)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -178,6 +233,7 @@ def end_session(request, session_id):
     """End a transcription session"""
     try:
         session = TranscriptionSession.objects.get(session_id=session_id)
+        get_result_buffer().flush(session)
         session.is_active = False
         session.save()
         
@@ -200,6 +256,8 @@ def get_session_results(request, session_id):
     """Get all transcription results for a session"""
     try:
         session = TranscriptionSession.objects.get(session_id=session_id)
+        # Read-your-writes: commit anything still buffered for this session
+        get_result_buffer().flush(session)
         results = TranscriptionResult.objects.filter(session=session).order_by('chunk_number')
         
         serializer = TranscriptionResultSerializer(results, many=True)
@@ -219,4 +277,175 @@ def get_session_results(request, session_id):
         return Response(
             {'error': 'Failed to get session results'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+@api_view(['GET'])
+def export_session_results(request, session_id, export_format):
+    """Stream all results of a session as JSON Lines, SRT or WebVTT"""
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return Response(
+            {'error': f'Unsupported export format: {export_format}',
+             'formats': list(EXPORT_CONTENT_TYPES)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        chunk_seconds = float(request.query_params.get('chunk_seconds', DEFAULT_CHUNK_SECONDS))
+    except ValueError:
+        chunk_seconds = 0
+    # float() accepts 'nan' and 'inf', which would make every cue time invalid
+    if not math.isfinite(chunk_seconds) or chunk_seconds <= 0:
+        return Response(
+            {'error': 'chunk_seconds must be a positive number'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        session = TranscriptionSession.objects.get(session_id=session_id)
+        get_result_buffer().flush(session)
+    except TranscriptionSession.DoesNotExist:
+        return Response(
+            {'error': 'Session not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        logger.error(f"Error exporting session results: {e}")
+        return Response(
+            {'error': 'Failed to export session results'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    # Rows are fetched one keyset page at a time while the response is sent
+    response = StreamingHttpResponse(
+        export_session(session, export_format, chunk_seconds),
+        content_type=EXPORT_CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{session_id}.{export_format}"'
+    return response
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser])
+def create_job(request):
+    """Upload a long audio file (multipart field 'audio') and transcribe it in the background"""
+    runner = get_job_runner()
+    # Refuse before reading the upload when every slot is taken
+    if not runner.has_capacity():
+        return Response(
+            {'error': 'Too many transcription jobs, try again later'},
+            status=status.HTTP_429_TOO_MANY_REQUESTS
+        )
+    
+    # Stream the upload to a temporary file instead of holding it in memory
+    request.upload_handlers = [TemporaryFileUploadHandler(request)]
+    try:
+        upload = request.FILES.get('audio')
+        language_code = request.data.get('language_code', 'hi')
+    except Exception as e:
+        logger.error(f"Error reading job upload: {e}")
+        return Response(
+            {'error': 'Invalid upload'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if upload is None:
+        return Response(
+            {'error': "Missing audio file (multipart field 'audio')"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if language_code not in LANGUAGE_MAPPING:
+        return Response(
+            {'error': f'Unsupported language code: {language_code}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        info = sf.info(upload.temporary_file_path())
+    except Exception as e:
+        logger.error(f"Error reading uploaded audio {upload.name}: {e}")
+        return Response(
+            {'error': 'Unsupported or corrupt audio file'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    job_id = str(uuid.uuid4())
+    audio_path = None
+    session = None
+    try:
+        # Load the language's components while the job waits for a slot
+        IndicConformerModel.get_instance().prefetch_language(language_code)
+        
+        os.makedirs(runner.upload_dir, exist_ok=True)
+        audio_path = os.path.join(runner.upload_dir, job_id + os.path.splitext(upload.name)[1][:10])
+        file_move_safe(upload.temporary_file_path(), audio_path)
+        
+        session = TranscriptionSession.objects.create(
+            session_id=job_id,
+            language_code=language_code,
+            is_active=True
+        )
+        job = TranscriptionJob.objects.create(
+            job_id=job_id,
+            session=session,
+            file_name=upload.name[:255],
+            audio_path=audio_path,
+            runner=runner.runner_id,
+            duration_seconds=info.duration
+        )
+    except Exception as e:
+        logger.error(f"Error creating transcription job: {e}")
+        # Nothing will run the job, so nothing else would remove its upload
+        try:
+            if session is not None:
+                session.delete()
+            if audio_path is not None and os.path.exists(audio_path):
+                os.remove(audio_path)
+        except Exception as cleanup_error:
+            logger.error(f"Error cleaning up failed job {job_id}: {cleanup_error}")
+        return Response(
+            {'error': 'Failed to create job'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    # Another request may have taken the last slot meanwhile
+    if not runner.submit(job):
+        session.delete()
+        os.remove(audio_path)
+        return Response(
+            {'error': 'Too many transcription jobs, try again later'},
+            status=status.HTTP_429_TOO_MANY_REQUESTS
+        )
+    return Response(job_state(job), status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def job_status(request, job_id):
+    """Status and progress of a long-audio job"""
+    # Jobs of a server process that exited are marked failed when the runner starts
+    get_job_runner()
+    try:
+        job = TranscriptionJob.objects.select_related('session').get(job_id=job_id)
+    except TranscriptionJob.DoesNotExist:
+        return Response(
+            {'error': 'Job not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(job_state(job))
+
+@require_GET
+def job_events_stream(request, job_id):
+    """Server-sent events with a job's results as they are committed, then its final status"""
+    # A plain Django view: EventSource sends Accept: text/event-stream, which
+    # DRF's JSON-only content negotiation would refuse
+    # Jobs of a server process that exited are failed first, so their stream ends
+    get_job_runner()
+    if not TranscriptionJob.objects.filter(job_id=job_id).exists():
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    
+    # Resume after the last result a reconnecting client received
+    try:
+        last_chunk = int(request.headers.get('Last-Event-ID', request.GET.get('after', -1)))
+    except ValueError:
+        last_chunk = -1
+    
+    # An async iterator, so ASGI servers send each event as it is produced
+    response = StreamingHttpResponse(job_events(job_id, last_chunk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
@@ -104,19 +104,17 @@ const TranscriptionInterface = ({ isBackendHealthy, onRetryConnection }) => {
         return // Skip silent chunks
       }
 
-      // Convert to base64
-      const base64Audio = audioToBase64(normalizedAudio)
-      
       if (useWebSocket && websocketService.isConnected) {
-        // Send via WebSocket
-        websocketService.sendAudioChunk(
-          base64Audio,
+        // Send via WebSocket as a binary frame (no base64)
+        websocketService.sendAudioFrame(
+          normalizedAudio,
           selectedLanguage,
           chunkNumber,
           16000
         )
       } else {
         // Send via HTTP API
+        const base64Audio = audioToBase64(normalizedAudio)
         const result = await apiService.transcribeAudioChunk(
           base64Audio,
           sessionId,
@@ -1,3 +1,10 @@
+// Binary audio frame header, mirrored from dubsync_core/wire.py:
+// magic 'DS', version, sample format, chunk number, sample rate, language
+const FRAME_HEADER_SIZE = 16
+const FRAME_VERSION = 1
+const FORMAT_FLOAT32 = 1
+const FORMAT_INT16 = 2
+
 class WebSocketService {
   constructor() {
     this.ws = null
@@ -96,6 +103,39 @@ class WebSocketService {
     })
   }
 
+  // int16 halves the bandwidth of float32 with no audible loss for speech
+  sendAudioFrame(audioData, languageCode, chunkNumber, sampleRate = 16000, encoding = 'int16') {
+    if (!this.ws || !this.isConnected) {
+      console.error('WebSocket not connected')
+      throw new Error('WebSocket not connected')
+    }
+
+    // Fixed little-endian header followed by the raw PCM samples
+    const bytesPerSample = encoding === 'int16' ? 2 : 4
+    const frame = new ArrayBuffer(FRAME_HEADER_SIZE + audioData.length * bytesPerSample)
+    const view = new DataView(frame)
+    view.setUint8(0, 0x44) // 'D'
+    view.setUint8(1, 0x53) // 'S'
+    view.setUint8(2, FRAME_VERSION)
+    view.setUint8(3, encoding === 'int16' ? FORMAT_INT16 : FORMAT_FLOAT32)
+    view.setUint32(4, chunkNumber, true)
+    view.setUint32(8, sampleRate, true)
+    for (let i = 0; i < 4; i++) {
+      view.setUint8(12 + i, i < languageCode.length ? languageCode.charCodeAt(i) : 0)
+    }
+    if (encoding === 'int16') {
+      const samples = new Int16Array(frame, FRAME_HEADER_SIZE)
+      for (let i = 0; i < audioData.length; i++) {
+        const s = Math.max(-1, Math.min(1, audioData[i]))
+        samples[i] = Math.round(s < 0 ? s * 32768 : s * 32767)
+      }
+    } else {
+      new Float32Array(frame, FRAME_HEADER_SIZE).set(audioData)
+    }
+
+    this.ws.send(frame)
+  }
+
   startSession(languageCode) {
     this.sendMessage({
       type: 'start_session',
@@ -1,17 +1,24 @@
 import streamlit as st
-import torch
-import torchaudio
-import sounddevice as sd
 import numpy as np
 import threading
 import queue
 import time
-from typing import Optional, List, Dict
-import logging
-from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
-import librosa
-import webrtcvad
+import os
+import random
+import sys
+import tempfile
+import weakref
 from collections import deque
+from typing import Optional, List, Dict, Tuple
+import logging
+
+# Shared audio pipeline lives next to the Django backend so both can use it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DubSync', 'backend'))
+from dubsync_core.backends import DEFAULT_MODEL_NAME, load_backend
+from dubsync_core import (
+    AudioRingBuffer, BoundedChunkQueue, ChunkItem, CTCStitcher, EndpointChunker, LatencyTracer,
+    Resequencer, SlidingWindowStreamer, SpeechSegmenter
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,178 +50,403 @@ LANGUAGE_MAPPING = {
     'ur': 'Urdu'
 }
 
+# 'incremental' redraws the transcript and stats in place as results arrive;
+# 'rerun' re-executes the whole script every 0.5 s while recording
+UI_REFRESH = os.getenv('DUBSYNC_UI_REFRESH', 'incremental')
+STATS_REFRESH_S = 1.0
+
+# Canned responses used while the demo model stands in for IndicConformer
+DEMO_RESPONSES = {
+    'hi': ['नमस्ते', 'यह एक परीक्षण है', 'आपका स्वागत है'],
+    'bn': ['নমস্কার', 'এটি একটি পরীক্ষা', 'আপনাকে স্বাগতম'],
+    'ta': ['வணக்கம்', 'இது ஒரு சோதனை', 'உங்களை வரவேற்கிறோம்'],
+    'te': ['నమస్కారం', 'ఇది ఒక పరీక్ష', 'మీకు స్వాగతం'],
+    'gu': ['નમસ્તે', 'આ એક પરીક્ષણ છે', 'તમારું સ્વાગત છે'],
+    'mr': ['नमस्कार', 'ही एक चाचणी आहे', 'तुमचे स्वागत आहे'],
+    'pa': ['ਸਤ ਸ੍ਰੀ ਅਕਾਲ', 'ਇਹ ਇੱਕ ਟੈਸਟ ਹੈ', 'ਤੁਹਾਡਾ ਸੁਆਗਤ ਹੈ'],
+    'kn': ['ನಮಸ್ಕಾರ', 'ಇದು ಒಂದು ಪರೀಕ್ಷೆ', 'ನಿಮಗೆ ಸ್ವಾಗತ'],
+    'ml': ['നമസ്കാരം', 'ഇത് ഒരു പരീക്ഷണമാണ്', 'നിങ്ങളെ സ്വാഗതം ചെയ്യുന്നു'],
+    'or': ['ନମସ୍କାର', 'ଏହା ଏକ ପରୀକ୍ଷା', 'ଆପଣଙ୍କୁ ସ୍ୱାଗତ'],
+    'as': ['নমস্কাৰ', 'এইটো এটা পৰীক্ষা', 'আপোনাক স্বাগতম'],
+    'ur': ['السلام علیکم', 'یہ ایک ٹیسٹ ہے', 'آپ کا خیر مقدم']
+}
+
+class ModelLoader:
+    """Loads and warms up the model on a background thread.
+    
+    torch, transformers and the model weights are only imported here, so the
+    page can render while they load. A dummy forward pass after loading pays
+    for kernel initialization before the first real chunk arrives.
+    """
+    
+    def __init__(self, config: Dict, warmup: bool = True):
+        self.config = config
+        self.warmup = warmup
+        self.state = 'pending'  # pending -> loading -> warming_up -> ready | failed
+        self.error = None
+        self.model = None
+        self.processor = None
+        self.backend = None
+        self.device = None
+        self.device_label = None
+        self.timings = {}
+        self._thread = threading.Thread(target=self.load, daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    @property
+    def ready(self) -> bool:
+        return self.state == 'ready'
+    
+    @property
+    def done(self) -> bool:
+        return self.state in ('ready', 'failed')
+    
+    def load(self):
+        """Import, load and warm up the model (runs on the loader thread)"""
+        try:
+            self.state = 'loading'
+            start = time.perf_counter()
+            import torch
+            self.timings['import_s'] = time.perf_counter() - start
+            
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self.device_label = self.device.type.upper()
+            if self.device.type == 'cuda':
+                self.device_label += f" ({torch.cuda.get_device_name()})"
+            
+            # Using a demo model for now - replace with actual IndicConformer when available
+            logger.info(f"Loading model on device: {self.device}")
+            start = time.perf_counter()
+            self.model, self.processor, self.backend = load_backend(
+                self.config['backend_name'],
+                model_name=self.config['model_name'],
+                device=self.device,
+                quantize=self.config['quantize'],
+                cache_dir=self.config['model_cache_dir'],
+                onnx_path=self.config['onnx_path'],
+                intra_op_threads=self.config['intra_op_threads'],
+                inter_op_threads=self.config['inter_op_threads']
+            )
+            self.timings['load_s'] = time.perf_counter() - start
+            logger.info(f"Model loaded successfully ({self.backend.name} backend)")
+            
+            if self.warmup:
+                self.state = 'warming_up'
+                start = time.perf_counter()
+                dummy = np.zeros(self.config['sample_rate'], dtype=np.float32)
+                inputs = self.processor(dummy, sampling_rate=self.config['sample_rate'], return_tensors="np")
+                self.backend.logits(inputs.input_values)
+                self.timings['warmup_s'] = time.perf_counter() - start
+            
+            self.state = 'ready'
+            
+        except Exception as e:
+            logger.error(f"Error loading model: {e}")
+            self.error = str(e)
+            self.state = 'failed'
+
+@st.cache_resource
+def get_model_loader(config_items: Tuple) -> ModelLoader:
+    """One background loader per process and model configuration"""
+    return ModelLoader(dict(config_items)).start()
+
 class AudioProcessor:
     """Handles audio processing and transcription"""
     
     def __init__(self):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.device = None
         self.sample_rate = 16000
         self.chunk_duration = 2.0  # seconds
         self.chunk_size = int(self.sample_rate * self.chunk_duration)
-        self.audio_queue = queue.Queue()
         self.transcription_queue = queue.Queue()
         self.is_recording = False
         self.model = None
         self.processor = None
-        self.vad = webrtcvad.Vad(2)  # Aggressiveness level 2
+        self.backend = None
         
-        # Audio buffer for continuous processing
-        self.audio_buffer = deque(maxlen=self.sample_rate * 10)  # 10 seconds buffer
+        # Inference backend: 'torch' (eager) or 'onnx' (ONNX Runtime)
+        self.model_name = os.getenv('DUBSYNC_MODEL', DEFAULT_MODEL_NAME)
+        self.backend_name = os.getenv('DUBSYNC_BACKEND', 'torch')
+        self.onnx_path = os.getenv('DUBSYNC_ONNX_PATH') or None
+        self.model_cache_dir = os.getenv('DUBSYNC_MODEL_CACHE', 'model_cache')
+        # Opt-in dynamic INT8 quantization ('int8'); weights are cached on disk
+        self.quantize = os.getenv('DUBSYNC_QUANTIZE') or None
+        self.intra_op_threads = int(os.getenv('DUBSYNC_INTRA_OP_THREADS', '0'))
+        self.inter_op_threads = int(os.getenv('DUBSYNC_INTER_OP_THREADS', '0'))
+        # Replace model output with canned phrases while the demo model is in use
+        self.demo_responses = os.getenv('DUBSYNC_DEMO_RESPONSES', '1') == '1'
+        # webrtcvad is not thread-safe, so each worker gets its own segmenter
+        self._vad_local = threading.local()
+        self.vad_samples_total = 0
+        self.vad_samples_skipped = 0
+        self._stats_lock = threading.Lock()
         
-    @st.cache_resource
-    def load_model(_self):
-        """Load the IndicConformer model"""
-        try:
-            # Using a demo model for now - replace with actual IndicConformer when available
-            model_name = "facebook/wav2vec2-large-xlsr-53"
-            
-            logger.info(f"Loading model on device: {_self.device}")
-            processor = Wav2Vec2Processor.from_pretrained(model_name)
-            model = Wav2Vec2ForCTC.from_pretrained(model_name)
-            model = model.to(_self.device)
-            model.eval()
-            
-            logger.info("Model loaded successfully")
-            return model, processor
-            
-        except Exception as e:
-            logger.error(f"Error loading model: {e}")
-            st.error(f"Failed to load model: {e}")
-            return None, None
+        # Preallocated ring buffer for continuous processing (10 seconds)
+        self.audio_buffer = AudioRingBuffer(self.sample_rate * 10)
+        self.input_overflows = 0
+        
+        # Overlapping sliding-window streaming: each step feeds one hop of new
+        # audio and the model also sees left/right context around it
+        self.streaming = os.getenv('DUBSYNC_STREAMING', '0') == '1'
+        self.stream_hop = float(os.getenv('DUBSYNC_STREAM_HOP', '1.0'))
+        self.stream_left_context = float(os.getenv('DUBSYNC_STREAM_LEFT_CONTEXT', '1.0'))
+        self.stream_right_context = float(os.getenv('DUBSYNC_STREAM_RIGHT_CONTEXT', '0.5'))
+        self.streamer = None
+        self.stitcher = None
+        
+        # 'fixed' cuts every chunk_duration seconds; 'endpoint' emits an
+        # utterance once trailing silence passes the threshold
+        self.chunking = os.getenv('DUBSYNC_CHUNKING', 'fixed')
+        self.endpoint_silence = float(os.getenv('DUBSYNC_ENDPOINT_SILENCE', '0.5'))
+        self.min_segment = float(os.getenv('DUBSYNC_MIN_SEGMENT', '0.3'))
+        self.max_segment = float(os.getenv('DUBSYNC_MAX_SEGMENT', '8.0'))
+        self.chunker = None
+        # The audio callback only queues raw blocks; a chunking thread runs VAD
+        self._raw_blocks = queue.SimpleQueue()
+        self._chunking_thread = None
+        
+        # Transcription worker pool fed by a bounded chunk queue. When workers
+        # fall behind, the policy decides what happens to new chunks:
+        # 'block' leaves audio in the ring buffer, 'drop_oldest' discards the
+        # oldest pending chunk, 'merge' appends to the newest pending chunk
+        self.num_workers = max(1, int(os.getenv('DUBSYNC_WORKERS', '1')))
+        self.queue_size = int(os.getenv('DUBSYNC_QUEUE_SIZE', '4'))
+        self.overload_policy = os.getenv('DUBSYNC_OVERLOAD_POLICY', 'block')
+        self.audio_queue = BoundedChunkQueue(
+            self.queue_size,
+            policy=self.overload_policy,
+            max_merge_samples=int(self.max_segment * self.sample_rate),
+            release=self.audio_buffer.release
+        )
+        # Workers finish out of order; results are published in capture order
+        self.resequencer = Resequencer()
+        self._publish_lock = threading.Lock()
+        self._active_workers = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        
+        # Per-stage latency spans (queue wait, VAD, preprocess, forward, decode)
+        self.tracer = LatencyTracer(enabled=os.getenv('DUBSYNC_TRACING', '1') == '1')
+        
+    def model_config(self) -> Tuple:
+        """Hashable model settings used to share one loader across sessions"""
+        return tuple(sorted({
+            'backend_name': self.backend_name,
+            'model_name': self.model_name,
+            'quantize': self.quantize,
+            'model_cache_dir': self.model_cache_dir,
+            'onnx_path': self.onnx_path,
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+            'sample_rate': self.sample_rate,
+        }.items()))
+    
+    def attach_model(self, loader: ModelLoader):
+        """Use the model from a finished loader"""
+        self.device = loader.device
+        self.model = loader.model
+        self.processor = loader.processor
+        self.backend = loader.backend
     
-    def preprocess_audio(self, audio_data: np.ndarray) -> torch.Tensor:
+    def preprocess_audio(self, audio_data: np.ndarray) -> np.ndarray:
         """Preprocess audio data for the model"""
         try:
             # Convert to float32 if needed
             if audio_data.dtype != np.float32:
                 audio_data = audio_data.astype(np.float32)
             
+            if audio_data.ndim > 1:
+                audio_data = audio_data.mean(axis=1)  # Convert to mono
+            
             # Normalize audio
-            if np.max(np.abs(audio_data)) > 0:
-                audio_data = audio_data / np.max(np.abs(audio_data))
+            peak = np.max(np.abs(audio_data)) if len(audio_data) > 0 else 0.0
+            if peak > 0:
+                audio_data = audio_data / peak
             
-            # Resample to 16kHz if needed
             if len(audio_data) > 0:
-                audio_tensor = torch.from_numpy(audio_data).float()
-                if audio_tensor.dim() > 1:
-                    audio_tensor = torch.mean(audio_tensor, dim=1)  # Convert to mono
-                
-                return audio_tensor
+                return audio_data
             
-            return torch.zeros(self.chunk_size)
+            return np.zeros(self.chunk_size, dtype=np.float32)
             
         except Exception as e:
             logger.error(f"Error preprocessing audio: {e}")
-            return torch.zeros(self.chunk_size)
+            return np.zeros(self.chunk_size, dtype=np.float32)
     
-    def detect_speech(self, audio_data: np.ndarray) -> bool:
-        """Detect if audio contains speech using VAD"""
+    def detect_speech_segments(self, audio_data: np.ndarray) -> List[Tuple[int, int]]:
+        """Find speech segments as (start, end) sample offsets using VAD"""
         try:
-            # Convert to 16-bit PCM for VAD
-            audio_16bit = (audio_data * 32767).astype(np.int16)
-            
-            # VAD requires specific frame sizes (10, 20, or 30 ms)
-            frame_duration = 30  # ms
-            frame_size = int(self.sample_rate * frame_duration / 1000)
-            
-            # Check multiple frames
-            speech_frames = 0
-            total_frames = 0
-            
-            for i in range(0, len(audio_16bit) - frame_size, frame_size):
-                frame = audio_16bit[i:i + frame_size].tobytes()
-                if self.vad.is_speech(frame, self.sample_rate):
-                    speech_frames += 1
-                total_frames += 1
-            
-            # Consider speech if more than 30% of frames contain speech
-            return total_frames > 0 and (speech_frames / total_frames) > 0.3
+            return self.segmenter().segments(audio_data)
             
         except Exception as e:
             logger.error(f"Error in speech detection: {e}")
-            return True  # Default to processing if VAD fails
+            return [(0, len(audio_data))]  # Default to processing if VAD fails
+    
+    def segmenter(self) -> SpeechSegmenter:
+        """The calling thread's VAD segmenter"""
+        vad = getattr(self._vad_local, 'vad', None)
+        if vad is None:
+            vad = self._vad_local.vad = SpeechSegmenter(self.sample_rate, aggressiveness=2)
+        return vad
+    
+    def detect_speech(self, audio_data: np.ndarray) -> bool:
+        """Detect if audio contains speech using VAD"""
+        return len(self.detect_speech_segments(audio_data)) > 0
+    
+    @property
+    def vad_skipped_fraction(self) -> float:
+        """Fraction of captured audio that VAD kept away from the model"""
+        if self.vad_samples_total == 0:
+            return 0.0
+        return self.vad_samples_skipped / self.vad_samples_total
     
     def transcribe_audio(self, audio_data: np.ndarray, language: str) -> str:
         """Transcribe audio data"""
         try:
-            if self.model is None or self.processor is None:
+            if self.backend is None or self.processor is None:
                 return "[Model not loaded]"
             
-            # Check if audio contains speech
-            if not self.detect_speech(audio_data):
+            # Keep only the speech spans of the chunk
+            with self.tracer.span('vad'):
+                segments = self.detect_speech_segments(audio_data)
+                speech = SpeechSegmenter.extract(audio_data, segments)
+            with self._stats_lock:
+                self.vad_samples_total += len(audio_data)
+                self.vad_samples_skipped += len(audio_data) - len(speech)
+            if len(speech) == 0:
                 return ""
             
             # Preprocess audio
-            audio_tensor = self.preprocess_audio(audio_data)
+            with self.tracer.span('preprocess'):
+                audio = self.preprocess_audio(speech)
             
-            if torch.sum(torch.abs(audio_tensor)) < 0.01:  # Very quiet audio
+            if np.sum(np.abs(audio)) < 0.01:  # Very quiet audio
                 return ""
             
             # Process with model
-            with torch.no_grad():
-                inputs = self.processor(
-                    audio_tensor.numpy(), 
-                    sampling_rate=self.sample_rate, 
-                    return_tensors="pt"
-                )
-                
-                input_values = inputs.input_values.to(self.device)
-                logits = self.model(input_values).logits
-                
-                # Decode using CTC
-                predicted_ids = torch.argmax(logits, dim=-1)
-                transcription = self.processor.decode(predicted_ids[0])
-                
-                # For demo purposes, add language-specific responses
-                if transcription.strip():
-                    demo_responses = {
-                        'hi': ['नमस्ते', 'यह एक परीक्षण है', 'आपका स्वागत है'],
-                        'bn': ['নমস্কার', 'এটি একটি পরীক্ষা', 'আপনাকে স্বাগতম'],
-                        'ta': ['வணக்கம்', 'இது ஒரு சோதனை', 'உங்களை வரவேற்கிறோம்'],
-                        'te': ['నమస్కారం', 'ఇది ఒక పరీక్ష', 'మీకు స్వాగతం'],
-                        'gu': ['નમસ્તે', 'આ એક પરીક્ષણ છે', 'તમારું સ્વાગત છે'],
-                        'mr': ['नमस्कार', 'ही एक चाचणी आहे', 'तुमचे स्वागत आहे'],
-                        'pa': ['ਸਤ ਸ੍ਰੀ ਅਕਾਲ', 'ਇਹ ਇੱਕ ਟੈਸਟ ਹੈ', 'ਤੁਹਾਡਾ ਸੁਆਗਤ ਹੈ'],
-                        'kn': ['ನಮಸ್ಕಾರ', 'ಇದು ಒಂದು ಪರೀಕ್ಷೆ', 'ನಿಮಗೆ ಸ್ವಾಗತ'],
-                        'ml': ['നമസ്കാരം', 'ഇത് ഒരു പരീക്ഷണമാണ്', 'നിങ്ങളെ സ്വാഗതം ചെയ്യുന്നു'],
-                        'or': ['ନମସ୍କାର', 'ଏହା ଏକ ପରୀକ୍ଷା', 'ଆପଣଙ୍କୁ ସ୍ୱାଗତ'],
-                        'as': ['নমস্কাৰ', 'এইটো এটা পৰীক্ষা', 'আপোনাক স্বাগতম'],
-                        'ur': ['السلام علیکم', 'یہ ایک ٹیسٹ ہے', 'آپ کا خیر مقدم']
-                    }
-                    
-                    import random
-                    responses = demo_responses.get(language, demo_responses['hi'])
-                    return random.choice(responses)
-                
-                return transcription.strip()
+            logits = self.compute_logits(audio)
+            
+            # Decode using CTC
+            with self.tracer.span('decode'):
+                predicted_ids = np.argmax(logits, axis=-1)
+                transcription = self.processor.decode(predicted_ids)
+            
+            # For demo purposes, add language-specific responses
+            return self._demo_response(transcription, language)
                 
         except Exception as e:
             logger.error(f"Error in transcription: {e}")
             return f"[Transcription error: {str(e)}]"
     
+    def compute_logits(self, audio_data: np.ndarray) -> np.ndarray:
+        """Run the model on one window of audio and return (frames, vocab) logits"""
+        with self.tracer.span('features'):
+            inputs = self.processor(
+                audio_data, 
+                sampling_rate=self.sample_rate, 
+                return_tensors="np"
+            )
+        
+        with self.tracer.span('forward'):
+            return self.backend.logits(inputs.input_values)[0]
+    
+    def create_streamer(self) -> SlidingWindowStreamer:
+        """Create a sliding-window streamer bound to the loaded model"""
+        return SlidingWindowStreamer(
+            self.compute_logits,
+            sample_rate=self.sample_rate,
+            hop_s=self.stream_hop,
+            left_context_s=self.stream_left_context,
+            right_context_s=self.stream_right_context
+        )
+    
+    def transcribe_stream_chunk(self, audio_data: np.ndarray, language: str, flush: bool = False) -> str:
+        """Feed one hop of audio to the streamer and decode the frames it finalizes"""
+        try:
+            if self.backend is None or self.processor is None:
+                return "[Model not loaded]"
+            
+            # Centre frames from consecutive windows are merged before decoding
+            logits = self.streamer.flush() if flush else self.streamer.accept(audio_data)
+            with self.tracer.span('decode'):
+                tokens = self.stitcher.push(logits)
+                if len(tokens) == 0:
+                    return ""
+                
+                transcription = self.processor.tokenizer.decode(tokens, group_tokens=False)
+            return self._demo_response(transcription, language)
+            
+        except Exception as e:
+            logger.error(f"Error in streaming transcription: {e}")
+            return f"[Transcription error: {str(e)}]"
+    
+    def _demo_response(self, transcription: str, language: str) -> str:
+        """Swap model output for a canned phrase while the demo model is in use"""
+        if self.demo_responses and transcription.strip():
+            responses = DEMO_RESPONSES.get(language, DEMO_RESPONSES['hi'])
+            return random.choice(responses)
+        
+        return transcription.strip()
+    
     def audio_callback(self, indata, frames, time, status):
         """Callback for audio input"""
         if status:
+            if status.input_overflow:
+                self.input_overflows += 1
             logger.warning(f"Audio callback status: {status}")
         
         if self.is_recording:
-            # Add audio data to buffer
             audio_data = indata[:, 0] if indata.ndim > 1 else indata
-            self.audio_buffer.extend(audio_data)
             
-            # Process when we have enough data
-            if len(self.audio_buffer) >= self.chunk_size:
-                chunk = np.array(list(self.audio_buffer)[:self.chunk_size])
-                self.audio_buffer = deque(list(self.audio_buffer)[self.chunk_size:], 
-                                        maxlen=self.sample_rate * 10)
-                self.audio_queue.put(chunk)
+            # Utterance chunking runs VAD, which is too slow for this thread;
+            # the block is copied because PortAudio reuses its buffer
+            if self.chunker is not None:
+                self._raw_blocks.put(audio_data.copy())
+                return
+            
+            # Copy the block into the ring buffer (no per-sample Python objects)
+            self.audio_buffer.write(audio_data)
+            
+            # Hand out zero-copy chunk views; the worker releases them when done.
+            # Under 'block', chunks stay in the ring buffer while the queue is full
+            while not (self.overload_policy == 'block' and self.audio_queue.full()):
+                popped = self.audio_buffer.pop_chunk(self.chunk_size)
+                if popped is None:
+                    break
+                chunk, ticket = popped
+                self.audio_queue.put(ChunkItem(chunk, [ticket]))
     
     def start_recording(self, language: str):
         """Start audio recording"""
         try:
             self.is_recording = True
             
+            # Discard chunks left over from a previous recording
+            self.audio_queue.clear()
+            self.audio_buffer.clear()
+            self._raw_blocks = queue.SimpleQueue()
+            self.resequencer.reset()
+            self.last_lag = self.max_lag = 0.0
+            self.tracer.reset()
+            
+            if self.streaming and self.backend is not None:
+                self.streamer = self.create_streamer()
+                self.stitcher = CTCStitcher(self.processor.tokenizer.pad_token_id)
+                self.chunk_size = self.streamer.hop
+            elif self.chunking == 'endpoint':
+                self.chunker = EndpointChunker(
+                    self.sample_rate,
+                    end_silence_s=self.endpoint_silence,
+                    min_segment_s=self.min_segment,
+                    max_segment_s=self.max_segment
+                )
+                self._chunking_thread = threading.Thread(target=self._chunking_worker, daemon=True)
+                self._chunking_thread.start()
+            
             # Start audio stream
+            import sounddevice as sd
             self.stream = sd.InputStream(
                 samplerate=self.sample_rate,
                 channels=1,
@@ -224,15 +456,22 @@ class AudioProcessor:
             )
             self.stream.start()
             
-            # Start transcription thread
-            self.transcription_thread = threading.Thread(
-                target=self._transcription_worker, 
-                args=(language,),
-                daemon=True
-            )
-            self.transcription_thread.start()
+            # Start transcription threads; the streamer carries state from one
+            # hop to the next, so streaming runs a single worker
+            workers = 1 if self.streamer is not None else self.num_workers
+            with self._stats_lock:
+                self._active_workers += workers
+            self.transcription_threads = []
+            for _ in range(workers):
+                thread = threading.Thread(
+                    target=self._transcription_worker, 
+                    args=(language,),
+                    daemon=True
+                )
+                thread.start()
+                self.transcription_threads.append(thread)
             
-            logger.info("Recording started")
+            logger.info(f"Recording started ({workers} transcription workers)")
             
         except Exception as e:
             logger.error(f"Error starting recording: {e}")
@@ -252,24 +491,224 @@ class AudioProcessor:
         except Exception as e:
             logger.error(f"Error stopping recording: {e}")
     
-    def _transcription_worker(self, language: str):
-        """Worker thread for transcription"""
+    def _chunking_worker(self):
+        """Cut captured blocks into utterances and queue them for transcription"""
         while self.is_recording:
             try:
-                # Get audio chunk with timeout
-                audio_chunk = self.audio_queue.get(timeout=1.0)
-                
-                # Transcribe
-                transcription = self.transcribe_audio(audio_chunk, language)
-                
-                if transcription.strip():
-                    timestamp = time.strftime("%H:%M:%S")
-                    self.transcription_queue.put(f"[{timestamp}] {transcription}")
-                
+                block = self._raw_blocks.get(timeout=1.0)
             except queue.Empty:
                 continue
+            try:
+                segments = self.chunker.push(block)
+            except Exception as e:
+                logger.error(f"Error in utterance chunking: {e}")
+                continue
+            for segment in segments:
+                # Under 'block', wait for a worker rather than lose the utterance
+                while self.overload_policy == 'block' and self.audio_queue.full() and self.is_recording:
+                    time.sleep(0.05)
+                self.audio_queue.put(ChunkItem(segment), timeout=0)
+    
+    def _transcription_worker(self, language: str):
+        """Worker thread for transcription"""
+        while self.is_recording:
+            # Get audio chunk with timeout
+            item = self.audio_queue.get(timeout=1.0)
+            if item is None:
+                continue
+            self.tracer.record_since('queue_wait', item.captured_at)
+            
+            # Transcribe, then give the chunk's storage back to the buffer
+            transcription = ""
+            try:
+                if self.streamer is not None:
+                    transcription = self.transcribe_stream_chunk(item.audio, language)
+                else:
+                    transcription = self.transcribe_audio(item.audio, language)
             except Exception as e:
                 logger.error(f"Error in transcription worker: {e}")
+            finally:
+                for ticket in item.tickets:
+                    self.audio_buffer.release(ticket)
+                # Every dequeued chunk reports back, so the sequence has no gaps
+                self._complete(item, transcription)
+        
+        # The last worker to stop flushes the stateful stages
+        with self._stats_lock:
+            self._active_workers -= 1
+            if self._active_workers > 0:
+                return
+        
+        # Decode the audio still held back as right context
+        if self.streamer is not None:
+            self._publish(self.transcribe_stream_chunk(None, language, flush=True))
+            self.streamer = None
+        
+        # Transcribe the utterance that was in progress when recording stopped
+        if self.chunker is not None:
+            if self._chunking_thread is not None:
+                self._chunking_thread.join()
+                self._chunking_thread = None
+            segments = []
+            while True:
+                try:
+                    segments += self.chunker.push(self._raw_blocks.get_nowait())
+                except queue.Empty:
+                    break
+            for segment in segments + self.chunker.flush():
+                self._publish(self.transcribe_audio(segment, language))
+            self.chunker = None
+    
+    def _complete(self, item: ChunkItem, transcription: str):
+        """Publish this chunk's result and any later ones it was holding back"""
+        with self._publish_lock:
+            for captured_at, text in self.resequencer.push(item.seq, (item.captured_at, transcription)):
+                self.last_lag = time.monotonic() - captured_at
+                self.max_lag = max(self.max_lag, self.last_lag)
+                self.tracer.record('end_to_end', self.last_lag)
+                self._publish(text)
+    
+    def pipeline_stats(self) -> Dict:
+        """Live queue depth, overload counters and capture-to-transcript lag"""
+        stats = self.audio_queue.stats()
+        stats.update({
+            'workers': self._active_workers,
+            'reorder_waiting': self.resequencer.waiting,
+            'last_lag_s': self.last_lag,
+            'max_lag_s': self.max_lag,
+        })
+        return stats
+    
+    def _publish(self, transcription: str):
+        """Queue a non-empty transcription for display"""
+        if transcription.strip():
+            timestamp = time.strftime("%H:%M:%S")
+            self.transcription_queue.put(f"[{timestamp}] {transcription}")
+
+def _remove_spool(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class TranscriptStore:
+    """Append-only transcript spooled to disk with a bounded in-memory tail.
+    
+    Every line goes to a spool file as it arrives; memory holds only the
+    last ``tail_size`` lines and a count, so long sessions cost the same per
+    refresh as short ones. The spool file is deleted with the store.
+    """
+    
+    def __init__(self, tail_size: int = 100, spool_dir: Optional[str] = None):
+        self._tail = deque(maxlen=tail_size)
+        self._count = 0
+        self._spool = tempfile.NamedTemporaryFile(
+            mode='a', encoding='utf-8', prefix='dubsync_transcript_', suffix='.txt',
+            dir=spool_dir, delete=False
+        )
+        self.path = self._spool.name
+        self._finalizer = weakref.finalize(self, _remove_spool, self.path)
+    
+    def append(self, line: str):
+        self._spool.write(line + "\n")
+        self._spool.flush()  # downloads read the file from another thread
+        self._tail.append(line)
+        self._count += 1
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def tail(self, n: int) -> List[str]:
+        """The last n lines (at most tail_size)"""
+        return list(self._tail)[-n:]
+    
+    def clear(self):
+        self._spool.truncate(0)
+        self._spool.seek(0)
+        self._tail.clear()
+        self._count = 0
+    
+    def read_bytes(self) -> bytes:
+        """The full transcript, read from the spool file"""
+        with open(self.path, 'rb') as f:
+            return f.read()
+    
+    def close(self):
+        self._spool.close()
+        self._finalizer()
+
+def drain_transcriptions(processor: AudioProcessor) -> int:
+    """Move finished transcriptions into the session; returns how many arrived"""
+    count = 0
+    while True:
+        try:
+            st.session_state.transcriptions.append(processor.transcription_queue.get_nowait())
+            count += 1
+        except queue.Empty:
+            return count
+
+def render_transcript(placeholder):
+    """Draw the last 20 transcript lines into the placeholder"""
+    transcription_text = "\n".join(st.session_state.transcriptions.tail(20))  # Show last 20 lines
+    
+    if not transcription_text:
+        transcription_text = "Transcriptions will appear here when you start recording..."
+    
+    placeholder.markdown(f'<div class="transcription-box">{transcription_text}</div>', 
+                         unsafe_allow_html=True)
+
+def render_session_stats(placeholder, language: str):
+    """Draw the Session Stats panel into the placeholder"""
+    processor = st.session_state.audio_processor
+    with placeholder.container():
+        st.markdown("### 📊 Session Stats")
+        st.metric("Total Transcriptions", len(st.session_state.transcriptions))
+        st.metric("Selected Language", LANGUAGE_MAPPING[language])
+        st.metric("Audio Sample Rate", "16 kHz")
+        buffer_stats = processor.audio_buffer.stats()
+        st.metric("Audio Skipped by VAD", f"{processor.vad_skipped_fraction:.0%}")
+        st.metric("Buffer Overflows", buffer_stats['overflow_events'] + processor.input_overflows)
+        pipeline_stats = processor.pipeline_stats()
+        st.metric("Chunk Queue", f"{pipeline_stats['depth']}/{pipeline_stats['capacity']}",
+                  help=f"{pipeline_stats['workers']} workers, '{pipeline_stats['policy']}' overload policy")
+        st.metric("Transcript Lag", f"{pipeline_stats['last_lag_s']:.1f} s",
+                  help=f"Worst this session: {pipeline_stats['max_lag_s']:.1f} s")
+        st.metric("Chunks Dropped / Merged", f"{pipeline_stats['dropped']} / {pipeline_stats['merged']}")
+        
+        latency = processor.tracer.summary()
+        if latency:
+            st.markdown("#### ⏱️ Stage Latency (ms)")
+            st.table([
+                {'stage': name, 'p50': f"{stage['p50_ms']:.1f}", 'p95': f"{stage['p95_ms']:.1f}",
+                 'p99': f"{stage['p99_ms']:.1f}", 'chunks': stage['count']}
+                for name, stage in latency.items()
+            ])
+
+def stream_live_updates(transcript_placeholder, stats_placeholder, language: str):
+    """Redraw only the transcript and stats while recording.
+    
+    Blocks on the transcription queue instead of rerunning the whole script,
+    so a new line is shown as soon as it is published. Stats also refresh
+    every STATS_REFRESH_S so lag and queue depth stay current in silence;
+    that redraw is also where a button click interrupts the loop with a
+    normal rerun.
+    """
+    processor = st.session_state.audio_processor
+    last_stats = time.monotonic()
+    while processor.is_recording:
+        try:
+            line = processor.transcription_queue.get(timeout=0.25)
+        except queue.Empty:
+            line = None
+        
+        if line is not None:
+            st.session_state.transcriptions.append(line)
+            drain_transcriptions(processor)
+            render_transcript(transcript_placeholder)
+        
+        if line is not None or time.monotonic() - last_stats >= STATS_REFRESH_S:
+            render_session_stats(stats_placeholder, language)
+            last_stats = time.monotonic()
 
 def main():
     """Main Streamlit application"""
@@ -325,20 +764,20 @@ def main():
     # Initialize session state
     if 'audio_processor' not in st.session_state:
         st.session_state.audio_processor = AudioProcessor()
-        st.session_state.transcriptions = []
+        st.session_state.transcriptions = TranscriptStore(spool_dir=os.getenv('DUBSYNC_TRANSCRIPT_DIR'))
         st.session_state.is_recording = False
     
-    # Load model
-    if st.session_state.audio_processor.model is None:
-        with st.spinner("Loading IndicConformer model... This may take a few minutes."):
-            model, processor = st.session_state.audio_processor.load_model()
-            st.session_state.audio_processor.model = model
-            st.session_state.audio_processor.processor = processor
+    # Load model in the background; the page renders while it loads
+    loader = get_model_loader(st.session_state.audio_processor.model_config())
+    if loader.ready and st.session_state.audio_processor.backend is None:
+        st.session_state.audio_processor.attach_model(loader)
+    model_ready = st.session_state.audio_processor.backend is not None
     
     # Device information
-    device_info = f"🖥️ Device: {st.session_state.audio_processor.device.type.upper()}"
-    if torch.cuda.is_available():
-        device_info += f" ({torch.cuda.get_device_name()})"
+    device_info = f"🖥️ Device: {loader.device_label or 'detecting...'}"
+    device_info += f" • Backend: {st.session_state.audio_processor.backend_name}"
+    if st.session_state.audio_processor.quantize:
+        device_info += f" ({st.session_state.audio_processor.quantize.upper()})"
     
     st.markdown(f'<div class="device-info">{device_info}</div>', unsafe_allow_html=True)
     
@@ -360,7 +799,7 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("🎙️ Start Recording", disabled=st.session_state.is_recording):
+            if st.button("🎙️ Start Recording", disabled=st.session_state.is_recording or not model_ready):
                 st.session_state.is_recording = True
                 st.session_state.audio_processor.start_recording(selected_language)
                 st.rerun()
@@ -373,7 +812,7 @@ def main():
         
         # Clear transcriptions
         if st.button("🗑️ Clear Transcriptions"):
-            st.session_state.transcriptions = []
+            st.session_state.transcriptions.clear()
             st.rerun()
         
         st.markdown("---")
@@ -381,8 +820,18 @@ def main():
         # Status
         if st.session_state.is_recording:
             st.markdown('<p class="status-recording">🔴 Recording...</p>', unsafe_allow_html=True)
-        else:
+        elif model_ready:
             st.markdown('<p class="status-ready">🟢 Ready</p>', unsafe_allow_html=True)
+        elif loader.state == 'failed':
+            st.error(f"Failed to load model: {loader.error}")
+        elif loader.state == 'warming_up':
+            st.info("🔥 Warming up model...")
+        else:
+            st.info("⏳ Loading IndicConformer model... This may take a few minutes.")
+        
+        if model_ready:
+            timings = " • ".join(f"{name[:-2]} {seconds:.1f}s" for name, seconds in loader.timings.items())
+            st.caption(f"Model startup: {timings}")
         
         # Language info
         st.markdown("### 📋 Supported Languages")
@@ -398,26 +847,9 @@ def main():
         st.header("📝 Live Transcription")
         
         # Check for new transcriptions
-        while not st.session_state.audio_processor.transcription_queue.empty():
-            try:
-                new_transcription = st.session_state.audio_processor.transcription_queue.get_nowait()
-                st.session_state.transcriptions.append(new_transcription)
-            except queue.Empty:
-                break
-        
-        # Display transcriptions
-        transcription_text = "\n".join(st.session_state.transcriptions[-20:])  # Show last 20 lines
-        
-        if not transcription_text:
-            transcription_text = "Transcriptions will appear here when you start recording..."
-        
-        st.markdown(f'<div class="transcription-box">{transcription_text}</div>', 
-                   unsafe_allow_html=True)
-        
-        # Auto-refresh when recording
-        if st.session_state.is_recording:
-            time.sleep(0.5)
-            st.rerun()
+        drain_transcriptions(st.session_state.audio_processor)
+        transcript_placeholder = st.empty()
+        render_transcript(transcript_placeholder)
     
     with col2:
         st.header("ℹ️ Information")
@@ -440,20 +872,32 @@ def main():
         st.markdown("---")
         
         # Statistics
-        st.markdown("### 📊 Session Stats")
-        st.metric("Total Transcriptions", len(st.session_state.transcriptions))
-        st.metric("Selected Language", LANGUAGE_MAPPING[selected_language])
-        st.metric("Audio Sample Rate", "16 kHz")
+        stats_placeholder = st.empty()
+        render_session_stats(stats_placeholder, selected_language)
         
-        # Download transcriptions
+        # Download transcriptions straight from the spool file
         if st.session_state.transcriptions:
-            transcription_content = "\n".join(st.session_state.transcriptions)
+            store = st.session_state.transcriptions
             st.download_button(
                 label="📥 Download Transcriptions",
-                data=transcription_content,
+                # Called only when the button is clicked, not on every rerun
+                data=store.read_bytes,
                 file_name=f"dubsync_transcription_{selected_language}_{time.strftime('%Y%m%d_%H%M%S')}.txt",
                 mime="text/plain"
             )
+    
+    # Live updates while recording
+    if st.session_state.is_recording:
+        if UI_REFRESH == 'rerun':
+            time.sleep(0.5)
+            st.rerun()
+        else:
+            stream_live_updates(transcript_placeholder, stats_placeholder, selected_language)
+    
+    # Poll until the background model load finishes
+    if not loader.done:
+        time.sleep(1.0)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Microbenchmark: time spent per audio callback, deque buffer vs ring buffer.
+
+Replays the work ``AudioProcessor.audio_callback`` does for each PortAudio
+block (1024 samples at 16 kHz, 2 s chunks) without opening a device.
+
+    python benchmarks/bench_audio_callback.py --seconds 120
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core import AudioRingBuffer
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1024
+CHUNK_SIZE = int(SAMPLE_RATE * 2.0)
+
+
+class DequeCallback:
+    """The original deque-of-floats implementation"""
+
+    def __init__(self):
+        self.audio_buffer = deque(maxlen=SAMPLE_RATE * 10)
+        self.chunks = []
+
+    def __call__(self, indata):
+        audio_data = indata[:, 0] if indata.ndim > 1 else indata
+        self.audio_buffer.extend(audio_data)
+        if len(self.audio_buffer) >= CHUNK_SIZE:
+            chunk = np.array(list(self.audio_buffer)[:CHUNK_SIZE])
+            self.audio_buffer = deque(list(self.audio_buffer)[CHUNK_SIZE:],
+                                      maxlen=SAMPLE_RATE * 10)
+            self.chunks.append(chunk)
+
+
+class RingCallback:
+    """The ring buffer implementation; chunks are released immediately"""
+
+    def __init__(self):
+        self.audio_buffer = AudioRingBuffer(SAMPLE_RATE * 10)
+        self.chunks = 0
+
+    def __call__(self, indata):
+        audio_data = indata[:, 0] if indata.ndim > 1 else indata
+        self.audio_buffer.write(audio_data)
+        while True:
+            popped = self.audio_buffer.pop_chunk(CHUNK_SIZE)
+            if popped is None:
+                break
+            self.audio_buffer.release(popped[1])
+            self.chunks += 1
+
+
+def run(callback, blocks):
+    timings = np.empty(len(blocks))
+    for i, block in enumerate(blocks):
+        start = time.perf_counter()
+        callback(block)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(name, timings_us):
+    block_budget_us = BLOCK_SIZE / SAMPLE_RATE * 1e6
+    print(f"{name:<8} mean {timings_us.mean():8.1f} us  p50 {np.percentile(timings_us, 50):8.1f} us  "
+          f"p99 {np.percentile(timings_us, 99):8.1f} us  max {timings_us.max():9.1f} us  "
+          f"({timings_us.mean() / block_budget_us * 100:.3f}% of the {block_budget_us / 1000:.0f} ms block budget)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=60.0, help='Audio duration to replay')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_blocks = int(args.seconds * SAMPLE_RATE / BLOCK_SIZE)
+    blocks = [rng.standard_normal((BLOCK_SIZE, 1)).astype(np.float32) * 0.1 for _ in range(n_blocks)]
+
+    print(f"Replaying {n_blocks} blocks of {BLOCK_SIZE} samples ({args.seconds:.0f} s of audio)")
+    report('deque', run(DequeCallback(), blocks))
+    report('ring', run(RingCallback(), blocks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Parity check and real-time factor benchmark: PyTorch eager vs ONNX Runtime.
+
+Runs both backends on the same fixed audio corpus, compares their logits and
+greedy CTC decodes, and reports the real-time factor (processing time /
+audio duration) of each. Exits non-zero if the backends disagree.
+
+    python benchmarks/bench_backends.py --corpus path/to/wavs --threads 4
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core.backends import DEFAULT_MODEL_NAME, create_backend, default_onnx_path, load_ctc_model
+
+SAMPLE_RATE = 16000
+
+
+def load_corpus(corpus_dir):
+    """Audio files from ``corpus_dir``, or a fixed synthetic corpus when none is given"""
+    if corpus_dir:
+        import soundfile as sf
+
+        clips = []
+        for path in sorted(glob.glob(os.path.join(corpus_dir, '*.wav')) + glob.glob(os.path.join(corpus_dir, '*.flac'))):
+            audio, sr = sf.read(path, dtype='float32', always_2d=True)
+            if sr != SAMPLE_RATE:
+                print(f"skipping {path}: {sr} Hz (expected {SAMPLE_RATE})")
+                continue
+            clips.append((os.path.basename(path), audio.mean(axis=1)))
+        return clips
+
+    # Seeded so every run (and every machine) sees the same inputs
+    rng = np.random.default_rng(1234)
+    clips = []
+    for seconds in (1, 2, 4, 8):
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        tone = 0.3 * np.sin(2 * np.pi * (150 + 100 * t) * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        clips.append((f"synthetic_{seconds}s", (tone + rng.normal(0, 0.01, len(t))).astype(np.float32)))
+    return clips
+
+
+def run_backend(backend, inputs, repeats):
+    outputs, elapsed = [], 0.0
+    for input_values in inputs:
+        backend.logits(input_values)  # warm-up for this input shape
+        start = time.perf_counter()
+        for _ in range(repeats):
+            logits = backend.logits(input_values)
+        elapsed += (time.perf_counter() - start) / repeats
+        outputs.append(logits)
+    return outputs, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--corpus', help='Directory of 16 kHz WAV/FLAC files (default: synthetic corpus)')
+    parser.add_argument('--onnx-path', help='Exported model path (exported if missing)')
+    parser.add_argument('--threads', type=int, default=0, help='ONNX Runtime intra-op threads (0 = auto)')
+    parser.add_argument('--inter-op-threads', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--atol', type=float, default=1e-3, help='Max allowed absolute logit difference')
+    args = parser.parse_args()
+
+    clips = load_corpus(args.corpus)
+    if not clips:
+        sys.exit("No audio found in corpus")
+    audio_seconds = sum(len(audio) for _, audio in clips) / SAMPLE_RATE
+
+    model, processor = load_ctc_model(args.model, 'cpu')
+    inputs = [processor(audio, sampling_rate=SAMPLE_RATE, return_tensors='np').input_values for _, audio in clips]
+
+    torch_backend = create_backend('torch', model=model)
+    onnx_backend = create_backend(
+        'onnx', model=model,
+        onnx_path=args.onnx_path or default_onnx_path(args.model),
+        intra_op_threads=args.threads, inter_op_threads=args.inter_op_threads
+    )
+
+    torch_logits, torch_time = run_backend(torch_backend, inputs, args.repeats)
+    onnx_logits, onnx_time = run_backend(onnx_backend, inputs, args.repeats)
+
+    print(f"{'clip':<20} {'frames':>7} {'max |diff|':>12} {'argmax agree':>13} {'same text':>10}")
+    failed = False
+    for (name, _), reference, candidate in zip(clips, torch_logits, onnx_logits):
+        diff = float(np.max(np.abs(reference - candidate)))
+        agree = float(np.mean(reference.argmax(-1) == candidate.argmax(-1)))
+        same_text = processor.decode(reference[0].argmax(-1)) == processor.decode(candidate[0].argmax(-1))
+        failed |= diff > args.atol or not same_text
+        print(f"{name:<20} {reference.shape[1]:>7} {diff:>12.2e} {agree:>13.2%} {str(same_text):>10}")
+
+    print()
+    print(f"audio: {audio_seconds:.1f} s over {len(clips)} clips")
+    print(f"torch RTF: {torch_time / audio_seconds:.4f}  ({torch.get_num_threads()} threads)")
+    print(f"onnx  RTF: {onnx_time / audio_seconds:.4f}  (speedup x{torch_time / onnx_time:.2f})")
+    print("parity: " + ("FAILED" if failed else "ok"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
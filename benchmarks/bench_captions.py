@@ -0,0 +1,229 @@
+"""Fan-out cost per caption viewer: one message per result vs coalesced, pre-encoded batches.
+
+One speaker produces a partial result every --partial-ms and a final one at
+the end of each utterance, in real time, for --seconds. Viewers subscribe to
+the session's group on an InMemoryChannelLayer, the way viewer consumers do.
+Two ways of publishing are compared:
+
+  per-result  one group message per result, as a dict; every viewer encodes
+              its own JSON and sends it before reading its next message
+  batched     CaptionPublisher: results coalesced into at most one batch
+              every --interval-ms, JSON encoded once; viewers forward it
+              through a CaptionFeed, which merges batches while a send to a
+              slow viewer is still under way and resyncs from a snapshot
+              after a gap. Joining viewers share throttled snapshots.
+
+A fraction of viewers (--slow-fraction) take --slow-send-ms per send. The
+report shows, per viewer and speaker result, the time spent in group_send
+and in viewer handlers (the layer's own receive, which scans every channel
+of the in-memory layer, is left out), the messages each viewer got, and how
+many viewers are behind: --catch-up seconds after the last result they
+still do not show every final caption, because their backlog is still
+queued or the channel layer dropped messages for a full inbox.
+
+When the results column falls short of --seconds / --partial-ms, the event
+loop is saturated and the speaker itself is falling behind.
+
+    python benchmarks/bench_captions.py --viewers 10 100 500 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from channels.layers import InMemoryChannelLayer
+from dubsync_core import CaptionFeed
+from transcription.captions import CaptionPublisher, speaker_group, viewer_group
+
+SESSION_ID = 'bench'
+PARTIALS_PER_UTTERANCE = 12
+
+
+class TimedLayer(InMemoryChannelLayer):
+    """In-memory layer that adds up the time spent in group_send to viewers"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fan_out_s = 0.0
+        self.handler_s = 0.0  # added by the viewers
+
+    async def group_send(self, group, message):
+        start = time.perf_counter()
+        await super().group_send(group, message)
+        if group == viewer_group(SESSION_ID):
+            self.fan_out_s += time.perf_counter() - start
+
+
+async def speak(publish, seconds, partial_s):
+    """Send results in real time; returns the final captions and the number of results"""
+    finals = {}
+    chunk_number, partials, results = 0, 0, 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(partial_s)
+        partials += 1
+        text = ' '.join(f'w{chunk_number}.{i}' for i in range(partials))
+        final = partials == PARTIALS_PER_UTTERANCE
+        await publish(chunk_number, text, final)
+        results += 1
+        if final:
+            finals[chunk_number] = text
+            chunk_number, partials = chunk_number + 1, 0
+    return finals, results
+
+
+async def client_send(slow_send_s, received, text):
+    received.append(text)
+    if slow_send_s:
+        await asyncio.sleep(slow_send_s)
+
+
+def final_captions(received):
+    """What a client shows after applying the messages it got, in order"""
+    captions = {}
+    for text in received:
+        message = json.loads(text)
+        if message['type'] == 'caption_snapshot':
+            captions = {}
+        for update in message.get('captions', message.get('updates', [message])):
+            if update['final'] or not captions.get(update['chunk_number'], {}).get('final'):
+                captions[update['chunk_number']] = update
+    return {chunk: update['transcription'] for chunk, update in captions.items() if update['final']}
+
+
+async def per_result_viewer(layer, channel, slow_send_s, received):
+    while True:
+        message = await layer.receive(channel)
+        start = time.perf_counter()
+        text = json.dumps({'type': 'transcription_result', 'session_id': SESSION_ID, **message['update']})
+        layer.handler_s += time.perf_counter() - start
+        await client_send(slow_send_s, received, text)
+
+
+async def run_per_result(layer, args, slow_sends, received):
+    group = viewer_group(SESSION_ID)
+    channels = [await layer.new_channel() for _ in slow_sends]
+    for channel in channels:
+        await layer.group_add(group, channel)
+    viewers = [asyncio.ensure_future(per_result_viewer(layer, channel, slow, out))
+               for channel, slow, out in zip(channels, slow_sends, received)]
+
+    async def publish(chunk_number, text, final):
+        update = {'chunk_number': chunk_number, 'transcription': text, 'final': final}
+        await layer.group_send(group, {'type': 'caption.update', 'update': update})
+
+    return await speak(publish, args.seconds, args.partial_ms / 1000), viewers
+
+
+async def batched_viewer(layer, channel, slow_send_s, received):
+    feed = CaptionFeed(SESSION_ID)
+    writer = None
+
+    async def write():
+        nonlocal writer
+        while True:
+            start = time.perf_counter()
+            text = feed.next_message()
+            layer.handler_s += time.perf_counter() - start
+            if text is None:
+                break
+            await client_send(slow_send_s, received, text)
+        writer = None
+
+    await layer.group_send(speaker_group(SESSION_ID), {'type': 'caption.snapshot_request'})
+    while True:
+        message = await layer.receive(channel)
+        start = time.perf_counter()
+        if message['type'] == 'caption.snapshot':
+            resync = feed.on_snapshot(message['publisher'], message['seq'], message['text'])
+        else:
+            resync = feed.on_batch(message['publisher'], message['seq'], message['text'])
+        layer.handler_s += time.perf_counter() - start
+        if resync:
+            await layer.group_send(speaker_group(SESSION_ID), {'type': 'caption.snapshot_request'})
+        if writer is None:
+            writer = asyncio.ensure_future(write())
+
+
+async def run_batched(layer, args, slow_sends, received):
+    speaker = await layer.new_channel()
+    await layer.group_add(speaker_group(SESSION_ID), speaker)
+    publisher = CaptionPublisher(layer, SESSION_ID, speaker, interval_s=args.interval_ms / 1000)
+
+    async def answer_snapshots():
+        while True:
+            await layer.receive(speaker)
+            await publisher.request_snapshot()
+
+    channels = [await layer.new_channel() for _ in slow_sends]
+    for channel in channels:
+        await layer.group_add(viewer_group(SESSION_ID), channel)
+    tasks = [asyncio.ensure_future(answer_snapshots())]
+    tasks += [asyncio.ensure_future(batched_viewer(layer, channel, slow, out))
+              for channel, slow, out in zip(channels, slow_sends, received)]
+
+    spoken = await speak(publisher.add, args.seconds, args.partial_ms / 1000)
+    await publisher.close()
+    return spoken, tasks
+
+
+async def measure(run, viewers, args):
+    layer = TimedLayer(capacity=args.capacity)
+    slow_count = int(viewers * args.slow_fraction)
+    slow_sends = [args.slow_send_ms / 1000] * slow_count + [0] * (viewers - slow_count)
+    received = [[] for _ in range(viewers)]
+
+    (finals, results), tasks = await run(layer, args, slow_sends, received)
+    await asyncio.sleep(args.catch_up)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    behind = sum(1 for out in received if any(final_captions(out).get(chunk) != text
+                                                for chunk, text in finals.items()))
+    fast = [len(out) for out, slow in zip(received, slow_sends) if not slow] or [0]
+    slow = [len(out) for out, slow in zip(received, slow_sends) if slow] or [0]
+    return {
+        'results': results,
+        'fan_out_us': layer.fan_out_s / (max(1, results) * viewers) * 1e6,
+        'handler_us': layer.handler_s / (max(1, results) * viewers) * 1e6,
+        'fast_messages': sum(fast) / len(fast),
+        'slow_messages': sum(slow) / len(slow),
+        'behind': behind,
+    }
+
+
+async def main_async(args):
+    print(f"{args.seconds:.0f} s of results, a partial every {args.partial_ms:.0f} ms, "
+          f"{args.slow_fraction:.0%} of viewers take {args.slow_send_ms:.0f} ms per send, "
+          f"channel capacity {args.capacity}")
+    print(f"{'':>27} {'us per viewer and result':^25}")
+    print(f"{'viewers':>7} {'mode':<11} {'results':>7} {'group_send':>12} {'handlers':>12} {'msgs fast':>10} {'msgs slow':>10} "
+          f"{'viewers behind':>14}")
+    for viewers in args.viewers:
+        for name, run in (('per-result', run_per_result), ('batched', run_batched)):
+            row = await measure(run, viewers, args)
+            print(f"{viewers:>7} {name:<11} {row['results']:>7} {row['fan_out_us']:>12.2f} {row['handler_us']:>12.2f} "
+                  f"{row['fast_messages']:>10.0f} "
+                  f"{row['slow_messages']:>10.0f} {row['behind']:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--viewers', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--partial-ms', type=float, default=100, help='Speaker result cadence')
+    parser.add_argument('--interval-ms', type=float, default=200, help='CaptionPublisher batch interval')
+    parser.add_argument('--slow-fraction', type=float, default=0.1)
+    parser.add_argument('--slow-send-ms', type=float, default=500)
+    parser.add_argument('--catch-up', type=float, default=1.5,
+                        help='Seconds viewers get after the last result before they are checked')
+    parser.add_argument('--capacity', type=int, default=100, help='Channel layer messages per viewer')
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Time to first word and model cost of partial results vs fixed-length chunks.
+
+Replays a synthetic conversation in real time (audio arrives in short
+frames) against a stand-in CTC model whose cost grows with input length,
+like a real encoder. Three ways of producing results are compared:
+
+  fixed        one result per --chunk-seconds chunk, after the chunk is complete
+  redecode     a partial every --interval-ms, re-running the whole utterance
+  incremental  a partial every --interval-ms from IncrementalDecoder, which
+               keeps final sliding-window logits and only re-runs the tail
+
+Time to first word is measured from the onset of each utterance's first word
+to the first message with text that covers it, on a simulated server that
+runs one model call at a time. Utterance ends are known, so endpointing is
+not part of the measurement.
+
+    python benchmarks/bench_partials.py --utterances 20 --interval-ms 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core import CTCStitcher, IncrementalDecoder, SlidingWindowStreamer
+
+SAMPLE_RATE = 16000
+FRAME = 320  # samples per CTC frame
+PITCHES = (150, 200, 250, 300)  # one "word" per pitch
+VOCAB = 'abcd'
+
+
+class ToyModel:
+    """Labels each 20 ms frame with its pitch (or blank), at an encoder-like cost"""
+
+    def __init__(self, width: int = 384, layers: int = 4, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.weights = [rng.standard_normal((width, width)).astype(np.float32) / np.sqrt(width)
+                        for _ in range(layers)]
+        self.width = width
+        self.freqs = np.fft.rfftfreq(2048, 1 / SAMPLE_RATE)
+        self.band = (self.freqs > 100) & (self.freqs < 350)
+        self.samples_run = 0
+
+    def logits(self, audio: np.ndarray) -> np.ndarray:
+        self.samples_run += len(audio)
+        frames = audio[:len(audio) // FRAME * FRAME].reshape(-1, FRAME)
+        # Encoder stand-in: cost proportional to the number of frames
+        hidden = np.resize(frames, (len(frames), self.width))
+        for weight in self.weights:
+            hidden = np.tanh(hidden @ weight)
+
+        spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME), 2048))[:, self.band]
+        pitch = self.freqs[self.band][np.argmax(spectrum, axis=1)]
+        labels = 1 + np.argmin(np.abs(pitch[:, None] - np.array(PITCHES)), axis=1)
+        labels[np.sqrt(np.mean(frames ** 2, axis=1)) < 0.02] = 0
+        return np.eye(len(PITCHES) + 1, dtype=np.float32)[labels] + 1e-3 * hidden[:, :1]
+
+
+def decode(tokens) -> str:
+    return ''.join(VOCAB[token - 1] for token in tokens)
+
+
+def conversation(utterances: int, seed: int = 0):
+    """Audio plus (start, first_word_onset, end) of each utterance, in samples"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(0.6 * SAMPLE_RATE)) / SAMPLE_RATE
+    words = [(0.2 * sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 8))).astype(np.float32)
+             for f0 in PITCHES]
+    gap = np.zeros(int(0.06 * SAMPLE_RATE), dtype=np.float32)
+
+    parts, spans, position = [], [], 0
+    for _ in range(utterances):
+        pause = np.zeros(int(rng.uniform(0.6, 1.5) * SAMPLE_RATE), dtype=np.float32)
+        speech = []
+        for index in rng.integers(0, len(words), rng.integers(4, 14)):
+            length = int(rng.uniform(0.3, 0.6) * SAMPLE_RATE)
+            speech += [words[index][:length], gap]
+        speech = np.concatenate(speech)
+        spans.append((position, position + len(pause), position + len(pause) + len(speech)))
+        parts += [pause, speech]
+        position += len(pause) + len(speech)
+    return np.concatenate(parts), spans
+
+
+class Server:
+    """Simulated clock: one model call at a time, each taking its measured duration"""
+
+    def __init__(self):
+        self.busy_until = 0.0
+        self.messages = []  # (time, audio_end sample, text)
+
+    def run(self, arrival: float, fn, *args):
+        start = max(arrival, self.busy_until)
+        t0 = time.perf_counter()
+        result = fn(*args)
+        self.busy_until = start + time.perf_counter() - t0
+        return result
+
+    def send(self, audio_end: int, text: str):
+        self.messages.append((self.busy_until, audio_end, text))
+
+
+def run_fixed(model, audio, spans, frame, chunk_seconds):
+    server = Server()
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    for start in range(0, len(audio), chunk):
+        end = min(start + chunk, len(audio))
+        stitcher = CTCStitcher()
+        text = server.run(end / SAMPLE_RATE, lambda: decode(stitcher.push(model.logits(audio[start:end]))))
+        server.send(end, text)
+    return server
+
+
+def redecode(model, audio):
+    return decode(CTCStitcher().push(model.logits(audio)))
+
+
+def run_redecode(model, audio, spans, frame, interval):
+    server = Server()
+    for utterance_start, _, utterance_end in spans:
+        for end in range(utterance_start + interval, utterance_end, interval):
+            # Partials are sent as soon as the frame completing the interval arrives
+            arrival = -(-(end - utterance_start) // frame) * frame + utterance_start
+            server.send(end, server.run(arrival / SAMPLE_RATE, redecode, model, audio[utterance_start:end]))
+        server.send(utterance_end, server.run(utterance_end / SAMPLE_RATE, redecode, model,
+                                              audio[utterance_start:utterance_end]))
+    return server
+
+
+def run_incremental(model, audio, spans, frame, interval, streamer_kwargs):
+    server = Server()
+    decoder = IncrementalDecoder(SlidingWindowStreamer(model.logits, **streamer_kwargs), decode)
+    for utterance_start, _, utterance_end in spans:
+        since_partial = 0
+        for start in range(utterance_start, utterance_end, frame):
+            end = min(start + frame, utterance_end)
+            arrival = end / SAMPLE_RATE
+            server.run(arrival, decoder.accept, audio[start:end])
+            since_partial += end - start
+            if since_partial >= interval and end < utterance_end:
+                since_partial = 0
+                server.send(end, server.run(arrival, decoder.hypothesis))
+        server.send(utterance_end, server.run(utterance_end / SAMPLE_RATE, decoder.finish))
+    return server
+
+
+def first_word_latencies(server, spans):
+    latencies = []
+    for _, onset, end in spans:
+        for sent_at, audio_end, text in server.messages:
+            # The first message with text that includes audio from this utterance
+            if text and audio_end > onset + FRAME:
+                latencies.append(sent_at - onset / SAMPLE_RATE)
+                break
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--utterances', type=int, default=20)
+    parser.add_argument('--frame-ms', type=float, default=100, help='Audio per WebSocket message')
+    parser.add_argument('--chunk-seconds', type=float, default=2.0, help='Chunk length of the fixed mode')
+    parser.add_argument('--interval-ms', type=float, default=300, help='Partial result cadence')
+    parser.add_argument('--hop', type=float, default=0.5)
+    parser.add_argument('--left-context', type=float, default=0.5)
+    parser.add_argument('--right-context', type=float, default=0.2)
+    args = parser.parse_args()
+
+    audio, spans = conversation(args.utterances)
+    frame = int(args.frame_ms * SAMPLE_RATE / 1000)
+    interval = int(args.interval_ms * SAMPLE_RATE / 1000)
+    streamer_kwargs = dict(hop_s=args.hop, left_context_s=args.left_context, right_context_s=args.right_context)
+    print(f"{len(audio) / SAMPLE_RATE:.0f} s of audio, {args.utterances} utterances, "
+          f"{args.frame_ms:.0f} ms frames, partials every {args.interval_ms:.0f} ms")
+    print(f"{'mode':<12} {'TTFW p50 ms':>12} {'TTFW p95 ms':>12} {'model s / audio s':>18}")
+
+    modes = [
+        ('fixed', lambda model: run_fixed(model, audio, spans, frame, args.chunk_seconds)),
+        ('redecode', lambda model: run_redecode(model, audio, spans, frame, interval)),
+        ('incremental', lambda model: run_incremental(model, audio, spans, frame, interval, streamer_kwargs)),
+    ]
+    for name, run in modes:
+        model = ToyModel()
+        server = run(model)
+        latencies = first_word_latencies(server, spans) * 1000
+        print(f"{name:<12} {np.percentile(latencies, 50):>12.0f} {np.percentile(latencies, 95):>12.0f} "
+              f"{model.samples_run / len(audio):>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
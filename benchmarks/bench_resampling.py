@@ -0,0 +1,96 @@
+"""Throughput and chunk-boundary error of the streaming resampler vs librosa.
+
+Resamples a browser-rate signal to 16 kHz chunk by chunk, the way live
+sessions arrive, with: librosa.resample per chunk (its default soxr_hq),
+scipy.signal.resample_poly per chunk, and StreamingResampler carrying its
+filter state across chunks (one stream, and a batch of streams as one 2-D
+array). Reports audio seconds processed per CPU second and the worst error
+against resampling the whole signal in one piece. Per-chunk methods show
+that error at every chunk edge.
+
+    python benchmarks/bench_resampling.py --rates 44100 48000 --chunk-seconds 0.25
+"""
+import argparse
+import os
+import sys
+import time
+from math import gcd
+
+import numpy as np
+from scipy.signal import resample_poly
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core.resampling import StreamingResampler, polyphase_bank, row_filter
+
+TARGET_RATE = 16000
+
+
+def test_signal(rate, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    tones = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 440, 1250, 3100, 6500)))
+    return (0.1 * tones + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def timed(fn, *args):
+    start = time.process_time()
+    result = fn(*args)
+    return result, time.process_time() - start
+
+
+def per_chunk(resample_chunk, chunks):
+    return np.concatenate([resample_chunk(chunk) for chunk in chunks], axis=-1)
+
+
+def streaming(rate, chunks):
+    resampler = StreamingResampler(rate, TARGET_RATE)
+    return np.concatenate([resampler.process(chunk) for chunk in chunks] + [resampler.flush()], axis=-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rates', type=int, nargs='+', default=[44100, 48000])
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--chunk-seconds', type=float, default=0.25)
+    parser.add_argument('--batch', type=int, default=8, help='streams in the batched run')
+    args = parser.parse_args()
+
+    try:
+        import librosa
+    except ImportError:
+        librosa = None
+        print("librosa is not installed, skipping it")
+
+    print(f"{args.seconds:.0f} s of audio in {args.chunk_seconds * 1000:.0f} ms chunks")
+    print(f"{'rate':>6} {'method':<22} {'audio s/CPU s':>14} {'max error':>10}")
+    for rate in args.rates:
+        signal = test_signal(rate, args.seconds)
+        step = int(rate * args.chunk_seconds)
+        chunks = [signal[i:i + step] for i in range(0, len(signal), step)]
+        up, down = TARGET_RATE // gcd(rate, TARGET_RATE), rate // gcd(rate, TARGET_RATE)
+        reference = resample_poly(signal.astype(np.float64), up, down)
+        polyphase_bank(up, down), row_filter(up, down)  # build the cached filters outside the timed runs
+
+        methods = []
+        if librosa is not None:
+            methods.append(('librosa per chunk', lambda: per_chunk(
+                lambda chunk: librosa.resample(chunk, orig_sr=rate, target_sr=TARGET_RATE), chunks)))
+        methods.append(('resample_poly per chunk', lambda: per_chunk(
+            lambda chunk: resample_poly(chunk, up, down).astype(np.float32), chunks)))
+        methods.append(('streaming', lambda: streaming(rate, chunks)))
+
+        for name, run in methods:
+            run()  # warm up: librosa imports its backend lazily on first use
+            out, cpu = timed(run)
+            n = min(len(out), len(reference))
+            error = np.max(np.abs(out[:n] - reference[:n]))
+            print(f"{rate:>6} {name:<22} {args.seconds / cpu:>14.0f} {error:>10.2e}")
+
+        batch_chunks = [np.tile(chunk, (args.batch, 1)) for chunk in chunks]
+        out, cpu = timed(streaming, rate, batch_chunks)
+        error = np.max(np.abs(out[:, :len(reference)] - reference[:out.shape[1]]))
+        print(f"{rate:>6} {f'streaming, batch of {args.batch}':<22} {args.batch * args.seconds / cpu:>14.0f} {error:>10.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Total memory of N worker processes with private vs memory-mapped shared weights.
+
+Writes a synthetic safetensors weights file, then for each worker count
+starts that many processes which either read a private copy of the weights
+(as ``from_pretrained`` does) or map the file read-only with
+``map_shared_weights``. Each worker touches every weight before its memory is
+sampled. Memory is reported as the sum of PSS over the workers (shared pages
+are divided between the processes that map them). Summed RSS would count
+each shared page once per process. Linux only (reads /proc/<pid>/smaps_rollup).
+
+    python benchmarks/bench_shared_weights.py --weights-mb 512 --workers 1 2 4 8 --check
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core.shared_weights import map_shared_weights, save_shared_weights
+
+TENSOR_MB = 16
+
+
+def write_weights(path, weights_mb):
+    rng = np.random.default_rng(0)
+    elements = TENSOR_MB * 2**20 // 4
+    tensors = {f"layer{i}.weight": rng.standard_normal(elements, dtype=np.float32)
+               for i in range(max(1, weights_mb // TENSOR_MB))}
+    save_shared_weights(tensors, path)
+    return sum(t.nbytes for t in tensors.values())
+
+
+def worker(path, mode, ready, stop):
+    if mode == 'shared':
+        tensors = map_shared_weights(path)
+    else:
+        tensors = {name: np.array(array) for name, array in map_shared_weights(path).items()}
+    # Fault in every page, like a first forward pass would
+    checksum = sum(float(array.sum()) for array in tensors.values())
+    ready.put(checksum)
+    stop.wait()
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1]] = int(parts[1])
+    return values['Rss'], values['Pss']
+
+
+def measure(path, mode, workers):
+    """Summed (RSS, PSS) in MB of ``workers`` processes with loaded weights"""
+    ctx = mp.get_context('spawn')
+    ready = ctx.Queue()
+    stop = ctx.Event()
+    processes = [ctx.Process(target=worker, args=(path, mode, ready, stop)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for _ in processes:
+            ready.get(timeout=300)
+        usage = [memory_kb(process.pid) for process in processes]
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+    return sum(rss for rss, _ in usage) / 1024, sum(pss for _, pss in usage) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--weights-mb', type=int, default=256)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--check', action='store_true',
+                        help='exit non-zero unless shared-mode PSS per extra worker is under 25%% of the weights')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'weights.safetensors')
+        weights_mb = write_weights(path, args.weights_mb) / 2**20
+        print(f"weights: {weights_mb:.0f} MB")
+        print(f"{'workers':>7} {'private RSS':>12} {'private PSS':>12} {'shared RSS':>11} {'shared PSS':>11}")
+
+        shared_pss = {}
+        for workers in args.workers:
+            private_rss, private_pss = measure(path, 'private', workers)
+            rss, pss = measure(path, 'shared', workers)
+            shared_pss[workers] = pss
+            print(f"{workers:>7} {private_rss:>12.0f} {private_pss:>12.0f} {rss:>11.0f} {pss:>11.0f}")
+
+    low, high = min(shared_pss), max(shared_pss)
+    if high > low:
+        per_worker = (shared_pss[high] - shared_pss[low]) / (high - low)
+        print(f"shared: +{per_worker:.0f} MB PSS per extra worker ({per_worker / weights_mb:.0%} of the weights)")
+        if args.check and per_worker > 0.25 * weights_mb:
+            print("FAIL: memory grows close to linearly with worker count")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Startup benchmark for app.py: import time, model load time, first-inference latency.
+
+Every measurement runs in a fresh interpreter so import caches do not leak
+between them. First-inference latency is reported both with and without
+the warm-up pass that ModelLoader runs on its background thread.
+
+    python benchmarks/bench_startup.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+IMPORT_APP = """
+import json, time
+start = time.perf_counter()
+import app
+print(json.dumps({'seconds': time.perf_counter() - start}))
+"""
+
+IMPORT_HEAVY = """
+import json, time
+start = time.perf_counter()
+import torch, transformers
+print(json.dumps({'seconds': time.perf_counter() - start}))
+"""
+
+LOAD_AND_INFER = """
+import json, time
+import numpy as np
+import app
+
+processor = app.AudioProcessor()
+loader = app.ModelLoader(dict(processor.model_config()), warmup={warmup})
+loader.load()
+if not loader.ready:
+    raise SystemExit(loader.error)
+processor.attach_model(loader)
+
+audio = np.random.default_rng(0).normal(0, 0.1, processor.chunk_size).astype(np.float32)
+latencies = []
+for _ in range(3):
+    start = time.perf_counter()
+    processor.compute_logits(audio)
+    latencies.append(time.perf_counter() - start)
+print(json.dumps({{'timings': loader.timings, 'latencies': latencies}}))
+"""
+
+
+def run(code):
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skip-model', action='store_true', help='Only measure imports')
+    args = parser.parse_args()
+
+    app_import = run(IMPORT_APP)['seconds']
+    heavy_import = run(IMPORT_HEAVY)['seconds']
+    print(f"import app (page can render):        {app_import * 1000:8.0f} ms")
+    print(f"import torch + transformers (lazy):  {heavy_import * 1000:8.0f} ms")
+    if args.skip_model:
+        return
+
+    for warmup in (True, False):
+        result = run(LOAD_AND_INFER.format(warmup=warmup))
+        timings, latencies = result['timings'], result['latencies']
+        label = 'with warm-up' if warmup else 'without warm-up'
+        print(f"\n{label}:")
+        for name, seconds in timings.items():
+            print(f"  {name:<28} {seconds * 1000:8.0f} ms")
+        print(f"  {'first chunk inference':<28} {latencies[0] * 1000:8.0f} ms")
+        print(f"  {'steady-state inference':<28} {min(latencies[1:]) * 1000:8.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Overhead of LatencyTracer spans relative to a transcription chunk.
+
+Times the same synthetic chunk workload (one stage per span that app.py
+records) with tracing enabled and disabled, and reports the per-span cost
+and the relative overhead per chunk.
+
+    python benchmarks/bench_tracing.py --stage-ms 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core import LatencyTracer
+
+STAGES = ('queue_wait', 'vad', 'preprocess', 'features', 'forward', 'decode', 'end_to_end')
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run_chunks(tracer, chunks, stage_seconds):
+    start = time.perf_counter()
+    for _ in range(chunks):
+        captured_at = time.monotonic()
+        for stage in STAGES[1:-1]:
+            with tracer.span(stage):
+                busy_wait(stage_seconds)
+        tracer.record_since('queue_wait', captured_at)
+        tracer.record_since('end_to_end', captured_at)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=500)
+    parser.add_argument('--stage-ms', type=float, default=5.0,
+                        help='Simulated work per stage; real forward passes take far longer')
+    parser.add_argument('--spans', type=int, default=200000, help='Iterations for the per-span cost')
+    args = parser.parse_args()
+
+    tracer = LatencyTracer()
+    start = time.perf_counter()
+    for _ in range(args.spans):
+        with tracer.span('empty'):
+            pass
+    span_us = (time.perf_counter() - start) / args.spans * 1e6
+    print(f"cost per span: {span_us:.2f} us")
+
+    stage_seconds = args.stage_ms / 1000
+    disabled = min(run_chunks(LatencyTracer(enabled=False), args.chunks, stage_seconds) for _ in range(3))
+    enabled = min(run_chunks(LatencyTracer(), args.chunks, stage_seconds) for _ in range(3))
+    overhead = (enabled - disabled) / disabled
+    print(f"{args.chunks} chunks, {len(STAGES)} spans each, {args.stage_ms:.1f} ms per stage")
+    print(f"tracing disabled: {disabled * 1000:8.1f} ms")
+    print(f"tracing enabled:  {enabled * 1000:8.1f} ms  (overhead {overhead:+.3%})")
+
+    summary = LatencyTracer()
+    run_chunks(summary, 50, stage_seconds)
+    start = time.perf_counter()
+    summary.summary()
+    print(f"summary() over {len(STAGES)} stages: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Server CPU per transcript refresh: full-script rerun vs incremental redraw.
+
+'rerun' is what DUBSYNC_UI_REFRESH=rerun does every 0.5 s while recording:
+execute all of app.main(). 'incremental' is one pass of the live-update
+loop: redraw the transcript pane and the stats panel in place. Both run
+headless under streamlit.testing with the same transcript history, and
+the model loader is kept from starting so only UI work is timed.
+
+    python benchmarks/bench_ui_refresh.py --lines 500
+"""
+import argparse
+import os
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def full_page(root, lines, refreshes):
+    import sys
+    sys.path.insert(0, root)
+    import app
+    import streamlit as st
+
+    def skip_model(self):
+        self.state, self.error = 'failed', 'not loaded (benchmark)'
+        return self
+
+    app.ModelLoader.start = skip_model
+    if 'transcriptions' not in st.session_state:
+        st.session_state.audio_processor = app.AudioProcessor()
+        st.session_state.is_recording = False
+        st.session_state.transcriptions = app.TranscriptStore()
+        for i in range(lines):
+            st.session_state.transcriptions.append(f"[00:00:00] line {i}")
+    app.main()
+
+
+def incremental(root, lines, refreshes):
+    import sys
+    sys.path.insert(0, root)
+    import app
+    import streamlit as st
+
+    st.session_state.audio_processor = app.AudioProcessor()
+    st.session_state.transcriptions = app.TranscriptStore()
+    for i in range(lines):
+        st.session_state.transcriptions.append(f"[00:00:00] line {i}")
+    transcript_placeholder, stats_placeholder = st.empty(), st.empty()
+    for i in range(refreshes):
+        st.session_state.audio_processor.transcription_queue.put(f"[00:00:00] new line {i}")
+        app.drain_transcriptions(st.session_state.audio_processor)
+        app.render_transcript(transcript_placeholder)
+        app.render_session_stats(stats_placeholder, 'hi')
+
+
+def run_cpu(at):
+    """Process CPU seconds for one script run, including delta delivery"""
+    start = time.process_time()
+    at.run()
+    if at.exception:
+        sys.exit(f"script failed: {at.exception[0].message}")
+    return time.process_time() - start
+
+
+def measure_rerun(args):
+    at = AppTest.from_function(full_page, args=(ROOT, args.lines, args.refreshes), default_timeout=600)
+    run_cpu(at)  # warm imports and caches
+    return min(run_cpu(at) for _ in range(args.refreshes))
+
+
+def measure_incremental(args):
+    # One run doing N refreshes, minus the same run doing none
+    loop = AppTest.from_function(incremental, args=(ROOT, args.lines, args.refreshes), default_timeout=600)
+    baseline = AppTest.from_function(incremental, args=(ROOT, args.lines, 0), default_timeout=600)
+    run_cpu(baseline)
+    idle = min(run_cpu(baseline) for _ in range(3))
+    busy = min(run_cpu(loop) for _ in range(3))
+    return (busy - idle) / args.refreshes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=500, help='Transcript lines already in the session')
+    parser.add_argument('--refreshes', type=int, default=50)
+    args = parser.parse_args()
+
+    rerun = measure_rerun(args)
+    partial = measure_incremental(args)
+    print(f"{args.lines} transcript lines, {args.refreshes} refreshes")
+    print(f"rerun (whole script):           {rerun * 1000:8.2f} ms CPU per refresh")
+    print(f"incremental (transcript+stats): {partial * 1000:8.2f} ms CPU per refresh")
+    print(f"x{rerun / max(partial, 1e-9):.1f} less server CPU per refresh; "
+          f"rerun mode also refreshes every 0.5 s whether or not a line arrived")
+
+
+if __name__ == '__main__':
+    main()
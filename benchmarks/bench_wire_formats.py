@@ -0,0 +1,77 @@
+"""Bandwidth and server decode CPU of the float32, int16 and Opus audio formats.
+
+Encodes the same synthetic voiced signal in each wire format, then decodes
+every chunk with the server's AudioDecoder. Reports bytes per second of
+audio (raw binary frames, and base64 as in JSON/REST), CPU time to decode
+one second of audio, and the SNR of the decoded samples against the
+float32 original.
+
+    python benchmarks/bench_wire_formats.py --chunks 200 --chunk-seconds 2
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend'))
+from dubsync_core.wire import ENCODINGS, HEADER_SIZE, AudioDecoder, pack_audio_frame, unpack_audio_frame
+
+SAMPLE_RATE = 16000
+
+
+def voiced_signal(seconds, seed=0):
+    """Harmonics of a wandering pitch with a syllable-rate envelope, plus a little noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) ** 2
+    signal = 0.15 * voice * envelope + 0.005 * rng.standard_normal(len(t))
+    return signal.astype(np.float32)
+
+
+def snr_db(reference, decoded):
+    n = min(len(reference), len(decoded))
+    noise = np.sum((reference[:n] - decoded[:n]) ** 2)
+    if noise == 0:
+        return float('inf')
+    return 10 * np.log10(np.sum(reference[:n] ** 2) / noise)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=200)
+    parser.add_argument('--chunk-seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    chunk = voiced_signal(args.chunk_seconds)
+    audio_seconds = args.chunks * args.chunk_seconds
+    print(f"{args.chunks} chunks of {args.chunk_seconds:.1f} s at {SAMPLE_RATE} Hz")
+    print(f"{'encoding':<9} {'KB/s':>7} {'KB/s b64':>9} {'vs f32':>7} {'decode CPU us/s':>16} {'SNR dB':>7}")
+
+    baseline = None
+    for name, sample_format in ENCODINGS.items():
+        frames = [pack_audio_frame(chunk, i, SAMPLE_RATE, 'hi', sample_format) for i in range(args.chunks)]
+        payload_bytes = len(frames[0]) - HEADER_SIZE
+        kb_per_s = len(frames[0]) / args.chunk_seconds / 1024
+        b64_per_s = len(base64.b64encode(frames[0][HEADER_SIZE:])) / args.chunk_seconds / 1024
+        baseline = baseline or payload_bytes
+
+        decoder = AudioDecoder()
+        start = time.process_time()
+        for frame in frames:
+            header, payload = unpack_audio_frame(frame)
+            decoded, _ = decoder.decode(payload, header.sample_format, header.sample_rate)
+        cpu = time.process_time() - start
+
+        # Opus is perceptual: waveform SNR understates what the model hears
+        print(f"{name:<9} {kb_per_s:>7.1f} {b64_per_s:>9.1f} {baseline / payload_bytes:>6.1f}x "
+              f"{cpu * 1e6 / audio_seconds:>16.1f} {snr_db(chunk, decoded):>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
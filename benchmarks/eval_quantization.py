@@ -0,0 +1,140 @@
+"""Accuracy/speed report for dynamic INT8 quantization against fp32.
+
+Each mode runs in its own process so resident memory is measured cleanly.
+The report lists CER, WER, real-time factor, load time and peak RSS.
+
+The evaluation set is a directory of 16 kHz ``<name>.wav`` files with
+reference transcripts in ``<name>.txt``. Without references, the fp32
+hypotheses are used as the reference, which measures how far INT8 drifts
+from fp32.
+
+    python benchmarks/eval_quantization.py --eval-dir data/eval_hi
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DubSync', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+from dubsync_core.backends import DEFAULT_MODEL_NAME, load_backend
+
+SAMPLE_RATE = 16000
+
+
+def edit_distance(reference, hypothesis) -> int:
+    """Levenshtein distance between two sequences"""
+    previous = np.arange(len(hypothesis) + 1)
+    for i, ref_item in enumerate(reference, 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, hyp_item in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref_item != hyp_item))
+        previous = current
+    return int(previous[-1])
+
+
+def error_rates(references, hypotheses):
+    char_errors = sum(edit_distance(r, h) for r, h in zip(references, hypotheses))
+    word_errors = sum(edit_distance(r.split(), h.split()) for r, h in zip(references, hypotheses))
+    chars = max(1, sum(len(r) for r in references))
+    words = max(1, sum(len(r.split()) for r in references))
+    return char_errors / chars, word_errors / words
+
+
+def load_eval_set(eval_dir):
+    import soundfile as sf
+
+    items = []
+    for path in sorted(glob.glob(os.path.join(eval_dir, '*.wav'))):
+        audio, sr = sf.read(path, dtype='float32', always_2d=True)
+        if sr != SAMPLE_RATE:
+            print(f"skipping {path}: {sr} Hz (expected {SAMPLE_RATE})", file=sys.stderr)
+            continue
+        text_path = os.path.splitext(path)[0] + '.txt'
+        reference = open(text_path, encoding='utf-8').read().strip() if os.path.exists(text_path) else None
+        items.append((os.path.basename(path), audio.mean(axis=1), reference))
+    return items
+
+
+def run_mode(args):
+    """Child process: transcribe the eval set in one mode and print JSON"""
+    start = time.perf_counter()
+    _, processor, backend = load_backend(
+        'torch', model_name=args.model,
+        quantize='int8' if args.run_mode == 'int8' else None,
+        cache_dir=args.cache_dir
+    )
+    load_seconds = time.perf_counter() - start
+
+    hypotheses, compute_seconds, audio_seconds = [], 0.0, 0.0
+    for _, audio, _ in load_eval_set(args.eval_dir):
+        input_values = processor(audio, sampling_rate=SAMPLE_RATE, return_tensors='np').input_values
+        start = time.perf_counter()
+        logits = backend.logits(input_values)[0]
+        compute_seconds += time.perf_counter() - start
+        audio_seconds += len(audio) / SAMPLE_RATE
+        hypotheses.append(processor.decode(np.argmax(logits, axis=-1)).strip())
+
+    print(json.dumps({
+        'mode': args.run_mode,
+        'hypotheses': hypotheses,
+        'rtf': compute_seconds / max(audio_seconds, 1e-9),
+        'load_seconds': load_seconds,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--eval-dir', required=True, help='Directory of <name>.wav and <name>.txt files')
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--cache-dir', default='model_cache', help='Where INT8 weights are cached')
+    parser.add_argument('--run-mode', choices=['fp32', 'int8'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args)
+        return
+
+    items = load_eval_set(args.eval_dir)
+    if not items:
+        sys.exit("No audio found in eval set")
+
+    results = {}
+    for mode in ('fp32', 'int8'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--eval-dir', args.eval_dir, '--model', args.model,
+             '--cache-dir', args.cache_dir, '--run-mode', mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    has_references = all(reference is not None for _, _, reference in items)
+    references = ([reference for _, _, reference in items] if has_references
+                  else results['fp32']['hypotheses'])
+
+    print(f"eval set: {len(items)} clips, "
+          f"{sum(len(audio) for _, audio, _ in items) / SAMPLE_RATE:.1f} s "
+          f"({'reference transcripts' if has_references else 'fp32 output as reference'})")
+    print(f"{'mode':<6} {'CER':>7} {'WER':>7} {'RTF':>8} {'load s':>8} {'peak RSS MB':>12}")
+    for mode, result in results.items():
+        cer, wer = error_rates(references, result['hypotheses'])
+        print(f"{mode:<6} {cer:>7.2%} {wer:>7.2%} {result['rtf']:>8.4f} "
+              f"{result['load_seconds']:>8.1f} {result['peak_rss_mb']:>12.0f}")
+
+    speedup = results['fp32']['rtf'] / max(results['int8']['rtf'], 1e-9)
+    saved = results['fp32']['peak_rss_mb'] - results['int8']['peak_rss_mb']
+    print(f"\nINT8 speedup x{speedup:.2f}, {saved:.0f} MB less resident memory")
+
+
+if __name__ == '__main__':
+    main()
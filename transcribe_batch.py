@@ -0,0 +1,253 @@
+"""Offline bulk transcription of long audio files.
+
+Files are read block by block with soundfile, resampled to 16 kHz if
+needed, cut into utterances with the same VAD/endpointing used for live
+capture, and transcribed by a pool of
+worker processes that each hold one copy of the model. Transcripts are
+written in order with timestamps. Progress is appended to a
+``<name>.partial.jsonl`` file, so an interrupted run resumes where it
+stopped. Outputs mirror each file's path below the input directory it was
+found in, so same-named files in different subdirectories stay apart.
+
+    python transcribe_batch.py recordings/ --language hi --workers 4 --output-dir transcripts/
+
+The model is configured with the same DUBSYNC_* environment variables as
+app.py (backend, quantization, model name).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import soundfile as sf
+
+import app
+from dubsync_core import EndpointChunker
+from dubsync_core.endpointing import iter_file_segments
+
+logger = logging.getLogger('transcribe_batch')
+
+AUDIO_EXTENSIONS = ('.wav', '.flac')
+SAMPLE_RATE = 16000
+
+# Per-process worker state, created by _init_worker
+_worker = None
+
+
+def _init_worker(language: str):
+    """Load one model copy in this worker process"""
+    global _worker
+    processor = app.AudioProcessor()
+    processor.demo_responses = False
+    loader = app.ModelLoader(dict(processor.model_config()))
+    loader.load()
+    if not loader.ready:
+        raise RuntimeError(f"Model failed to load: {loader.error}")
+    processor.attach_model(loader)
+    _worker = (processor, language)
+
+
+def _transcribe_segment(index: int, audio):
+    processor, language = _worker
+    text = processor.transcribe_audio(audio, language)
+    # AudioProcessor reports failures as text; raise so they are never recorded
+    if text.startswith(('[Transcription error', '[Model not loaded]')):
+        raise RuntimeError(f"segment {index}: {text}")
+    return index, text
+
+
+def format_timestamp(seconds: float) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def find_audio_files(inputs):
+    """(path, output name) of each audio file; the name is the path relative to its input directory"""
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend((os.path.join(root, name), os.path.relpath(os.path.join(root, name), path))
+                             for name in sorted(names) if name.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            files.append((path, os.path.basename(path)))
+
+    # Two inputs can still contain the same relative path
+    owners = {}
+    for path, name in files:
+        key = os.path.normcase(os.path.splitext(name)[0])
+        if key in owners:
+            raise ValueError(f"{owners[key]} and {path} would share the output {os.path.splitext(name)[0]}.txt; "
+                             f"transcribe them in separate runs or with different --output-dir")
+        owners[key] = path
+    return files
+
+
+def output_base(output_dir: str, name: str) -> str:
+    """Output path of a file without extension, below ``output_dir``"""
+    return os.path.join(output_dir, os.path.splitext(name)[0])
+
+
+def load_progress(partial_path: str):
+    """Records already written by an interrupted run, keyed by segment index"""
+    done = {}
+    if os.path.exists(partial_path):
+        with open(partial_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line from the interruption
+                done[record['index']] = record
+    return done
+
+
+def transcribe_file(path: str, name: str, pool: ProcessPoolExecutor, args) -> float:
+    """Transcribe one file; returns its duration in seconds"""
+    base = output_base(args.output_dir, name)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    output_path = base + '.txt'
+    partial_path = base + '.partial.jsonl'
+    duration = sf.info(path).duration
+
+    done = load_progress(partial_path)
+    if done:
+        logger.info(f"{path}: resuming after {len(done)} segments")
+
+    chunker = EndpointChunker(
+        SAMPLE_RATE,
+        end_silence_s=args.end_silence,
+        max_segment_s=args.max_segment
+    )
+    max_in_flight = args.workers * 4
+    in_flight = set()
+    segments = {}    # index -> (start, end) for submitted segments
+    finished = {}    # index -> text, waiting for earlier segments
+    next_to_write = len(done)
+
+    with open(partial_path, 'a', encoding='utf-8') as partial:
+        def write_ready():
+            # Append finished segments strictly in capture order
+            nonlocal next_to_write
+            while next_to_write in finished:
+                start, end = segments.pop(next_to_write)
+                record = {'index': next_to_write, 'start': start / SAMPLE_RATE,
+                          'end': end / SAMPLE_RATE, 'text': finished.pop(next_to_write)}
+                partial.write(json.dumps(record, ensure_ascii=False) + '\n')
+                partial.flush()
+                done[next_to_write] = record
+                next_to_write += 1
+
+        def collect(return_when):
+            completed, pending = wait(in_flight, return_when=return_when)
+            for future in completed:
+                index, text = future.result()
+                finished[index] = text
+            write_ready()
+            return pending
+
+        try:
+            for index, (start, audio) in enumerate(iter_file_segments(path, chunker, args.block_seconds)):
+                if index in done:
+                    continue
+                segments[index] = (start, start + len(audio))
+                in_flight.add(pool.submit(_transcribe_segment, index, audio))
+                # Bound memory: never hold more than a few segments per worker
+                if len(in_flight) >= max_in_flight:
+                    in_flight = collect(FIRST_COMPLETED)
+            while in_flight:
+                in_flight = collect(FIRST_COMPLETED)
+        except BaseException:
+            # The segments written so far stay in the partial file for a resume
+            for future in in_flight:
+                future.cancel()
+            raise
+
+    with open(output_path + '.tmp', 'w', encoding='utf-8') as f:
+        for index in sorted(done):
+            record = done[index]
+            if record['text'].strip():
+                f.write(f"[{format_timestamp(record['start'])} --> {format_timestamp(record['end'])}] "
+                        f"{record['text']}\n")
+    os.replace(output_path + '.tmp', output_path)
+    os.remove(partial_path)
+    return duration
+
+
+def make_pool(args) -> ProcessPoolExecutor:
+    """Worker processes that each load the model once"""
+    return ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                               initargs=(args.language,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help='Audio files or directories (WAV/FLAC, any sample rate)')
+    parser.add_argument('--language', default='hi', choices=sorted(app.LANGUAGE_MAPPING))
+    parser.add_argument('--output-dir', default='transcripts')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--block-seconds', type=float, default=10.0, help='Read size per soundfile block')
+    parser.add_argument('--end-silence', type=float, default=0.5, help='Silence (s) that ends an utterance')
+    parser.add_argument('--max-segment', type=float, default=15.0, help='Longest segment (s) sent to the model')
+    parser.add_argument('--force', action='store_true', help='Redo files that already have a transcript')
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    try:
+        files = find_audio_files(args.inputs)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(2)
+    if not args.force:
+        files = [(path, name) for path, name in files
+                 if not os.path.exists(output_base(args.output_dir, name) + '.txt')]
+    if not files:
+        logger.info("Nothing to transcribe")
+        return
+
+    total_audio, failures = 0.0, 0
+    start = time.perf_counter()
+    pool = make_pool(args)
+    restarted = False  # the pool was replaced and has not finished a file since
+    try:
+        for done_files, (path, name) in enumerate(files):
+            file_start = time.perf_counter()
+            try:
+                duration = transcribe_file(path, name, pool, args)
+            except BrokenProcessPool as e:
+                logger.error(f"{path}: worker process died ({e})")
+                failures += 1
+                pool.shutdown(wait=False, cancel_futures=True)
+                if restarted:
+                    # A fresh pool broke too, e.g. the model cannot load
+                    logger.error("Worker pool failed again after a restart, aborting the run")
+                    failures += len(files) - done_files - 1
+                    break
+                pool = make_pool(args)
+                restarted = True
+                continue
+            except Exception as e:
+                logger.error(f"{path}: {e}")
+                failures += 1
+                continue
+            restarted = False
+            total_audio += duration
+            elapsed = time.perf_counter() - file_start
+            logger.info(f"{path}: {duration:.1f} s of audio in {elapsed:.1f} s (RTF {elapsed / max(duration, 1e-9):.3f})")
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Transcribed {len(files) - failures}/{len(files)} files, {total_audio / 3600:.2f} h of audio "
+                f"in {elapsed / 60:.1f} min with {args.workers} workers "
+                f"(aggregate RTF {elapsed / max(total_audio, 1e-9):.3f})")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()